@@ -1,9 +1,13 @@
 import os
-import numpy as np
-import librosa
-from pydub import AudioSegment
-from pydub.silence import detect_silence
 import re
+import time
+import wave
+import numpy as np
+# librosa (numba, scipy ile birlikte) ağır bir import; yalnızca gerektiğinde fonksiyon içinde yüklenir.
+# numba JIT önbelleği diskte tutulur, sonraki açılışlarda derleme tekrarlanmaz.
+os.environ.setdefault("NUMBA_CACHE_DIR", os.path.join("cache", "numba"))
+from pitch import pitch_std_fast, pitch_std_pyin, rate_pitch
+from audio_features import SharedFrameFeatures
 
 # Türkçe dolgu kelimeleri ve desenleri
 FILLER_WORDS_TR = {
@@ -27,115 +31,304 @@ FILLER_WORDS_TR = {
     'tamam': ['tamam tamam', 'tamamdır']
 }
 
+
+
+class FillerDetector:
+    """
+    Dolgu kelimesi sözlüğünü tek bir regex alternasyonuna bir kez derler.
+    Varyantlar uzundan kısaya sıralanır: aynı konumda en uzun eşleşme kazanır ve
+    eşleşmeler örtüşmez ("yani işte" bir kez sayılır, ayrıca "yani" ve "işte" sayılmaz).
+    """
+
+    def __init__(self, vocabulary: dict):
+        self.category_of = {}
+        for category, variations in vocabulary.items():
+            for variation in variations:
+                # Birden fazla kategoride geçen varyant ilk kategoriye yazılır
+                self.category_of.setdefault(variation, category)
+        variants = sorted(self.category_of, key=len, reverse=True)
+        self.pattern = re.compile(r'\b(?:' + '|'.join(re.escape(v) for v in variants) + r')\b')
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Türkçe küçük harf dönüşümü (İ->i, I->ı); uzunluk korunur, konumlar metinle aynıdır"""
+        return text.replace('İ', 'i').replace('I', 'ı').lower()
+
+    def find(self, text: str) -> list:
+        """[(kategori, eşleşen metin, başlangıç, bitiş), ...]"""
+        return [(self.category_of[m.group()], m.group(), m.start(), m.end())
+                for m in self.pattern.finditer(self.normalize(text))]
+
+
+FILLER_DETECTOR = FillerDetector(FILLER_WORDS_TR)
+
+ANALYSIS_SR = 16000  # Analiz örnekleme hızı (kayıt hızıyla aynı)
+
+# Duraksama eşikleri (saniye)
+MIN_PAUSE_SEC = 0.5     # Bundan kısa boşluklar duraksama sayılmaz
+SHORT_PAUSE_SEC = 0.8
+LONG_PAUSE_SEC = 2.0
+
 class AnalysisHandler:
     """Ses ve metin analizi için ana sınıf - Sadece analiz ve puanlama"""
 
-    def __init__(self):
+    def __init__(self, pitch_mode: str = "fast"):
+        """
+        pitch_mode: "fast" (konuşma aralığında vektörel YIN, bkz. pitch.py) veya
+        "pyin" (librosa.pyin, C2-C7; daha yavaş referans yöntem)
+        """
+        if pitch_mode not in ("fast", "pyin"):
+            raise ValueError(f"Bilinmeyen pitch_mode: {pitch_mode}")
+        self.pitch_mode = pitch_mode
         print("Ses analizi sistemi hazır")
-    def analyze_audio_file(self, audio_path: str) -> dict:
+
+    def warm_up(self, full: bool = True) -> float:
+        """
+        Analiz yollarını kısa sentetik bir sinyalde bir kez çalıştırır. full=True ise
+        dosya bazlı yolun tamamı (librosa importu ve numba JIT derlemesi) burada olur;
+        analiz süreç havuzunun işçileri bunu açılışta çağırır (bkz. analysis_pool).
+        full=False yalnızca tur içi artımlı yolu (analyze_stream) ısıtır, librosa yüklenmez.
+        Geçen süreyi (sn) döndürür.
+        """
+        started = time.perf_counter()
+        t = np.arange(ANALYSIS_SR, dtype=np.float32) / ANALYSIS_SR
+        # Sesli + sessiz bölüm: sessizlik, onset ve ton yollarının hepsi çalışsın
+        y = (0.1 * np.sin(2 * np.pi * 150 * t) * (t < 0.4)).astype(np.float32)
+        self._score_fillers("ee yani işte bir şey")
+        if not full:
+            from streaming_analysis import IncrementalAudioAnalyzer
+            stream = IncrementalAudioAnalyzer(sample_rate=ANALYSIS_SR)
+            stream.update((y * 32767).astype(np.int16).tobytes())
+            stream.summary()
+            return time.perf_counter() - started
+        features = SharedFrameFeatures(y, ANALYSIS_SR)
+        self._analyze_silence(features)
+        self._estimate_wpm(features, len(y) / ANALYSIS_SR)
+        self._analyze_pitch(y, ANALYSIS_SR, features)
+        self._analyze_energy(features)
+        return time.perf_counter() - started
+
+    def analyze_audio_file(self, audio_path: str, words: list = None) -> dict:
+        """
+        Ses dosyasını analiz eder.
+        words: STT'nin kelime zamanları ({'word', 'start', 'end'}). Verilirse konuşma hızı ve
+        duraksamalar bunlardan hesaplanır; yoksa onset tespiti ve sessizlik analizine düşülür.
+        """
         print(f" Ses analizi başlıyor: {audio_path}")
 
         try:
-            y, sr = librosa.load(audio_path, sr=16000)
-            duration = librosa.get_duration(y=y, sr=sr)
+            # 16-bit PCM WAV ise doğrudan okunur (librosa/ffmpeg çözümleme ve yeniden örnekleme yok)
+            with wave.open(audio_path, 'rb') as wf:
+                if wf.getsampwidth() == 2 and wf.getnchannels() == 1:
+                    return self.analyze_buffer(wf.readframes(wf.getnframes()), wf.getframerate(), words)
+        except (wave.Error, EOFError):
+            pass
+        except Exception as e:
+            print(f"Ses analizi hatası: {e}")
+            return {'error': str(e)}
+
+        try:
+            import librosa
+            y, sr = librosa.load(audio_path, sr=ANALYSIS_SR)
+        except Exception as e:
+            print(f"Ses analizi hatası: {e}")
+            return {'error': str(e)}
+        return self.analyze_buffer(y, sr, words)
+
+    def analyze_buffer(self, pcm, sr: int = ANALYSIS_SR, words: list = None) -> dict:
+        """
+        Bellekteki sesi analiz eder; diske dokunmaz.
+        pcm: 16-bit mono PCM (bytes/memoryview/int16 dizi) veya float dizi.
+        Ses bir kez float32'ye çevrilir ve tüm analizler aynı diziyi paylaşır.
+        """
+        try:
+            y = self._to_float(pcm)
+            if sr != ANALYSIS_SR:
+                import librosa
+                y = librosa.resample(y, orig_sr=sr, target_sr=ANALYSIS_SR)
+                sr = ANALYSIS_SR
+            duration = len(y) / sr
             print(f"Ses süresi: {duration:.2f} saniye")
 
-            # Sessizlik analizi
-            long_pauses, short_pauses = self._analyze_silence(audio_path)
+            # Sinyal bir kez çerçevelenir; tüm analizler aynı çerçeve/STFT dizilerini kullanır
+            features = SharedFrameFeatures(y, sr)
+
+            pacing = {}
+            if words:
+                # STT kelime zamanlarından: onset taraması ve sessizlik taraması gerekmez
+                long_pauses, short_pauses, wpm, wpm_rating, pacing = self._analyze_words(words)
+            else:
+                # Sessizlik analizi
+                long_pauses, short_pauses, pauses = self._analyze_silence(features)
+                pacing['pauses'] = pauses
 
-            # Konuşma hızı
-            wpm, wpm_rating = self._estimate_wpm(y, sr, duration)
+                # Konuşma hızı
+                wpm, wpm_rating = self._estimate_wpm(features, duration)
 
             # Ton analizi
-            tone_rating, pitch_std = self._analyze_pitch(y, sr)
+            tone_rating, pitch_std = self._analyze_pitch(y, sr, features)
 
             # Enerji tutarlılığı
-            consistency_score = self._analyze_energy(y)
-
-            # Akıcılık skoru
-            fluency_score = self._calculate_fluency_score(
-                long_pauses, short_pauses, wpm, tone_rating, consistency_score
-            )
-            print(f"Akıcılık skoru: {fluency_score:.1f}/100")
-
-            return {
-                'fluency_score': round(fluency_score, 1),
-                'wpm': round(wpm, 1),
-                'wpm_rating': wpm_rating,
-                'tone_rating': tone_rating,
-                'pitch_std': round(pitch_std, 1),
-                'long_pause_count': long_pauses,
-                'short_pause_count': short_pauses,
-                'energy_consistency': round(consistency_score, 2)
-            }
+            consistency_score = self._analyze_energy(features)
+
+            return self._build_metrics(long_pauses, short_pauses, wpm, wpm_rating, 'stt' if words else 'onset',
+                                       tone_rating, pitch_std, consistency_score, pacing)
 
         except Exception as e:
             print(f"Ses analizi hatası: {e}")
             return {'error': str(e)}
 
-    def _analyze_silence(self, audio_path: str) -> tuple:
-        """Sessizlikleri analiz eder - Sadece sayıları döndürür"""
-        audio = AudioSegment.from_wav(audio_path)
-        silences = detect_silence(audio, min_silence_len=500, silence_thresh=-40)
+    def analyze_stream(self, stream, words: list = None) -> dict:
+        """
+        Kayıt sırasında artımlı olarak hesaplanmış istatistiklerden (streaming_analysis)
+        metrikleri üretir; ses yeniden taranmaz, kayıt bitiminden milisaniyeler sonra hazırdır.
+        """
+        try:
+            stats = stream.summary()
+            print(f"Ses süresi: {stats['duration']:.2f} saniye")
+
+            pacing = {}
+            if words:
+                long_pauses, short_pauses, wpm, wpm_rating, pacing = self._analyze_words(words)
+            else:
+                long_pauses, short_pauses = self._count_pauses(stats['pause_durations'])
+                duration = stats['duration']
+                wpm = (stats['onset_count'] / duration) * 60 if duration > 0 else 0
+                wpm_rating = self._rate_wpm(wpm)
+
+            if stats['pitch_std'] is None:
+                tone_rating, pitch_std = 'unknown', 0
+            else:
+                tone_rating, pitch_std = rate_pitch(stats['pitch_std']), stats['pitch_std']
+
+            consistency_score = 1.0 - min(stats['rms_std'] / (stats['rms_mean'] + 1e-6), 1.0)
+
+            return self._build_metrics(long_pauses, short_pauses, wpm, wpm_rating, 'stt' if words else 'onset',
+                                       tone_rating, pitch_std, consistency_score, pacing)
 
-        pause_durations = [(end - start) / 1000.0 for start, end in silences]
-        long_pauses = sum(1 for p in pause_durations if p > 2.0)
-        short_pauses = sum(1 for p in pause_durations if p < 0.8)
+        except Exception as e:
+            print(f"Ses analizi hatası: {e}")
+            return {'error': str(e)}
+
+    def _build_metrics(self, long_pauses, short_pauses, wpm, wpm_rating, wpm_source,
+                       tone_rating, pitch_std, consistency_score, pacing) -> dict:
+        # Akıcılık skoru
+        fluency_score = self._calculate_fluency_score(
+            long_pauses, short_pauses, wpm, tone_rating, consistency_score
+        )
+        print(f"Akıcılık skoru: {fluency_score:.1f}/100")
+
+        result = {
+            'fluency_score': round(fluency_score, 1),
+            'wpm': round(wpm, 1),
+            'wpm_rating': wpm_rating,
+            'wpm_source': wpm_source,
+            'tone_rating': tone_rating,
+            'pitch_std': round(pitch_std, 1),
+            'long_pause_count': long_pauses,
+            'short_pause_count': short_pauses,
+            'energy_consistency': round(consistency_score, 2)
+        }
+        result.update(pacing)
+        return result
+
+    def _analyze_words(self, words) -> tuple:
+        """STT kelime zamanlarından duraksama sayıları, WPM ve tempo bilgisi"""
+        pauses = self._pauses_from_words(words)
+        pause_durations = [end - start for start, end in pauses]
+        long_pauses, short_pauses = self._count_pauses(pause_durations)
+        wpm, wpm_rating, pacing = self._estimate_wpm_from_words(words)
+        pacing['pause_durations'] = [round(p, 2) for p in pause_durations]
+        pacing['pauses'] = [[round(start, 2), round(end, 2)] for start, end in pauses]
+        return long_pauses, short_pauses, wpm, wpm_rating, pacing
+
+    def _to_float(self, pcm) -> np.ndarray:
+        """16-bit PCM -> [-1, 1] float32 (np.frombuffer ile kopyasız okuma, tek dönüşüm)"""
+        if isinstance(pcm, np.ndarray):
+            if pcm.dtype == np.int16:
+                return pcm.astype(np.float32) / 32768.0
+            return np.asarray(pcm, dtype=np.float32)
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        return samples.astype(np.float32) / 32768.0
+
+    def _analyze_silence(self, features: SharedFrameFeatures) -> tuple:
+        """
+        Sessizlikleri analiz eder (pydub detect_silence ile aynı: -40 dBFS, en az 500 ms).
+        Uzun/kısa duraksama sayıları ve rapor için [başlangıç, bitiş] zamanları (sn) döndürür.
+        """
+        silences = features.silences(thresh_db=-40, min_silence_sec=0.5)
+        pause_durations = [end - start for start, end in silences]
+        long_pauses, short_pauses = self._count_pauses(pause_durations)
+        return long_pauses, short_pauses, [[round(start, 2), round(end, 2)] for start, end in silences]
+
+    def _count_pauses(self, pause_durations) -> tuple:
+        """Uzun (>2 sn) ve kısa (<0.8 sn) duraksama sayıları"""
+        long_pauses = sum(1 for p in pause_durations if p > LONG_PAUSE_SEC)
+        short_pauses = sum(1 for p in pause_durations if p < SHORT_PAUSE_SEC)
         return long_pauses, short_pauses
 
-    def _estimate_wpm(self, y, sr, duration) -> tuple:
-        """Konuşma hızını tahmin eder - WPM ve rating döndürür"""
-        onset_frames = librosa.onset.onset_detect(y=y, sr=sr, units='time')
-        estimated_words = len(onset_frames)
+    def _pauses_from_words(self, words) -> list:
+        """Ardışık kelimeler arasındaki boşluklardan duraksamalar: (başlangıç, bitiş) saniye"""
+        pauses = []
+        for prev, cur in zip(words, words[1:]):
+            if cur['start'] - prev['end'] >= MIN_PAUSE_SEC:
+                pauses.append((prev['end'], cur['start']))
+        return pauses
+
+    def _estimate_wpm_from_words(self, words) -> tuple:
+        """
+        STT kelime zamanlarından konuşma hızı - WPM, rating ve kelime bazlı tempo döndürür.
+        WPM ilk kelimenin başından son kelimenin sonuna kadar ölçülür (düşünme süresi hariç).
+        """
+        span = words[-1]['end'] - words[0]['start']
+        wpm = (len(words) / span) * 60 if span > 0 else 0
+
+        word_durations = [w['end'] - w['start'] for w in words]
+        speaking_time = sum(word_durations)
+        pacing = {
+            'word_count': len(words),
+            'speech_span_sec': round(span, 2),
+            # Duraksamalar hariç, yalnızca kelimelerin söylendiği süreye göre hız
+            'articulation_wpm': round(len(words) / speaking_time * 60, 1) if speaking_time > 0 else 0,
+            'mean_word_sec': round(float(np.mean(word_durations)), 3),
+        }
+        return wpm, self._rate_wpm(wpm), pacing
+
+    def _estimate_wpm(self, features: SharedFrameFeatures, duration) -> tuple:
+        """Konuşma hızını tahmin eder - WPM ve rating döndürür (kelime zamanı yoksa)"""
+        # Onset zarfı ortak STFT'den (onset_detect ile aynı tepe seçimi)
+        estimated_words = features.onset_count()
         wpm = (estimated_words / duration) * 60 if duration > 0 else 0
+        return wpm, self._rate_wpm(wpm)
 
+    def _rate_wpm(self, wpm) -> str:
         if wpm < 100:
-            rating = "yavaş"
+            return "yavaş"
         elif wpm > 180:
-            rating = "hızlı"
-        else:
-            rating = "normal"
-
-        return wpm, rating
+            return "hızlı"
+        return "normal"
 
-    def _analyze_pitch(self, y, sr) -> tuple:
+    def _analyze_pitch(self, y, sr, features: SharedFrameFeatures = None) -> tuple:
         """Ses tonu analizi - Rating ve std döndürür"""
         try:
-            f0, _, _ = librosa.pyin(
-                y,
-                fmin=librosa.note_to_hz('C2'),
-                fmax=librosa.note_to_hz('C7'),
-                sr=sr
-            )
-
-            f0_clean = f0[~np.isnan(f0)]
-
-            if len(f0_clean) == 0:
+            if self.pitch_mode == "fast":
+                pitch_std = pitch_std_fast(y, sr, frames=features.frames if features is not None else None)
+                if pitch_std is None:
+                    return 'unknown', 0
+                return rate_pitch(pitch_std), pitch_std
+
+            pitch_std = pitch_std_pyin(y, sr)
+            if pitch_std is None:
                 return 'unknown', 0
-
-            pitch_std = np.std(f0_clean)
-
-            if pitch_std < 20:
-                rating = "monoton"
-            elif pitch_std > 50:
-                rating = "çok değişken"
-            else:
-                rating = "dengeli"
-
-            return rating, float(pitch_std)
+            return rate_pitch(pitch_std), pitch_std
 
         except Exception as e:
             print(f"Pitch analizi hatası: {e}")
             return 'unknown', 0
 
-    def _analyze_energy(self, y) -> float:
+    def _analyze_energy(self, features: SharedFrameFeatures) -> float:
         """Ses enerjisi tutarlılığı - Sadece consistency score döndürür"""
-        rms = librosa.feature.rms(y=y)[0]
-        avg_energy = np.mean(rms)
-        energy_std = np.std(rms)
-
-        consistency_score = 1.0 - min(energy_std / (avg_energy + 1e-6), 1.0)
-        return consistency_score
+        return features.energy_consistency()
 
     def _calculate_fluency_score(self, long_pauses, short_pauses, wpm, tone_rating, consistency) -> float:
         """Akıcılık skorunu hesaplar (0-100)"""
@@ -167,13 +360,22 @@ class AnalysisHandler:
         #"Dolgu kelime analizi"
         print(f"Metin analizi başlıyor")
 
-        text_lower = text.lower()
-        total_fillers = 0
+        result = self._score_fillers(text)
 
-        for category, variations in FILLER_WORDS_TR.items():
-            for variation in variations:
-                pattern = r'\b' + re.escape(variation) + r'\b'
-                total_fillers += len(re.findall(pattern, text_lower))
+        print(f"Dolgu oranı: %{result['filler_ratio']:.1f}, Skor: {result['filler_score']:.1f}/100")
+        return result
+
+    def analyze_texts_for_fillers(self, texts: list) -> list:
+        """Arşivlenmiş transkriptleri toplu yeniden puanlama (çağrı başına çıktı yazdırılmaz)"""
+        return [self._score_fillers(text) for text in texts]
+
+    def _score_fillers(self, text: str) -> dict:
+        """Tek geçişte dolgu kelimelerini bulur; kategori bazlı sayılar ve konumlarla puanlar"""
+        matches = FILLER_DETECTOR.find(text)
+        total_fillers = len(matches)
+        counts = {}
+        for category, _, _, _ in matches:
+            counts[category] = counts.get(category, 0) + 1
 
         word_count = len(text.split())
         filler_ratio = (total_fillers / word_count * 100) if word_count > 0 else 0
@@ -188,13 +390,14 @@ class AnalysisHandler:
         else:
             rating = "zayıf"
 
-        print(f"Dolgu oranı: %{filler_ratio:.1f}, Skor: {filler_score:.1f}/100")
-
         return {
             'filler_score': round(filler_score, 1),
             'filler_ratio': round(filler_ratio, 1),
             'total_count': total_fillers,
-            'rating': rating
+            'rating': rating,
+            'counts': counts,
+            'positions': [{'filler': category, 'text': matched, 'start': start, 'end': end}
+                          for category, matched, start, end in matches]
         }
 
     def calculate_overall_score(self, audio_metrics: dict, text_metrics: dict = None) -> dict:
@@ -0,0 +1,109 @@
+"""
+analysis_pool.py
+AnalysisHandler işini mülakat döngüsünden ayrı süreçlerde çalıştıran yürütücü.
+
+librosa/numba hesapları GIL'i uzun süre tuttuğu için ana thread'de çalıştırıldığında
+mülakat akışı bekler. Burada:
+- İşçi süreçler 'spawn' ile başlar (gRPC/PyAudio thread'leri fork edilmez);
+  librosa her işçide bir kez import edilip numba fonksiyonları ısıtılır.
+  warm_up() ilk soru çalarken çağrılır, böylece ilk cevabın analizi JIT beklemez
+- Mülakatta en fazla birkaç uzun cevap analiz edilir; varsayılan işçi sayısı 2 ile sınırlıdır
+- Ton analizi varsayılan olarak hızlı YIN ile yapılır; pyin (son cevap için rapordan
+  önce ~3 sn / 20 sn konuşma ekler) ANALYSIS_PITCH_MODE=pyin ile seçilebilir
+- PCM verisi paylaşımlı bellek (shared_memory) ile aktarılır, pickle edilmez
+- submit() bir Future döndürür; sonuçlar rapordan önce beklenebilir
+- İşçi sayısı ANALYSIS_WORKERS ortam değişkeni veya max_workers ile ayarlanır
+"""
+
+import os
+import multiprocessing as mp
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_MAX_WORKERS = 2  # Mülakat başına en fazla ~8 analiz; daha fazla süreç yalnızca açılışı yavaşlatır
+DEFAULT_PITCH_MODE = "fast"
+
+_handler = None  # İşçi süreç başına bir AnalysisHandler
+
+
+def default_workers() -> int:
+    """ANALYSIS_WORKERS veya min(DEFAULT_MAX_WORKERS, çekirdek sayısı - 1)"""
+    env = os.getenv("ANALYSIS_WORKERS")
+    if env:
+        return max(1, int(env))
+    return max(1, min(DEFAULT_MAX_WORKERS, (os.cpu_count() or 2) - 1))
+
+
+def _init_worker(pitch_mode: str):
+    """İşçi başlangıcı: librosa importu ve numba JIT ısınması (bir kez)"""
+    global _handler
+    from analysis_handler import AnalysisHandler
+    _handler = AnalysisHandler(pitch_mode=pitch_mode)
+    try:
+        # Kısa bir sinyal üzerinde tüm analiz yolları bir kez çalıştırılır (JIT derlemesi burada olur)
+        _handler.warm_up()
+    except Exception as e:
+        print(f"[UYARI] Analiz işçisi ısınma hatası: {e}")
+
+
+def _analyze_job(shm_name: str, nbytes: int, sample_rate: int, words: Optional[List[dict]]) -> Dict:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    pcm = None
+    try:
+        pcm = np.ndarray((nbytes // 2,), dtype=np.int16, buffer=shm.buf)
+        # analyze_buffer diziyi float32'ye çevirir; paylaşımlı belleğe bu dönüşümden sonra ihtiyaç kalmaz
+        return _handler.analyze_buffer(pcm, sample_rate, words=words)
+    finally:
+        del pcm  # shm.buf görünümü bırakılmadan close() BufferError verir
+        shm.close()
+
+
+class AnalysisExecutor:
+    """Süreç havuzuyla çalışan ses analizi yürütücüsü"""
+
+    def __init__(self, max_workers: Optional[int] = None, pitch_mode: Optional[str] = None):
+        self.max_workers = max_workers or default_workers()
+        self.pitch_mode = pitch_mode or os.getenv("ANALYSIS_PITCH_MODE", DEFAULT_PITCH_MODE)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.pitch_mode,),
+        )
+
+    def warm_up(self):
+        """İşçi süreçlerini hemen başlat ve ısıt (ilk iş beklemesin); çağıranı bekletmez"""
+        for _ in range(self.max_workers):
+            self._pool.submit(os.getpid)
+
+    def submit(self, pcm, sample_rate: int = 16000, words: Optional[List[dict]] = None) -> Future:
+        """16-bit mono PCM'i paylaşımlı belleğe kopyalayıp analizi kuyruğa ekler"""
+        data = memoryview(pcm).cast("B")
+        nbytes = len(data)
+        shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        shm.buf[:nbytes] = data
+        try:
+            future = self._pool.submit(_analyze_job, shm.name, nbytes, sample_rate, words)
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+
+        def _release(_future, shm=shm):
+            shm.close()
+            shm.unlink()
+
+        future.add_done_callback(_release)
+        return future
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
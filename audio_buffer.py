@@ -0,0 +1,138 @@
+"""
+audio_buffer.py
+Kayıt için önceden ayrılmış PCM halka tamponu ve artımlı (chunk chunk) WAV yazıcı.
+
+Kayıt sırasında chunk'lar listeye eklenip sonda birleştirilmek yerine sabit
+boyutlu bir bytearray'e yazılır; analiz bu tamponu kopyalamadan (memoryview /
+np.frombuffer) okuyabilir. Uzun cevap sınırlarında tampon başlangıçta küçük
+ayrılır ve yalnızca kayıt uzadıkça (ikiye katlanarak) en fazla kapasiteye büyür.
+"""
+
+import math
+import wave
+from typing import Optional
+
+import numpy as np
+
+SAMPLE_WIDTH = 2  # paInt16
+
+
+class PCMRingBuffer:
+    """
+    Önceden ayrılmış, sabit kapasiteli 16-bit PCM halka tamponu.
+    Kapasite aşılırsa en eski veri üzerine yazılır (bellek sınırlı kalır).
+    initial_bytes verilirse tampon o boyutta başlar ve gerektikçe kapasiteye kadar büyür.
+    """
+
+    def __init__(self, capacity_bytes: int, sample_rate: int, channels: int = 1,
+                 sample_width: int = SAMPLE_WIDTH, initial_bytes: Optional[int] = None):
+        frame_bytes = channels * sample_width
+        self.capacity = capacity_bytes - capacity_bytes % frame_bytes
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        if initial_bytes is None:
+            initial_bytes = self.capacity
+        self._buf = bytearray(min(self.capacity, initial_bytes - initial_bytes % frame_bytes))
+        self._pos = 0
+        self.total_bytes = 0
+
+    @classmethod
+    def for_duration(cls, seconds: float, sample_rate: int, chunk: int, channels: int = 1,
+                     sample_width: int = SAMPLE_WIDTH, initial_seconds: Optional[float] = None) -> "PCMRingBuffer":
+        """
+        Verilen süreyi chunk katına yuvarlayıp (+1 chunk pay) taşmadan tutan tampon.
+        initial_seconds verilirse yalnızca o kadarı önceden ayrılır, gerisi gerektikçe.
+        """
+        bytes_per_chunk = chunk * channels * sample_width
+        chunks = math.ceil(seconds * sample_rate / chunk) + 1
+        initial = None
+        if initial_seconds is not None:
+            initial = (math.ceil(initial_seconds * sample_rate / chunk) + 1) * bytes_per_chunk
+        return cls(chunks * bytes_per_chunk, sample_rate, channels, sample_width, initial_bytes=initial)
+
+    def _grow(self, needed: int) -> None:
+        """Halka dönmeden önce tamponu (ikiye katlayarak) en fazla kapasiteye büyütür"""
+        frame_bytes = self.channels * self.sample_width
+        size = min(self.capacity, max(needed, 2 * len(self._buf)))
+        size -= size % frame_bytes
+        self._buf.extend(bytes(size - len(self._buf)))
+
+    def append(self, data) -> None:
+        n = len(data)
+        if not self.wrapped and self.total_bytes + n > len(self._buf) and len(self._buf) < self.capacity:
+            self._grow(self.total_bytes + n)
+        if n >= self.capacity:
+            # Tek parça tampondan büyükse sadece son kısmı tutulur
+            self._buf[:] = memoryview(data)[n - self.capacity:]
+            self._pos = 0
+        else:
+            first = min(n, self.capacity - self._pos)
+            self._buf[self._pos:self._pos + first] = memoryview(data)[:first]
+            rest = n - first
+            if rest:
+                self._buf[:rest] = memoryview(data)[first:]
+            self._pos = (self._pos + n) % self.capacity
+        self.total_bytes += n
+
+    @property
+    def wrapped(self) -> bool:
+        return self.total_bytes > self.capacity
+
+    def __len__(self) -> int:
+        return min(self.total_bytes, self.capacity)
+
+    @property
+    def duration(self) -> float:
+        """Tamponda tutulan sesin süresi (saniye)"""
+        return len(self) / (self.sample_rate * self.channels * self.sample_width)
+
+    @property
+    def recorded_duration(self) -> float:
+        """Toplam kaydedilen süre (saniye) - halka dönmüş olsa bile"""
+        return self.total_bytes / (self.sample_rate * self.channels * self.sample_width)
+
+    def view(self) -> memoryview:
+        """
+        Kaydedilen PCM verisi. Halka dönmediyse kopyasız memoryview döner;
+        döndüyse (eskiden yeniye sıralı) tek seferlik bir kopya oluşturulur.
+        """
+        if not self.wrapped:
+            if self.total_bytes == self.capacity:
+                return memoryview(self._buf)
+            return memoryview(self._buf)[:self._pos]
+        return memoryview(bytes(self._buf[self._pos:]) + bytes(self._buf[:self._pos]))
+
+    def as_array(self) -> np.ndarray:
+        """int16 NumPy görünümü (view() ile aynı bellek)"""
+        return np.frombuffer(self.view(), dtype=np.int16)
+
+    def clear(self) -> None:
+        self._pos = 0
+        self.total_bytes = 0
+
+
+class WavStreamWriter:
+    """PCM chunk'larını yakalandıkları anda WAV dosyasına yazar; başlık kapanışta güncellenir"""
+
+    def __init__(self, path: str, sample_rate: int, channels: int = 1, sample_width: int = SAMPLE_WIDTH):
+        self.path = path
+        self._wf: Optional[wave.Wave_write] = wave.open(path, 'wb')
+        self._wf.setnchannels(channels)
+        self._wf.setsampwidth(sample_width)
+        self._wf.setframerate(sample_rate)
+
+    def write(self, data) -> None:
+        self._wf.writeframesraw(data)
+
+    def close(self) -> str:
+        if self._wf is not None:
+            self._wf.close()  # RIFF/data uzunlukları burada yazılır
+            self._wf = None
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
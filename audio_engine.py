@@ -0,0 +1,344 @@
+"""
+audio_engine.py
+Oturum boyunca açık kalan tam çift yönlü (full-duplex) ses motoru.
+
+- Tek PyAudio örneği; giriş akışı oturum boyunca açık, çıkış akışları formata göre önbellekte
+- Soru çalarken mikrofon dinlenir; aday araya girerse (barge-in) oynatma durur ve
+  konuşmanın başı (ön tampon ile) cevap kaydına aktarılır
+- Soru ile cevap arasında cihaz açma/kapama ve sabit bekleme yoktur
+
+Kullanım:
+    engine = AudioEngine().start()
+    engine.play(pcm, rate=24000)
+    record_and_convert(source=EngineSource(engine))
+    engine.close()
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from vad import frame_features, FRAME_MS, MIN_SPEECH_DB
+
+BARGE_IN_MARGIN_DB = 12.0     # Oynatma sırasındaki (yankı dahil) taban seviyenin bu kadar üstü
+BARGE_IN_MIN_SECONDS = 0.25   # Araya girme sayılması için kesintisiz konuşma süresi
+BARGE_IN_BASELINE_SECONDS = 0.3  # Yankı mikrofona ulaştıktan sonra taban seviye ölçülür
+ECHO_WINDOW_SECONDS = 0.06    # Referans-mikrofon hizalamasındaki gecikme belirsizliği payı
+PREROLL_SECONDS = 0.3         # Araya girmede konuşma başlangıcından önce saklanan ses
+
+
+class AudioEngine:
+    """Oturum başına bir kez açılan, giriş ve çıkış akışlarını açık tutan ses motoru"""
+
+    def __init__(self, rate: int = 16000, chunk: int = 1024, channels: int = 1):
+        self.rate = rate
+        self.chunk = chunk
+        self.channels = channels
+        self._pa = None
+        self._in_stream = None
+        self._out_streams: Dict[Tuple[int, int, int], object] = {}
+        self._buf = deque()
+        self._cond = threading.Condition()
+        self._armed = False
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop_playback = threading.Event()
+        self.last_barged_in = False
+
+    def start(self) -> "AudioEngine":
+        import pyaudio
+        self._pa = pyaudio.PyAudio()
+        self._in_stream = self._pa.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.rate,
+            input=True,
+            frames_per_buffer=self.chunk
+        )
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="audio-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _capture_loop(self):
+        """Mikrofonu sürekli okur; yalnızca kayıt/oynatma sırasında (armed) tampona ekler"""
+        while self._running:
+            try:
+                data = self._in_stream.read(self.chunk, exception_on_overflow=False)
+            except Exception as e:
+                if self._running:
+                    print(f"Mikrofon okuma hatası: {e}")
+                break
+            with self._cond:
+                if self._armed:
+                    self._buf.append(data)
+                    self._cond.notify_all()
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def arm(self):
+        """Mikrofon verisini toplamaya başla"""
+        with self._cond:
+            self._armed = True
+
+    def disarm(self):
+        """Toplamayı bırak ve bekleyen veriyi at"""
+        with self._cond:
+            self._armed = False
+            self._buf.clear()
+
+    def read_chunk(self, timeout: float = 1.0) -> Optional[bytes]:
+        """Sıradaki mikrofon chunk'ı (motor kapandıysa None)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._buf or not self._running, timeout)
+            if self._buf:
+                return self._buf.popleft()
+            return None if not self._running else b""
+
+    def _output_stream(self, rate: int, channels: int, sample_width: int):
+        key = (rate, channels, sample_width)
+        stream = self._out_streams.get(key)
+        if stream is None:
+            stream = self._pa.open(
+                format=self._pa.get_format_from_width(sample_width),
+                channels=channels,
+                rate=rate,
+                output=True
+            )
+            self._out_streams[key] = stream
+        return stream
+
+    def stop_playback(self):
+        """Çalan sesi durdur (başka thread'den çağrılabilir)"""
+        self._stop_playback.set()
+
+    def _echo_delay(self, stream) -> float:
+        """Çalınan sesin mikrofona ulaşma gecikmesi: çıkış + giriş gecikmesi + bir chunk"""
+        delay = self.chunk / self.rate
+        for getter in (getattr(stream, "get_output_latency", None),
+                       getattr(self._in_stream, "get_input_latency", None)):
+            try:
+                delay += float(getter()) if getter is not None else 0.0
+            except Exception:
+                pass
+        return delay
+
+    def play(self, pcm, rate: int, channels: int = 1, sample_width: int = 2,
+             barge_in: bool = True) -> bool:
+        """
+        PCM sesi açık çıkış akışından çalar; bu sırada mikrofon dinlenir.
+        Aday araya girerse oynatma durur ve True döner; konuşmanın başı kayda aktarılır.
+        Araya girilmezse oynatma sırasında toplanan (yankı) veri atılır.
+        """
+        return self.play_chunks([pcm], rate, channels, sample_width, barge_in=barge_in)
+
+    def play_chunks(self, chunks: Iterable, rate: int, channels: int = 1, sample_width: int = 2,
+                    barge_in: bool = True) -> bool:
+        """
+        Aynı formattaki PCM parçalarını (ör. cümle cümle sentezlenen soru) tek oynatma
+        oturumunda art arda çalar. Parçalar arasında boşluk bırakılmaz; araya girme
+        tabanı bir kez ölçülür ve çıkış tamponu yalnızca son parçadan sonra boşaltılır.
+        chunks tembel bir iterable olabilir (sonraki parça çalınırken hazırlanır).
+        """
+        stream = self._output_stream(rate, channels, sample_width)
+        step = self.chunk * channels * sample_width
+
+        self._stop_playback.clear()
+        self.last_barged_in = False
+        with self._cond:
+            self._buf.clear()
+        self.arm()
+        detector = _BargeInDetector(self.rate, self.chunk, self._echo_delay(stream)) if barge_in else None
+
+        try:
+            for pcm in chunks:
+                data = memoryview(pcm).cast("B")
+                for offset in range(0, len(data), step):
+                    if self._stop_playback.is_set():
+                        return self.last_barged_in
+                    piece = data[offset:offset + step]
+                    stream.write(piece)
+                    if detector is None:
+                        continue
+                    detector.add_reference(piece, rate, channels, sample_width)
+                    if self._poll_barge_in(detector):
+                        return self.last_barged_in
+            return self.last_barged_in
+        finally:
+            self._finish_playback(stream, detector)
+
+    def _poll_barge_in(self, detector: "_BargeInDetector") -> bool:
+        """Oynatma sırasında gelen yeni mikrofon chunk'larını dedektöre verir"""
+        with self._cond:
+            # Yalnızca yeni öğeler okunur (deque sondan indekslemede hızlıdır, kopya yok)
+            new_chunks = [self._buf[i] for i in range(detector.checked, len(self._buf))]
+        for chunk in new_chunks:
+            if detector.feed(chunk):
+                self.last_barged_in = True
+                print("🎙️ Aday araya girdi, soru oynatması durduruldu", flush=True)
+                return True
+        return False
+
+    def _finish_playback(self, stream, detector: Optional["_BargeInDetector"]):
+        if self.last_barged_in:
+            # Konuşmanın başlangıcından biraz öncesini sakla, öncesindeki yankıyı at
+            preroll_chunks = max(1, int(PREROLL_SECONDS * self.rate / self.chunk))
+            with self._cond:
+                keep_from = max(0, detector.onset_chunk - preroll_chunks)
+                for _ in range(min(keep_from, len(self._buf))):
+                    self._buf.popleft()
+        else:
+            # Çıkış tamponunun boşalmasını bekle, sonra oynatma yankısını at
+            try:
+                time.sleep(stream.get_output_latency())
+            except Exception:
+                pass
+            with self._cond:
+                self._buf.clear()
+
+    def close(self):
+        self._running = False
+        self.disarm()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        for stream in self._out_streams.values():
+            try:
+                stream.stop_stream()
+                stream.close()
+            except Exception:
+                pass
+        self._out_streams.clear()
+        if self._in_stream is not None:
+            try:
+                self._in_stream.stop_stream()
+                self._in_stream.close()
+            except Exception:
+                pass
+            self._in_stream = None
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+
+
+class _BargeInDetector:
+    """
+    Oynatma sırasında mikrofonda adayın konuşmasını yankıdan ayırır.
+
+    Çalınan ses (referans) çerçeve enerjileriyle izlenir. Taban seviye ancak referans
+    mikrofona ulaştıktan sonra (TTS baştaki sessizlik + cihaz gecikmesi) ölçülür; aynı
+    pencerede yankı kazancı (mikrofon - referans, dB) kestirilir. Sonrasında bir çerçeve,
+    hem taban eşiğini hem de o anki referansın beklenen yankısını BARGE_IN_MARGIN_DB
+    aşarsa konuşma sayılır.
+    """
+
+    def __init__(self, rate: int, chunk: int, echo_delay: float):
+        self.rate = rate
+        self.chunk = chunk
+        self.frame_len = int(rate * FRAME_MS / 1000)
+        self.frame_sec = self.frame_len / rate
+        self.delay_frames = int(round(echo_delay / self.frame_sec))
+        self.window = max(1, int(ECHO_WINDOW_SECONDS / self.frame_sec))
+        self.checked = 0              # İşlenen mikrofon chunk sayısı
+        self.onset_chunk: Optional[int] = None
+        self._mic_frames = 0
+        self._carry = np.zeros(0, dtype=np.int16)
+        self._ref_db: list = []       # Çalınan sesin çerçeve enerjileri (oynatma zaman çizelgesi)
+        self._ref_carry = np.zeros(0, dtype=np.int16)
+        self._ref_onset: Optional[int] = None
+        self._baseline: list = []
+        self._coupling: list = []
+        self.threshold_db: Optional[float] = None
+        self.echo_gain_db: Optional[float] = None
+        self._speech_run = 0.0
+
+    def add_reference(self, data, rate: int, channels: int, sample_width: int):
+        """Çıkışa yazılan parçanın enerjisini referans zaman çizelgesine ekler"""
+        frame_len = int(rate * FRAME_MS / 1000)
+        if sample_width != 2:
+            # Enerji hesaplanamıyor: referans sessiz kabul edilir (yalnızca taban eşiği)
+            n = len(data) // (channels * sample_width * frame_len)
+            self._ref_db.extend([-np.inf] * n)
+            return
+        x = np.frombuffer(data, dtype=np.int16)
+        if channels > 1:
+            x = x[:len(x) - len(x) % channels].reshape(-1, channels)[:, 0]
+        x = np.concatenate([self._ref_carry, x])
+        energy_db, _zcr = frame_features(x, frame_len)
+        self._ref_carry = x[len(energy_db) * frame_len:]
+        if self._ref_onset is None:
+            active = np.flatnonzero(energy_db > MIN_SPEECH_DB)
+            if len(active):
+                self._ref_onset = len(self._ref_db) + int(active[0])
+        self._ref_db.extend(energy_db.tolist())
+
+    def _expected_ref_db(self, mic_frame: int) -> float:
+        """Mikrofon çerçevesine denk gelen (gecikmeli) referans enerjisi; pencere içi en yüksek"""
+        center = mic_frame - self.delay_frames
+        lo, hi = max(0, center - self.window), min(len(self._ref_db), center + self.window + 1)
+        return max(self._ref_db[lo:hi]) if lo < hi else -np.inf
+
+    def feed(self, chunk) -> bool:
+        """Bir mikrofon chunk'ını işler; araya girme algılandıysa True"""
+        self.checked += 1
+        x = np.concatenate([self._carry, np.frombuffer(chunk, dtype=np.int16)])
+        energy_db, _zcr = frame_features(x, self.frame_len)
+        self._carry = x[len(energy_db) * self.frame_len:]
+
+        for e in energy_db:
+            frame = self._mic_frames
+            self._mic_frames += 1
+            # Referans henüz mikrofona ulaşmadıysa ne taban ölçülür ne de algılama yapılır
+            arrival = (self._ref_onset + self.delay_frames) if self._ref_onset is not None else None
+            if arrival is None or frame < arrival:
+                continue
+            ref_db = self._expected_ref_db(frame)
+            if self.threshold_db is None:
+                self._baseline.append(e)
+                if ref_db > MIN_SPEECH_DB:
+                    self._coupling.append(e - ref_db)
+                if len(self._baseline) * self.frame_sec >= BARGE_IN_BASELINE_SECONDS:
+                    self.threshold_db = max(float(np.median(self._baseline)) + BARGE_IN_MARGIN_DB, MIN_SPEECH_DB)
+                    if self._coupling:
+                        self.echo_gain_db = float(np.median(self._coupling))
+                continue
+
+            threshold = self.threshold_db
+            if self.echo_gain_db is not None and ref_db > MIN_SPEECH_DB:
+                threshold = max(threshold, ref_db + self.echo_gain_db + BARGE_IN_MARGIN_DB)
+            self._speech_run = self._speech_run + self.frame_sec if e > threshold else 0.0
+            if self._speech_run >= BARGE_IN_MIN_SECONDS:
+                self.onset_chunk = self.checked - 1 - int(self._speech_run * self.rate / self.chunk)
+                return True
+        return False
+
+
+class EngineSource:
+    """AudioEngine'in açık mikrofonunu record_and_convert için ses kaynağı olarak sunar"""
+
+    def __init__(self, engine: AudioEngine):
+        self.engine = engine
+        self.rate = engine.rate
+
+    def open(self):
+        # Oynatma sırasında zaten toplanıyorsa (ör. araya girme) tampon korunur
+        self.engine.arm()
+        return self
+
+    def read(self) -> Optional[bytes]:
+        while True:
+            data = self.engine.read_chunk()
+            if data is None or data:
+                return data
+
+    def close(self):
+        self.engine.disarm()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,302 @@
+"""
+audio_features.py
+Sessizlik, enerji, onset ve ton analizleri için tek geçişte ortak çerçeveleme.
+
+Eskiden pydub sessizlik taraması, librosa.feature.rms ve onset zarfı sinyali
+ayrı ayrı çerçeveliyor (onset kendi STFT'sini de hesaplıyordu). Burada sinyal
+bir kez çerçevelenir (kopyasız strided görünüm), çerçeve gücü ve STFT genliği
+bir kez hesaplanır; RMS, dBFS sessizlik bölütleri, onset gücü ve spektral akı
+bu ortak dizilerden NumPy ile türetilir.
+
+Çerçeveleme librosa varsayılanlarıyla aynıdır (n_fft=2048, hop=512, center=True,
+sıfır dolgu), böylece sonuçlar eski metriklerle karşılaştırılabilir.
+
+Sessizlik tespiti pydub.silence.detect_silence ile birebir aynı sonucu verir
+(1 ms adımlı pencere, tam sayı RMS), ancak Python döngüsü yerine kümülatif
+toplamla tüm pencereler tek seferde hesaplanır. pydub ile doğrulama:
+    python audio_features.py fixtures/
+Onset zarfı ve onset sayısının librosa ile doğrulanması:
+    python audio_features.py fixtures/ --onsets
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pitch import FRAME_LENGTH, HOP_LENGTH
+
+SILENCE_THRESH_DBFS = -40.0
+MIN_SILENCE_SEC = 0.5
+ONSET_DELTA = 0.07   # librosa.onset.onset_detect varsayılanı
+TOP_DB = 80.0        # librosa.power_to_db varsayılanı
+
+
+def detect_silence(samples: np.ndarray, sr: int, min_silence_len: int = 500,
+                   silence_thresh: float = -40, seek_step: int = 1) -> List[List[int]]:
+    """
+    pydub.silence.detect_silence'ın vektörel eşdeğeri.
+    samples: 16-bit mono PCM (int16). Dönüş: [[başlangıç_ms, bitiş_ms], ...]
+    """
+    samples = np.asarray(samples, dtype=np.int16)
+    seg_len = int(round(len(samples) * 1000 / sr))  # pydub: len(segment) ms
+    if seg_len < min_silence_len:
+        return []
+
+    # pydub: eşik = 10^(dB/20) * 2^15, pencere RMS'i audioop.rms gibi tam sayıya kesilir
+    thresh = (10 ** (silence_thresh / 20.0)) * 32768
+    last_start = seg_len - min_silence_len
+    starts_ms = np.arange(0, last_start + 1, seek_step)
+    if last_start % seek_step:
+        starts_ms = np.append(starts_ms, last_start)
+
+    # ms -> örnek indeksi (pydub frame_count: int(ms * sr / 1000))
+    begin = (starts_ms * sr) // 1000
+    end = np.minimum(((starts_ms + min_silence_len) * sr) // 1000, len(samples))
+    squares = np.concatenate([[0], np.cumsum(samples.astype(np.int64) ** 2)])
+    # pydub eksik örnekleri sıfırla doldurur; bölen pencerenin beklenen uzunluğudur
+    expected = np.maximum(((starts_ms + min_silence_len) * sr) // 1000 - begin, 1)
+    rms = np.floor(np.sqrt((squares[end] - squares[begin]) / expected))
+    silence_starts = starts_ms[rms <= thresh]
+    if not len(silence_starts):
+        return []
+
+    # Ardışık sessiz pencereleri birleştir: arada min_silence_len'den büyük boşluk varsa yeni aralık
+    gaps = np.diff(silence_starts)
+    breaks = np.flatnonzero((gaps != seek_step) & (gaps > min_silence_len))
+    range_starts = np.concatenate([[silence_starts[0]], silence_starts[breaks + 1]])
+    range_lasts = np.concatenate([silence_starts[breaks], [silence_starts[-1]]])
+    return [[int(s), int(e) + min_silence_len] for s, e in zip(range_starts, range_lasts)]
+
+
+@lru_cache(maxsize=4)
+def _mel_basis(sr: int, n_fft: int) -> np.ndarray:
+    import librosa
+    return librosa.filters.mel(sr=sr, n_fft=n_fft).astype(np.float32)
+
+
+@lru_cache(maxsize=4)
+def _hann(n: int) -> np.ndarray:
+    """Periyodik Hann penceresi (scipy get_window('hann') ile aynı)"""
+    return (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n) / n)).astype(np.float32)
+
+
+class SharedFrameFeatures:
+    """Bir cevabın ortak çerçeveleri ve bunlardan tembel (lazy) hesaplanan öznitelikler"""
+
+    def __init__(self, y: np.ndarray, sr: int, frame_length: int = FRAME_LENGTH,
+                 hop_length: int = HOP_LENGTH):
+        self.sr = sr
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        y = np.ascontiguousarray(y, dtype=np.float32)
+        self.duration = len(y) / sr
+        padded = np.pad(y, frame_length // 2)
+        n = max(0, 1 + (len(padded) - frame_length) // hop_length)
+        self._padded = padded  # Görünümün dayandığı bellek
+        self.frames = np.lib.stride_tricks.as_strided(
+            padded, shape=(n, frame_length), strides=(padded.strides[0] * hop_length, padded.strides[0])
+        )
+        self._power: Optional[np.ndarray] = None
+        self._magnitude: Optional[np.ndarray] = None
+        self._onset_env: Optional[np.ndarray] = None
+
+    @property
+    def frame_sec(self) -> float:
+        return self.hop_length / self.sr
+
+    @property
+    def power(self) -> np.ndarray:
+        """Çerçeve başına ortalama güç"""
+        if self._power is None:
+            self._power = np.einsum('ij,ij->i', self.frames, self.frames) / self.frame_length
+        return self._power
+
+    @property
+    def rms(self) -> np.ndarray:
+        """librosa.feature.rms ile aynı çerçeve RMS değerleri"""
+        return np.sqrt(self.power)
+
+    @property
+    def dbfs(self) -> np.ndarray:
+        """Çerçeve seviyesi (dBFS, tam ölçek = 1.0)"""
+        return 10.0 * np.log10(self.power + 1e-12)
+
+    @property
+    def magnitude(self) -> np.ndarray:
+        """STFT genliği (frekans, zaman) - bir kez hesaplanır"""
+        if self._magnitude is None:
+            spec = np.fft.rfft(self.frames * _hann(self.frame_length), axis=1)
+            self._magnitude = np.abs(spec).astype(np.float32).T
+        return self._magnitude
+
+    def energy_consistency(self) -> float:
+        """Enerji tutarlılığı: 1 - (RMS std / RMS ort.)"""
+        rms = self.rms
+        return 1.0 - min(float(np.std(rms)) / (float(np.mean(rms)) + 1e-6), 1.0)
+
+    @property
+    def pcm16(self) -> np.ndarray:
+        """int16 örnekler (analiz float'ı 16-bit PCM / 32768 olduğundan kayıpsız geri dönüşüm)"""
+        y = self._padded[self.frame_length // 2:len(self._padded) - self.frame_length // 2]
+        return np.clip(np.round(y * 32768.0), -32768, 32767).astype(np.int16)
+
+    def silences(self, thresh_db: float = SILENCE_THRESH_DBFS,
+                 min_silence_sec: float = MIN_SILENCE_SEC) -> List[Tuple[float, float]]:
+        """pydub detect_silence ile aynı sessizlik bölütleri (başlangıç, bitiş) saniye"""
+        ranges = detect_silence(self.pcm16, self.sr, min_silence_len=int(round(min_silence_sec * 1000)),
+                                silence_thresh=thresh_db)
+        return [(start / 1000.0, end / 1000.0) for start, end in ranges]
+
+    def onset_envelope(self) -> np.ndarray:
+        """librosa.onset.onset_strength eşdeğeri: log-mel spektrumunda pozitif farkların ortalaması"""
+        if self._onset_env is None:
+            n_frames = self.frames.shape[0]
+            mel = _mel_basis(self.sr, self.frame_length) @ (self.magnitude ** 2)
+            mel_db = 10.0 * np.log10(np.maximum(mel, 1e-10))
+            mel_db = np.maximum(mel_db, mel_db.max() - TOP_DB) if mel_db.size else mel_db
+            diff = np.maximum(mel_db[:, 1:] - mel_db[:, :-1], 0.0)
+            # librosa (center=True) fark gecikmesi + yarım pencere kadar başa sıfır ekler:
+            # lag + n_fft // (2 * hop); zarf aynı zamana hizalanır ve çerçeve sayısına kırpılır
+            pad = 1 + self.frame_length // (2 * self.hop_length)
+            env = diff.mean(axis=0) if diff.size else np.zeros(0)
+            self._onset_env = np.concatenate([np.zeros(pad), env])[:n_frames]
+        return self._onset_env
+
+    def spectral_flux(self) -> np.ndarray:
+        """Çerçeveler arası pozitif genlik değişiminin L2 normu"""
+        mag = self.magnitude
+        if mag.shape[1] < 2:
+            return np.zeros(mag.shape[1])
+        diff = np.maximum(mag[:, 1:] - mag[:, :-1], 0.0)
+        return np.concatenate([[0.0], np.sqrt(np.sum(diff * diff, axis=0))])
+
+    def onset_count(self) -> int:
+        """librosa.onset.onset_detect varsayılanlarıyla tepe seçimi; onset sayısı"""
+        import librosa
+        env = self.onset_envelope().astype(np.float64)
+        if not len(env):
+            return 0
+        env = env - env.min()
+        peak = env.max()
+        if peak <= 0:
+            return 0
+        env /= peak
+        frames_per_sec = self.sr / self.hop_length
+        onsets = librosa.util.peak_pick(
+            env,
+            pre_max=int(0.03 * frames_per_sec), post_max=int(0.00 * frames_per_sec) + 1,
+            pre_avg=int(0.10 * frames_per_sec), post_avg=int(0.10 * frames_per_sec) + 1,
+            wait=int(0.03 * frames_per_sec), delta=ONSET_DELTA,
+        )
+        return int(len(onsets))
+
+
+def validate_against_pydub(fixture_dir: str, min_silence_len: int = 500, silence_thresh: float = -40) -> Dict:
+    """Klasördeki WAV'larda vektörel detect_silence ile pydub çıktısını ve sürelerini karşılaştırır"""
+    from pydub import AudioSegment
+    from pydub.silence import detect_silence as pydub_detect_silence
+
+    results = []
+    for fn in sorted(os.listdir(fixture_dir)):
+        if not fn.endswith(".wav"):
+            continue
+        path = os.path.join(fixture_dir, fn)
+        with wave.open(path, "rb") as wf:
+            if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+                print(f"[UYARI] {fn}: yalnızca 16-bit mono desteklenir, atlandı")
+                continue
+            sr = wf.getframerate()
+            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+        started = time.perf_counter()
+        ours = detect_silence(samples, sr, min_silence_len, silence_thresh)
+        ours_sec = time.perf_counter() - started
+
+        audio = AudioSegment.from_wav(path)
+        started = time.perf_counter()
+        reference = pydub_detect_silence(audio, min_silence_len=min_silence_len, silence_thresh=silence_thresh)
+        pydub_sec = time.perf_counter() - started
+
+        results.append({
+            "file": fn,
+            "match": ours == reference,
+            "ranges": len(reference),
+            "numpy_seconds": round(ours_sec, 4),
+            "pydub_seconds": round(pydub_sec, 4),
+        })
+
+    summary = {"files": len(results)}
+    if results:
+        numpy_total = sum(r["numpy_seconds"] for r in results)
+        summary.update({
+            "match_rate": round(sum(r["match"] for r in results) / len(results), 3),
+            "speedup": round(sum(r["pydub_seconds"] for r in results) / numpy_total, 1) if numpy_total > 0 else None,
+        })
+    return {"summary": summary, "results": results}
+
+
+def validate_against_librosa(fixture_dir: str) -> Dict:
+    """
+    Klasördeki WAV'larda onset zarfını librosa.onset.onset_strength ile, onset sayısını
+    librosa.onset.onset_detect ile karşılaştırır (onset tabanlı WPM yedeği aynı kalmalı)
+    """
+    import librosa
+
+    results = []
+    for fn in sorted(os.listdir(fixture_dir)):
+        if not fn.endswith(".wav"):
+            continue
+        path = os.path.join(fixture_dir, fn)
+        with wave.open(path, "rb") as wf:
+            if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+                print(f"[UYARI] {fn}: yalnızca 16-bit mono desteklenir, atlandı")
+                continue
+            sr = wf.getframerate()
+            y = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+
+        features = SharedFrameFeatures(y, sr)
+        ours_env = features.onset_envelope()
+        ours_count = features.onset_count()
+
+        reference_env = librosa.onset.onset_strength(y=y, sr=sr, n_fft=features.frame_length,
+                                                     hop_length=features.hop_length)
+        reference_count = len(librosa.onset.onset_detect(y=y, sr=sr, hop_length=features.hop_length))
+
+        n = min(len(ours_env), len(reference_env))
+        max_diff = float(np.max(np.abs(ours_env[:n] - reference_env[:n]))) if n else 0.0
+        results.append({
+            "file": fn,
+            "match": len(ours_env) == len(reference_env) and ours_count == reference_count,
+            "onsets": ours_count,
+            "librosa_onsets": reference_count,
+            "max_env_diff": round(max_diff, 4),
+        })
+
+    summary = {"files": len(results)}
+    if results:
+        summary["match_rate"] = round(sum(r["match"] for r in results) / len(results), 3)
+    return {"summary": summary, "results": results}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Kullanım: python audio_features.py <wav_klasörü> [--onsets]")
+        sys.exit(1)
+    if "--onsets" in sys.argv[2:]:
+        report = validate_against_librosa(sys.argv[1])
+        for row in report["results"]:
+            print(f"{row['file']}: {'AYNI' if row['match'] else 'FARKLI'} | onset {row['onsets']} "
+                  f"(librosa {row['librosa_onsets']}), zarf farkı en fazla {row['max_env_diff']}")
+    else:
+        report = validate_against_pydub(sys.argv[1])
+        for row in report["results"]:
+            print(f"{row['file']}: {'AYNI' if row['match'] else 'FARKLI'} ({row['ranges']} aralık) | "
+                  f"numpy {row['numpy_seconds']} sn, pydub {row['pydub_seconds']} sn")
+    print("\n=== ÖZET ===")
+    print(json.dumps(report["summary"], ensure_ascii=False, indent=2))
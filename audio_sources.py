@@ -0,0 +1,237 @@
+"""
+audio_sources.py
+record_and_convert için takılabilir ses kaynakları ve yerel (ağsız) tanıyıcı.
+
+- MicrophoneSource: canlı PyAudio mikrofonu (varsayılan)
+- WavFileSource: WAV dosyasını gerçek zamanlı veya sınırsız hızda tekrar oynatır
+- DirectorySource: klasördeki WAV'ları sırayla her tur için kaynak olarak verir
+- ScriptedRecognizer: Google STT yerine, önceden yazılmış transkriptleri döndüren
+  streaming tanıyıcı (SpeechClient.streaming_recognize ile aynı arayüz)
+
+Donanım ve ağ olmadan tüm kayıt -> STT -> analiz hattını ölçmek için:
+    python audio_sources.py fixtures/            # sınırsız hız
+    python audio_sources.py fixtures/ --realtime # gerçek zamanlı
+Her <ad>.wav için varsa <ad>.txt transkript olarak kullanılır.
+"""
+
+import os
+import sys
+import time
+import wave
+from typing import Callable, Iterable, List, Optional, Union
+
+
+class MicrophoneSource:
+    """Canlı mikrofon girişi"""
+
+    def __init__(self, rate: int = 16000, chunk: int = 1024, channels: int = 1):
+        self.rate = rate
+        self.chunk = chunk
+        self.channels = channels
+        self._pa = None
+        self._stream = None
+
+    def open(self):
+        import pyaudio
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.rate,
+            input=True,
+            frames_per_buffer=self.chunk
+        )
+        return self
+
+    def read(self) -> Optional[bytes]:
+        return self._stream.read(self.chunk, exception_on_overflow=False)
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class WavFileSource:
+    """
+    16-bit mono WAV dosyasını chunk chunk okur.
+    realtime=True ise chunk'lar mikrofon hızında (duvar saatine göre) verilir;
+    False ise bekleme yapılmaz (gerçek zamandan hızlı çalıştırma).
+    Dosya bittiğinde read() None döndürür.
+    """
+
+    def __init__(self, path: str, chunk: int = 1024, realtime: bool = False):
+        self.path = path
+        self.chunk = chunk
+        self.realtime = realtime
+        self.rate = None
+        self._wf = None
+        self._started = None
+        self._sent_frames = 0
+
+    def open(self):
+        self._wf = wave.open(self.path, 'rb')
+        if self._wf.getsampwidth() != 2 or self._wf.getnchannels() != 1:
+            self._wf.close()
+            raise ValueError(f"Yalnızca 16-bit mono WAV desteklenir: {self.path}")
+        self.rate = self._wf.getframerate()
+        self._started = time.perf_counter()
+        self._sent_frames = 0
+        return self
+
+    def read(self) -> Optional[bytes]:
+        data = self._wf.readframes(self.chunk)
+        if not data:
+            return None
+        self._sent_frames += len(data) // 2
+        if self.realtime:
+            due = self._started + self._sent_frames / self.rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+    def close(self):
+        if self._wf is not None:
+            self._wf.close()
+            self._wf = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DirectorySource:
+    """Klasördeki WAV dosyalarını (alfabetik) her tur için ayrı bir WavFileSource olarak verir"""
+
+    def __init__(self, directory: str, chunk: int = 1024, realtime: bool = False):
+        self.directory = directory
+        self.paths = sorted(
+            os.path.join(directory, fn) for fn in os.listdir(directory) if fn.endswith(".wav")
+        )
+        self.chunk = chunk
+        self.realtime = realtime
+        self._index = 0
+
+    def __len__(self):
+        return len(self.paths)
+
+    def next_source(self) -> Optional[WavFileSource]:
+        if self._index >= len(self.paths):
+            return None
+        path = self.paths[self._index]
+        self._index += 1
+        return WavFileSource(path, self.chunk, self.realtime)
+
+    def transcripts(self) -> List[str]:
+        """Her WAV'ın yanındaki .txt transkripti (yoksa boş metin)"""
+        out = []
+        for path in self.paths:
+            txt_path = path[:-4] + ".txt"
+            if os.path.exists(txt_path):
+                with open(txt_path, 'r', encoding='utf-8') as f:
+                    out.append(f.read().strip())
+            else:
+                out.append("")
+        return out
+
+
+class ScriptedRecognizer:
+    """
+    Google STT streaming_recognize yerine geçen yerel tanıyıcı.
+    Gelen tüm ses isteklerini tüketir (kayıt hattını sürer) ve sıradaki
+    transkripti final sonuç olarak döndürür.
+
+    Args:
+        transcripts: Her çağrı için sırayla kullanılacak metinler, ya da
+            (çağrı_no, gönderilen_bayt) alıp metin döndüren fonksiyon
+        confidence: Döndürülecek güvenilirlik değeri
+    """
+
+    def __init__(self, transcripts: Union[List[str], Callable[[int, int], str]],
+                 confidence: float = 0.9, language_code: str = "tr-tr"):
+        self.transcripts = transcripts
+        self.confidence = confidence
+        self.language_code = language_code
+        self.calls = 0
+
+    def _next_transcript(self, audio_bytes: int) -> str:
+        idx = self.calls
+        self.calls += 1
+        if callable(self.transcripts):
+            return self.transcripts(idx, audio_bytes)
+        return self.transcripts[idx] if idx < len(self.transcripts) else ""
+
+    def streaming_recognize(self, config, requests: Iterable):
+        from google.cloud import speech
+
+        audio_bytes = 0
+        for request in requests:
+            audio_bytes += len(request.audio_content)
+
+        transcript = self._next_transcript(audio_bytes)
+        if not transcript:
+            return
+        yield speech.StreamingRecognizeResponse(results=[
+            speech.StreamingRecognitionResult(
+                alternatives=[speech.SpeechRecognitionAlternative(
+                    transcript=transcript, confidence=self.confidence
+                )],
+                is_final=True,
+                language_code=self.language_code,
+            )
+        ])
+
+
+def run_replay_benchmark(directory: str, realtime: bool = False) -> List[dict]:
+    """Klasördeki WAV'ları kayıt hattından geçirir; tur başına süreleri raporlar"""
+    from speech_to_text import record_and_convert
+
+    replay = DirectorySource(directory, realtime=realtime)
+    recognizer = ScriptedRecognizer(replay.transcripts())
+    rows = []
+    total_started = time.perf_counter()
+    audio_seconds = 0.0
+    for turn in range(1, len(replay) + 1):
+        source = replay.next_source()
+        with wave.open(source.path, 'rb') as wf:
+            duration = wf.getnframes() / wf.getframerate()
+        audio_seconds += duration
+        started = time.perf_counter()
+        result = record_and_convert(question_number=None, source=source, recognizer=recognizer)
+        elapsed = time.perf_counter() - started
+        rows.append({
+            "file": os.path.basename(source.path),
+            "audio_sec": round(duration, 2),
+            "wall_sec": round(elapsed, 3),
+            "transcript": (result or {}).get("transcript"),
+        })
+        if result and result.get("audio_file") and os.path.exists(result["audio_file"]):
+            os.remove(result["audio_file"])
+    total = time.perf_counter() - total_started
+
+    print("\n=== KAYIT HATTI TEKRAR OYNATMA ÖLÇÜMÜ ===")
+    for row in rows:
+        print(f"{row['file']}: ses {row['audio_sec']} sn, işlem {row['wall_sec']} sn -> {row['transcript']!r}")
+    if total > 0:
+        print(f"Toplam: {audio_seconds:.1f} sn ses, {total:.2f} sn işlem ({audio_seconds / total:.1f}x gerçek zaman)")
+    return rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Kullanım: python audio_sources.py <wav_klasörü> [--realtime]")
+        sys.exit(1)
+    run_replay_benchmark(sys.argv[1], realtime="--realtime" in sys.argv)
@@ -0,0 +1,280 @@
+"""
+batch_ingest.py
+Bir klasördeki tüm CV'leri toplu işleyen komut.
+
+- Metin çıkarma süreç havuzunda paralel yapılır
+- Yerel etiket çıkarma her CV için anında çalışır
+- (Opsiyonel) Gemini analizi eşzamanlılık sınırı ve hız sınırlayıcı altında yapılır
+- Sonuçlar dosya hash'iyle JSONL veya SQLite'a yazılır; yarıda kalırsa kaldığı yerden devam eder
+  (--llm ile devam edilirse Gemini analizi eksik kayıtlar yeniden işlenir)
+
+Kullanım:
+    python batch_ingest.py cvler/ -o cv_sonuclari.jsonl
+    python batch_ingest.py cvler/ -o cv_sonuclari.db --llm --concurrency 4 --rpm 30
+"""
+
+import os
+import json
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, List, Set
+
+from cv_cache import CVCache, file_sha256
+from cv_manager import CVManager, extract_cv_text, CV_TEXT_BUDGET, PROMPT_VERSION, SUPPORTED_EXTENSIONS
+from cv_tag_extractor import get_default_extractor
+from rate_limiter import RateLimiter
+
+
+class JSONLStore:
+    """Her satırı bir CV sonucu olan JSONL çıktısı (ekleme modunda)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, 'a', encoding='utf-8')
+
+    def done_hashes(self, require_llm: bool = False) -> Set[str]:
+        """Hatasız işlenmiş CV hash'leri; require_llm ise yalnızca Gemini analizi olanlar"""
+        done = set()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Kesinti sırasında yarım yazılmış son satır
+                if record.get("error") or (require_llm and not record.get("cv_analysis")):
+                    continue
+                done.add(record["file_hash"])
+        return done
+
+    def write(self, record: Dict):
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+
+class SQLiteStore:
+    """file_hash birincil anahtarlı SQLite çıktısı"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cv_results ("
+            " file_hash TEXT PRIMARY KEY,"
+            " path TEXT,"
+            " chars INTEGER,"
+            " tags TEXT,"
+            " cv_analysis TEXT,"
+            " error TEXT,"
+            " processed_at TEXT)"
+        )
+        self._conn.commit()
+
+    def done_hashes(self, require_llm: bool = False) -> Set[str]:
+        """Hatasız işlenmiş CV hash'leri; require_llm ise yalnızca Gemini analizi olanlar"""
+        query = "SELECT file_hash FROM cv_results WHERE error IS NULL"
+        if require_llm:
+            # LLM'siz çalıştırmada cv_analysis JSON 'null' olarak yazılır
+            query += " AND cv_analysis IS NOT NULL AND cv_analysis != 'null'"
+        rows = self._conn.execute(query)
+        return {row[0] for row in rows}
+
+    def write(self, record: Dict):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cv_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                record["file_hash"],
+                record["path"],
+                record.get("chars", 0),
+                json.dumps(record.get("tags", []), ensure_ascii=False),
+                json.dumps(record.get("cv_analysis"), ensure_ascii=False),
+                record.get("error"),
+                record["processed_at"],
+            ),
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def open_store(path: str):
+    if os.path.splitext(path)[1].lower() in ('.db', '.sqlite', '.sqlite3'):
+        return SQLiteStore(path)
+    return JSONLStore(path)
+
+
+def find_cv_files(directory: str) -> List[str]:
+    """Klasörü (alt klasörlerle) gez ve desteklenen CV dosyalarını döndür"""
+    paths = []
+    for root, _dirs, files in os.walk(directory):
+        for fn in sorted(files):
+            if os.path.splitext(fn)[1].lower() in SUPPORTED_EXTENSIONS:
+                paths.append(os.path.join(root, fn))
+    return sorted(paths)
+
+
+def _extract_job(file_path: str, file_hash: str, max_chars, fast: bool) -> Dict:
+    """Süreç havuzu işçisi: tek bir CV'nin metnini çıkar"""
+    try:
+        cv_text, complete = extract_cv_text(file_path, max_chars=max_chars, fast=fast)
+        return {"path": file_path, "file_hash": file_hash, "cv_text": cv_text, "complete": complete}
+    except Exception as e:
+        return {"path": file_path, "file_hash": file_hash, "cv_text": "", "error": str(e)}
+
+
+def _llm_job(record: Dict, cv_text: str, limiter: RateLimiter) -> Dict:
+    """Thread havuzu işçisi: Gemini analizi (CV önbelleği varsa API çağrılmaz)"""
+    try:
+        manager = CVManager()
+        manager.cv_text = cv_text
+        manager.file_hash = record["file_hash"]
+        manager.local_tags = record["tags"]
+        # Önbellekte analizi olan CV'ler API kotası harcamaz
+        if not manager.cache.get_analysis(manager.file_hash, PROMPT_VERSION):
+            limiter.acquire()
+        analysis = manager.analyze_cv_with_llm()
+    except Exception as e:
+        record["error"] = f"LLM analizi hatası: {e}"
+        return record
+    if analysis:
+        record["cv_analysis"] = analysis
+        record["tags"] = sorted(manager.get_matching_tags())
+    else:
+        record["error"] = "LLM analizi başarısız"
+    return record
+
+
+def run_batch(directory: str, output: str, workers: int = None, use_llm: bool = False,
+              concurrency: int = 4, rpm: float = 30, max_chars=CV_TEXT_BUDGET, fast: bool = True) -> Dict:
+    """Klasördeki CV'leri işler ve çıktı deposuna yazar. Özet istatistikleri döndürür."""
+    started = time.perf_counter()
+    paths = find_cv_files(directory)
+    print(f"[BATCH] {len(paths)} CV dosyası bulundu: {directory}")
+
+    store = open_store(output)
+    # --llm ile çalıştırılınca önceden LLM'siz işlenmiş CV'ler analiz için yeniden kuyruğa alınır
+    done = store.done_hashes(require_llm=use_llm)
+    if done:
+        print(f"[BATCH] {len(done)} CV daha önce işlenmiş, atlanacak (devam modu)")
+
+    cv_cache = CVCache()
+    extractor = get_default_extractor()
+    limiter = RateLimiter(rpm) if use_llm else None
+
+    stats = {"found": len(paths), "skipped": 0, "processed": 0, "failed": 0, "bytes": 0}
+
+    def write(record: Dict):
+        record.pop("cv_text", None)
+        record["processed_at"] = datetime.now().isoformat(timespec="seconds")
+        store.write(record)
+        if record.get("error"):
+            stats["failed"] += 1
+            print(f"[HATA] {record['path']}: {record['error']}")
+        else:
+            stats["processed"] += 1
+        finished = stats["processed"] + stats["failed"]
+        if finished % 25 == 0:
+            elapsed = time.perf_counter() - started
+            print(f"[BATCH] {finished} CV işlendi ({finished / elapsed:.1f} CV/sn)", flush=True)
+
+    procs = ProcessPoolExecutor(max_workers=workers)
+    llm_pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="cv-llm")
+    try:
+        # 1) Hash: hangi dosyaların işleneceğine karar ver (aynı içerik tek kez işlenir)
+        todo = []
+        seen = set(done)
+        for path, file_hash in zip(paths, procs.map(file_sha256, paths, chunksize=16)):
+            if file_hash in seen:
+                stats["skipped"] += 1
+                continue
+            seen.add(file_hash)
+            todo.append((path, file_hash))
+            stats["bytes"] += os.path.getsize(path)
+
+        # 2) Metin çıkarma (süreç havuzu) + yerel etiketler + opsiyonel LLM (thread havuzu)
+        extract_futures = [procs.submit(_extract_job, path, file_hash, max_chars, fast)
+                           for path, file_hash in todo]
+        llm_futures = set()
+        for fut in as_completed(extract_futures):
+            record = fut.result()
+            cv_text = record.get("cv_text", "")
+            record["chars"] = len(cv_text)
+            if not record.get("error") and not cv_text:
+                record["error"] = "CV metni çıkarılamadı"
+            if record.get("error"):
+                write(record)
+                continue
+
+            cv_cache.put_text(record["file_hash"], cv_text, complete=record.pop("complete", True))
+            record["tags"] = extractor.extract(cv_text)
+            if use_llm:
+                llm_futures.add(llm_pool.submit(_llm_job, record, cv_text, limiter))
+            else:
+                write(record)
+
+            for llm_fut in [f for f in llm_futures if f.done()]:
+                llm_futures.discard(llm_fut)
+                write(llm_fut.result())
+
+        for llm_fut in as_completed(llm_futures):
+            write(llm_fut.result())
+    except KeyboardInterrupt:
+        print("\n[UYARI] Kesildi. Tamamlanan sonuçlar kaydedildi; aynı komutla devam edebilirsiniz.")
+    finally:
+        procs.shutdown(wait=False, cancel_futures=True)
+        llm_pool.shutdown(wait=False, cancel_futures=True)
+        store.close()
+
+    elapsed = time.perf_counter() - started
+    stats["elapsed_sec"] = round(elapsed, 2)
+    stats["cv_per_sec"] = round((stats["processed"] + stats["failed"]) / elapsed, 2) if elapsed > 0 else 0
+    stats["mb_per_sec"] = round(stats["bytes"] / 1e6 / elapsed, 2) if elapsed > 0 else 0
+
+    print("\n=== TOPLU CV İŞLEME ÖZETİ ===")
+    print(f"   Bulunan: {stats['found']}, Atlanan: {stats['skipped']}, "
+          f"İşlenen: {stats['processed']}, Hatalı: {stats['failed']}")
+    print(f"   Süre: {stats['elapsed_sec']} sn, Hız: {stats['cv_per_sec']} CV/sn ({stats['mb_per_sec']} MB/sn)")
+    print(f"   Çıktı: {output}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Klasördeki CV'leri toplu işler")
+    parser.add_argument("directory", help="CV dosyalarının bulunduğu klasör")
+    parser.add_argument("-o", "--output", default="cv_results.jsonl",
+                        help="Çıktı dosyası (.jsonl veya .db/.sqlite)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Metin çıkarma süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--llm", action="store_true", help="Gemini analizini de çalıştır")
+    parser.add_argument("--concurrency", type=int, default=4, help="Aynı anda en fazla LLM isteği")
+    parser.add_argument("--rpm", type=float, default=30, help="Dakikada en fazla LLM isteği")
+    parser.add_argument("--full-text", action="store_true",
+                        help=f"Metnin tamamını çıkar (varsayılan: ilk {CV_TEXT_BUDGET} karakter)")
+    parser.add_argument("--layout", action="store_true",
+                        help="PDF için pdfplumber düzen analizini kullan (daha yavaş)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"[HATA] Klasör bulunamadı: {args.directory}")
+        return
+
+    run_batch(
+        args.directory,
+        args.output,
+        workers=args.workers,
+        use_llm=args.llm,
+        concurrency=args.concurrency,
+        rpm=args.rpm,
+        max_chars=None if args.full_text else CV_TEXT_BUDGET,
+        fast=not args.layout,
+    )
+
+
+if __name__ == "__main__":
+    main()
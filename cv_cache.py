@@ -0,0 +1,96 @@
+"""
+cv_cache.py
+CV metni ve CV analiz sonuçları için içerik-hash tabanlı disk önbelleği
+"""
+
+import os
+import json
+import hashlib
+from typing import Dict, Optional
+
+CV_CACHE_DIR = os.path.join("cache", "cv")
+
+
+def file_sha256(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """Dosya içeriğinin SHA-256 özetini döndür (dosya adından bağımsız)"""
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class CVCache:
+    """
+    CV önbelleği.
+    - Metin: <sha256>.text.json (prompt'tan bağımsız)
+    - Analiz + etiketler: <sha256>.<prompt_version>.json
+    """
+
+    def __init__(self, cache_dir: str = CV_CACHE_DIR):
+        self.cache_dir = cache_dir
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def _path(self, file_hash: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, f"{file_hash}.{suffix}.json")
+
+    def _read(self, path: str) -> Optional[Dict]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[UYARI] Bozuk önbellek kaydı yok sayıldı ({path}): {e}")
+            return None
+
+    def _write(self, path: str, data: Dict):
+        # Yarım yazılmış dosya kalmasın diye önce geçici dosyaya yaz
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[UYARI] Önbelleğe yazılamadı ({path}): {e}")
+
+    def get_text(self, file_hash: str, max_chars: Optional[int] = None) -> Optional[str]:
+        """
+        Önbellekteki CV metni. Kayıt bütçeyle kesilmişse yalnızca istenen
+        bütçeyi karşılıyorsa döndürülür (max_chars=None tam metin ister).
+        """
+        entry = self._read(self._path(file_hash, "text"))
+        if not entry or not entry.get("cv_text"):
+            return None
+        cv_text = entry["cv_text"]
+        if entry.get("complete", True):
+            return cv_text if max_chars is None else cv_text[:max_chars]
+        if max_chars is not None and len(cv_text) >= max_chars:
+            return cv_text[:max_chars]
+        return None
+
+    def put_text(self, file_hash: str, cv_text: str, complete: bool = True):
+        # Tam metin, önceden yazılmış kesik bir kaydın üzerine yazılır; tersi yapılmaz
+        existing = self._read(self._path(file_hash, "text"))
+        if existing and existing.get("complete", True) and not complete:
+            return
+        self._write(self._path(file_hash, "text"), {"cv_text": cv_text, "complete": complete})
+
+    def get_analysis(self, file_hash: str, prompt_version: str) -> Optional[Dict]:
+        """{'cv_analysis': dict, 'tags': list | None} veya None"""
+        return self._read(self._path(file_hash, prompt_version))
+
+    def put_analysis(self, file_hash: str, prompt_version: str, cv_analysis: Dict, tags=None):
+        self._write(self._path(file_hash, prompt_version), {
+            "cv_analysis": cv_analysis,
+            "tags": tags,
+        })
+
+    def put_tags(self, file_hash: str, prompt_version: str, tags):
+        """Mevcut analiz kaydına get_matching_tags çıktısını ekle"""
+        entry = self.get_analysis(file_hash, prompt_version)
+        if entry is None:
+            return
+        entry["tags"] = list(tags)
+        self._write(self._path(file_hash, prompt_version), entry)
@@ -5,9 +5,12 @@ CV yükleme, metin çıkarma ve anahtar kelime analizi modülü
 
 import os
 import re
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional
 import google.generativeai as genai
 from dotenv import load_dotenv
+from cv_cache import CVCache, file_sha256
+from cv_tag_extractor import get_default_extractor, match_technology, match_area, PROGRAMMING_LANG_TAG
 
 # PDF ve DOCX okuma için kütüphaneler
 try:
@@ -17,6 +20,13 @@ except ImportError:
     print("[UYARI] pdfplumber yüklü değil. PDF okuma için: pip install pdfplumber")
     PDF_AVAILABLE = False
 
+# Hızlı PDF yolu: pdfium metni doğrudan verir, pdfminer düzen analizi yapılmaz (opsiyonel)
+try:
+    import pypdfium2 as pdfium
+    PDF_FAST_AVAILABLE = True
+except ImportError:
+    PDF_FAST_AVAILABLE = False
+
 try:
     from docx import Document
     DOCX_AVAILABLE = True
@@ -26,14 +36,134 @@ except ImportError:
 
 load_dotenv()
 
+# Analiz prompt'u değiştiğinde artırılmalı; eski önbellek kayıtları otomatik geçersiz olur
+PROMPT_VERSION = "v1"
+
+# LLM'e gönderilen CV metni uzunluğu; varsayılan çıkarma bütçesi de budur
+CV_TEXT_BUDGET = 3000
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.doc', '.txt')
+
+
+def _pdf_page_count(file_path: str, fast: bool) -> int:
+    if fast and PDF_FAST_AVAILABLE:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def _iter_pdf_pages(file_path: str, fast: bool = True, start: int = 0, stop: Optional[int] = None):
+    """PDF sayfalarının metnini sırayla üret (sayfalar ihtiyaç oldukça okunur)"""
+    if fast and PDF_FAST_AVAILABLE:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            for i in range(start, len(pdf) if stop is None else min(stop, len(pdf))):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                try:
+                    yield textpage.get_text_range()
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+        return
+    
+    if not PDF_AVAILABLE:
+        raise ImportError("pdfplumber yüklü değil")
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            yield page.extract_text()
+            # pdfplumber sayfa başına karakter/nesne önbelleği tutar; bellekte birikmesin
+            page.flush_cache()
+
+
+def _extract_pdf_page_range(args) -> str:
+    """Süreç havuzu işçisi: [start, stop) aralığındaki sayfaların metni"""
+    file_path, start, stop, fast = args
+    return "\n".join(t for t in _iter_pdf_pages(file_path, fast, start, stop) if t)
+
+
+def _iter_docx_paragraphs(file_path: str):
+    if not DOCX_AVAILABLE:
+        raise ImportError("python-docx yüklü değil")
+    doc = Document(file_path)
+    for paragraph in doc.paragraphs:
+        yield paragraph.text
+
+
+def _iter_txt_blocks(file_path: str, block_size: int = 4096):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for block in iter(lambda: f.read(block_size), ''):
+            yield block
+
+
+def iter_cv_text(file_path: str, fast: bool = True):
+    """CV metnini parça parça (sayfa/paragraf/blok) üreten generator"""
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == '.pdf':
+        for page_text in _iter_pdf_pages(file_path, fast):
+            if page_text:
+                yield page_text + "\n"
+    elif file_ext in ['.docx', '.doc']:
+        for paragraph_text in _iter_docx_paragraphs(file_path):
+            yield paragraph_text + "\n"
+    elif file_ext == '.txt':
+        yield from _iter_txt_blocks(file_path)
+    else:
+        raise ValueError(f"Desteklenmeyen dosya formatı: {file_ext}")
+
+
+def extract_cv_text(file_path: str, max_chars: Optional[int] = CV_TEXT_BUDGET,
+                    workers: int = 1, fast: bool = True) -> tuple:
+    """
+    CV metnini çıkarır. (metin, tamamı_okundu_mu) döndürür.
+    
+    max_chars verilirse bütçe dolunca okuma durur; kalan sayfalar hiç açılmaz.
+    max_chars=None ve workers > 1 ise PDF sayfaları süreç havuzunda paralel çıkarılır.
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    
+    if max_chars is None and workers > 1 and file_ext == '.pdf':
+        from concurrent.futures import ProcessPoolExecutor
+        page_count = _pdf_page_count(file_path, fast)
+        step = max(1, -(-page_count // workers))
+        ranges = [(file_path, i, min(i + step, page_count), fast) for i in range(0, page_count, step)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_extract_pdf_page_range, ranges))
+        return "\n".join(p for p in parts if p).strip(), True
+    
+    parts = []
+    collected = 0
+    complete = True
+    for part in iter_cv_text(file_path, fast):
+        parts.append(part)
+        collected += len(part)
+        if max_chars is not None and collected >= max_chars:
+            complete = False
+            break
+    
+    text = "".join(parts).strip()
+    if max_chars is not None and len(text) > max_chars:
+        text = text[:max_chars]
+    return text, complete
+
 class CVManager:
     """CV yükleme ve analiz sınıfı"""
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.cv_text = ""
         self.cv_analysis = {}
         self.keywords = []
         self.technologies = []
+        self.local_tags = []
+        self.file_hash = None
+        self._cached_tags = None
+        self.cache = CVCache() if use_cache else None
         
         # Gemini API ayarla
         api_key = os.getenv("GEMINI_API_KEY")
@@ -41,26 +171,46 @@ class CVManager:
             raise ValueError("GEMINI_API_KEY bulunamadı. .env dosyasını kontrol edin.")
         genai.configure(api_key=api_key)
     
-    def load_cv(self, file_path: str) -> bool:
-        """CV dosyasını yükle ve metni çıkar"""
+    def load_cv(self, file_path: str, max_chars: Optional[int] = CV_TEXT_BUDGET,
+                workers: int = 1, fast: bool = True) -> bool:
+        """
+        CV dosyasını yükle ve metni çıkar
+        
+        Args:
+            file_path: CV dosyası (PDF, DOCX, TXT)
+            max_chars: Karakter bütçesi. Bu kadar metin toplanınca okuma durur.
+                None ise tüm metin çıkarılır.
+            workers: Tüm metin istendiğinde (max_chars=None) PDF sayfaları için
+                kullanılacak süreç sayısı
+            fast: pypdfium2 varsa düzen (layout) analizi yapmayan hızlı yolu kullan
+        """
         if not os.path.exists(file_path):
             print(f"[HATA] Dosya bulunamadı: {file_path}")
             return False
         
         file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext not in SUPPORTED_EXTENSIONS:
+            print(f"[HATA] Desteklenmeyen dosya formatı: {file_ext}")
+            return False
         
         try:
-            if file_ext == '.pdf':
-                self.cv_text = self._extract_from_pdf(file_path)
-            elif file_ext in ['.docx', '.doc']:
-                self.cv_text = self._extract_from_docx(file_path)
-            elif file_ext == '.txt':
-                self.cv_text = self._extract_from_txt(file_path)
-            else:
-                print(f"[HATA] Desteklenmeyen dosya formatı: {file_ext}")
-                return False
+            self.file_hash = file_sha256(file_path)
+            self._cached_tags = None
+            self.local_tags = []
+            if self.cache:
+                cached_text = self.cache.get_text(self.file_hash, max_chars)
+                if cached_text:
+                    self.cv_text = cached_text
+                    print(f"[CACHE] CV metni önbellekten yüklendi ({len(self.cv_text)} karakter)")
+                    return True
+            
+            self.cv_text, complete = extract_cv_text(
+                file_path, max_chars=max_chars, workers=workers, fast=fast
+            )
             
             if self.cv_text:
+                if self.cache:
+                    self.cache.put_text(self.file_hash, self.cv_text, complete=complete)
                 print(f"[OK] CV başarıyla yüklendi ({len(self.cv_text)} karakter)")
                 return True
             else:
@@ -71,39 +221,20 @@ class CVManager:
             print(f"[HATA] CV yükleme hatası: {e}")
             return False
     
-    def _extract_from_pdf(self, file_path: str) -> str:
-        """PDF'den metin çıkar"""
-        if not PDF_AVAILABLE:
-            raise ImportError("pdfplumber yüklü değil")
-        
-        text = ""
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text.strip()
-    
-    def _extract_from_docx(self, file_path: str) -> str:
-        """DOCX'ten metin çıkar"""
-        if not DOCX_AVAILABLE:
-            raise ImportError("python-docx yüklü değil")
-        
-        doc = Document(file_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text.strip()
-    
-    def _extract_from_txt(self, file_path: str) -> str:
-        """TXT dosyasından metin oku"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read().strip()
-    
     def analyze_cv_with_llm(self) -> Dict:
         """CV'yi Gemini ile analiz et - anahtar kelimeler, teknolojiler, deneyim"""
         if not self.cv_text:
             print("[HATA] CV metni yok. Önce load_cv() çağırın.")
             return {}
         
+        if self.cache and self.file_hash:
+            cached = self.cache.get_analysis(self.file_hash, PROMPT_VERSION)
+            if cached and cached.get("cv_analysis"):
+                self._apply_analysis(cached["cv_analysis"])
+                self._cached_tags = cached.get("tags")
+                print("[CACHE] CV analizi önbellekten yüklendi")
+                return self.cv_analysis
+        
         print("\n[ANALIZ] CV analiz ediliyor (Gemini)...")
         
         prompt = f"""
@@ -119,7 +250,7 @@ Aşağıdaki CV metnini analiz et ve şu bilgileri JSON formatında çıkar:
 ÖNEMLI: Sadece JSON döndür, başka açıklama ekleme.
 
 CV Metni:
-{self.cv_text[:3000]}
+{self.cv_text[:CV_TEXT_BUDGET]}
 
 JSON formatı:
 {{
@@ -133,7 +264,9 @@ JSON formatı:
 """
         
         try:
-            model = genai.GenerativeModel("gemini-2.0-flash-exp")
+            # Açılışta hazırlanan paylaşılan model nesnesi kullanılır
+            from llm_handler import get_model, FAST_MODEL
+            model = get_model(FAST_MODEL)
             
             # Güvenlik ayarları
             safety_settings = [
@@ -159,22 +292,18 @@ JSON formatı:
             # JSON'u bul ve parse et
             try:
                 # Direkt parse dene
-                self.cv_analysis = json.loads(text)
+                cv_analysis = json.loads(text)
             except:
                 # JSON bloğunu bul
                 json_match = re.search(r'\{.*\}', text, re.DOTALL)
                 if json_match:
-                    self.cv_analysis = json.loads(json_match.group(0))
+                    cv_analysis = json.loads(json_match.group(0))
                 else:
                     raise ValueError("JSON bulunamadı")
             
-            # Anahtar kelimeleri birleştir
-            self.technologies = self.cv_analysis.get('technologies', [])
-            self.keywords = (
-                self.technologies + 
-                self.cv_analysis.get('skills', []) + 
-                self.cv_analysis.get('experience_areas', [])
-            )
+            self._apply_analysis(cv_analysis)
+            if self.cache and self.file_hash:
+                self.cache.put_analysis(self.file_hash, PROMPT_VERSION, self.cv_analysis)
             
             print("[OK] CV analizi tamamlandı")
             print(f"   Teknolojiler: {', '.join(self.technologies[:5])}")
@@ -187,85 +316,78 @@ JSON formatı:
             print(f"[HATA] CV analiz hatası: {e}")
             return {}
     
-    def get_matching_tags(self) -> List[str]:
-        """Soru havuzuyla eşleşecek etiketleri döndür"""
+    def _apply_analysis(self, cv_analysis: Dict):
+        """Analiz sonucunu ata ve anahtar kelimeleri birleştir"""
+        self.cv_analysis = cv_analysis
+        self.technologies = self.cv_analysis.get('technologies', [])
+        self.keywords = (
+            self.technologies + 
+            self.cv_analysis.get('skills', []) + 
+            self.cv_analysis.get('experience_areas', [])
+        )
+    
+    def extract_local_tags(self) -> List[str]:
+        """CV metninden LLM'e gitmeden, yerel sözlükle etiket çıkar (milisaniyeler)"""
+        if not self.cv_text:
+            return []
+        self.local_tags = get_default_extractor().extract(self.cv_text)
+        print(f"[CV TAGS] Yerel etiketler: {self.local_tags[:10]}...")
+        return list(self.local_tags)
+    
+    def start_llm_enrichment(self) -> Future:
+        """
+        Gemini analizini arka planda başlatır (opsiyonel zenginleştirme).
+        Future tamamlandığında get_matching_tags yerel + LLM etiketlerini birlikte döndürür.
+        """
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cv-llm")
+        future = executor.submit(self.analyze_cv_with_llm)
+        executor.shutdown(wait=False)
+        return future
+    
+    def _llm_tags(self) -> List[str]:
+        """LLM analizinden (teknolojiler + deneyim alanları) etiket üret"""
         if not self.keywords:
             return []
         
-        # Teknolojileri küçük harfe çevir ve normalize et
+        if self._cached_tags is not None:
+            return list(self._cached_tags)
+        
+        # Teknolojileri küçük harfe çevir ve eşleştirme tablosuna göre genişlet
         tags = []
         has_programming_lang = False
         
         for tech in self.technologies:
-            tech_lower = tech.lower()
-            tags.append(tech_lower)
-            
-            # Yaygın eşleştirmeler
-            if 'python' in tech_lower:
-                tags.extend(['python', 'backend', 'oop', 'nesne-tabanlı-programlama'])
-                has_programming_lang = True
-            elif 'java' in tech_lower and 'javascript' not in tech_lower:
-                tags.extend(['java', 'backend', 'oop', 'nesne-tabanlı-programlama'])
-                has_programming_lang = True
-            elif 'javascript' in tech_lower or 'js' in tech_lower:
-                tags.extend(['javascript', 'frontend'])
-                has_programming_lang = True
-            elif 'react' in tech_lower:
-                tags.extend(['react', 'react-vue-angular', 'frontend', 'javascript'])
-            elif 'angular' in tech_lower:
-                tags.extend(['angular', 'react-vue-angular', 'frontend', 'javascript'])
-            elif 'vue' in tech_lower:
-                tags.extend(['vue', 'react-vue-angular', 'frontend', 'javascript'])
-            elif 'node' in tech_lower:
-                tags.extend(['nodejs', 'backend', 'javascript'])
-                has_programming_lang = True
-            elif 'docker' in tech_lower:
-                tags.extend(['docker', 'devops', 'ci-cd'])
-            elif 'kubernetes' in tech_lower or 'k8s' in tech_lower:
-                tags.extend(['kubernetes', 'devops', 'ci-cd'])
-            elif 'aws' in tech_lower:
-                tags.extend(['aws', 'cloud', 'devops'])
-            elif 'azure' in tech_lower:
-                tags.extend(['azure', 'cloud', 'devops'])
-            elif 'sql' in tech_lower or 'database' in tech_lower:
-                tags.extend(['sql', 'veritabani', 'database', 'backend'])
-            elif 'mongodb' in tech_lower or 'nosql' in tech_lower:
-                tags.extend(['mongodb', 'nosql', 'veritabani', 'database'])
-            elif 'git' in tech_lower:
-                tags.extend(['git', 'versiyon-kontrol', 'version-control'])
-            elif 'ci/cd' in tech_lower or 'jenkins' in tech_lower:
-                tags.extend(['ci-cd', 'devops'])
-            elif 'test' in tech_lower:
-                tags.extend(['test', 'testing', 'qa', 'unit-test'])
-            elif 'api' in tech_lower or 'rest' in tech_lower:
-                tags.extend(['api-design', 'backend'])
-            elif 'microservice' in tech_lower:
-                tags.extend(['microservices', 'yazılım-mimarisi'])
-            elif 'agile' in tech_lower or 'scrum' in tech_lower:
-                tags.extend(['agile-scrum', 'proje-yönetimi'])
+            tags.append(tech.lower())
+            matched = match_technology(tech)
+            if matched:
+                rule_tags, is_lang = matched
+                tags.extend(rule_tags)
+                has_programming_lang = has_programming_lang or is_lang
         
         # Programlama dili varsa genel etiket ekle
         if has_programming_lang:
-            tags.append('nodejs-python-java')  # Soru havuzundaki genel etiket
+            tags.append(PROGRAMMING_LANG_TAG)  # Soru havuzundaki genel etiket
         
         # Deneyim alanlarını ekle
         for area in self.cv_analysis.get('experience_areas', []):
-            area_lower = area.lower()
-            tags.append(area_lower)
-            
-            # Alan bazlı etiketler
-            if 'backend' in area_lower:
-                tags.extend(['backend', 'api-design', 'veritabani'])
-            elif 'frontend' in area_lower:
-                tags.extend(['frontend', 'ui-ux'])
-            elif 'devops' in area_lower:
-                tags.extend(['devops', 'ci-cd'])
-            elif 'full' in area_lower or 'fullstack' in area_lower:
-                tags.extend(['backend', 'frontend', 'api-design'])
+            tags.append(area.lower())
+            area_tags = match_area(area)
+            if area_tags:
+                tags.extend(area_tags)
         
         # Tekrarları kaldır
         unique_tags = list(set(tags))
-        print(f"[CV TAGS] Oluşturulan etiketler: {unique_tags[:10]}...")
+        
+        self._cached_tags = unique_tags
+        if self.cache and self.file_hash:
+            self.cache.put_tags(self.file_hash, PROMPT_VERSION, unique_tags)
+        return unique_tags
+    
+    def get_matching_tags(self) -> List[str]:
+        """Soru havuzuyla eşleşecek etiketleri döndür (yerel + varsa LLM etiketleri)"""
+        unique_tags = list(set(self.local_tags) | set(self._llm_tags()))
+        if unique_tags:
+            print(f"[CV TAGS] Oluşturulan etiketler: {unique_tags[:10]}...")
         return unique_tags
     
     def get_cv_summary(self) -> str:
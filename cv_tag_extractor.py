@@ -0,0 +1,237 @@
+"""
+cv_tag_extractor.py
+CV metninden LLM'e gitmeden, yerel sözlükle etiket çıkaran modül.
+
+Sözlük, soru havuzundaki 'etiketler' ve teknoloji eşleştirme tablosundan
+(TECH_TAG_RULES / AREA_TAG_RULES) oluşturulur ve Aho-Corasick otomatına
+derlenir; CV metni tek geçişte taranır.
+"""
+
+import os
+import json
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# Teknoloji eşleştirme tablosu: (takma adlar, hariç tutulanlar, etiketler, programlama_dili_mi)
+# Sıra önemlidir: LLM'in döndürdüğü teknoloji adı için ilk eşleşen kural uygulanır.
+# Takma ad sonundaki '*' metin taramasında kelimenin devam edebileceğini (node -> nodejs),
+# başındaki '*' kelimenin içinde geçebileceğini (sql -> postgresql) belirtir.
+TECH_TAG_RULES = [
+    (("python",), (), ['python', 'backend', 'oop', 'nesne-tabanlı-programlama'], True),
+    (("java",), ("javascript",), ['java', 'backend', 'oop', 'nesne-tabanlı-programlama'], True),
+    (("javascript", "js"), (), ['javascript', 'frontend'], True),
+    (("react*",), (), ['react', 'react-vue-angular', 'frontend', 'javascript'], False),
+    (("angular*",), (), ['angular', 'react-vue-angular', 'frontend', 'javascript'], False),
+    (("vue*",), (), ['vue', 'react-vue-angular', 'frontend', 'javascript'], False),
+    (("node*",), (), ['nodejs', 'backend', 'javascript'], True),
+    (("docker*",), (), ['docker', 'devops', 'ci-cd'], False),
+    (("kubernetes", "k8s"), (), ['kubernetes', 'devops', 'ci-cd'], False),
+    (("aws",), (), ['aws', 'cloud', 'devops'], False),
+    (("azure",), (), ['azure', 'cloud', 'devops'], False),
+    (("*sql*", "database*"), (), ['sql', 'veritabani', 'database', 'backend'], False),
+    (("mongodb", "nosql"), (), ['mongodb', 'nosql', 'veritabani', 'database'], False),
+    (("git",), (), ['git', 'versiyon-kontrol', 'version-control'], False),
+    (("ci/cd", "jenkins"), (), ['ci-cd', 'devops'], False),
+    (("test*",), (), ['test', 'testing', 'qa', 'unit-test'], False),
+    (("api*", "rest"), (), ['api-design', 'backend'], False),
+    (("microservice*", "mikroservis*"), (), ['microservices', 'yazılım-mimarisi'], False),
+    (("agile", "scrum"), (), ['agile-scrum', 'proje-yönetimi'], False),
+]
+
+# Deneyim alanı eşleştirme tablosu: (takma adlar, etiketler)
+AREA_TAG_RULES = [
+    (("backend", "back-end"), ['backend', 'api-design', 'veritabani']),
+    (("frontend", "front-end"), ['frontend', 'ui-ux']),
+    (("devops",), ['devops', 'ci-cd']),
+    (("full*",), ['backend', 'frontend', 'api-design']),
+]
+
+# Programlama dili bulunduğunda eklenen, soru havuzundaki genel etiket
+PROGRAMMING_LANG_TAG = 'nodejs-python-java'
+
+# Her CV'de geçen, filtrelemeyi anlamsızlaştıran havuz etiketleri
+GENERIC_POOL_TAGS = {'yazılım', 'iletişim'}
+
+# Havuzda CV'ye göre filtrelenen kategoriler
+TAG_CATEGORIES = ('teknik', 'yedek', 'senaryo')
+
+_FOLD_TABLE = str.maketrans({
+    'ı': 'i', 'ş': 's', 'ğ': 'g', 'ü': 'u', 'ö': 'o', 'ç': 'c', 'â': 'a', 'î': 'i', 'û': 'u',
+    '̇': None,  # 'İ'.lower() sonrası kalan birleşik nokta
+})
+
+
+def fold_text(text: str) -> str:
+    """Küçük harfe çevir ve Türkçe karakterleri sadeleştir (veritabanı == veritabani)"""
+    return text.lower().translate(_FOLD_TABLE)
+
+
+def bare_alias(alias: str) -> str:
+    """Takma addaki '*' işaretlerini kaldır"""
+    return alias.strip('*')
+
+
+def match_technology(tech: str) -> Optional[Tuple[List[str], bool]]:
+    """
+    LLM'in döndürdüğü tek bir teknoloji adını tabloyla eşleştir (alt metin araması).
+    (etiketler, programlama_dili_mi) veya None döndürür.
+    """
+    tech_lower = tech.lower()
+    for aliases, excludes, tags, is_lang in TECH_TAG_RULES:
+        if any(bare_alias(a) in tech_lower for a in aliases) \
+                and not any(x in tech_lower for x in excludes):
+            return tags, is_lang
+    return None
+
+
+def match_area(area: str) -> Optional[List[str]]:
+    """Tek bir deneyim alanını tabloyla eşleştir"""
+    area_lower = area.lower()
+    for aliases, tags in AREA_TAG_RULES:
+        if any(bare_alias(a) in area_lower for a in aliases):
+            return tags
+    return None
+
+
+class AhoCorasick:
+    """Basit Aho-Corasick otomatı: tüm desenleri metinde tek geçişte bulur"""
+
+    def __init__(self, patterns: List[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+        self.patterns = patterns
+
+        for idx, pattern in enumerate(patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append(idx)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text: str):
+        """(başlangıç, bitiş, desen_no) üretir; bitiş hariçtir"""
+        node = 0
+        goto, fail, out, patterns = self.goto, self.fail, self.out, self.patterns
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for idx in out[node]:
+                yield i + 1 - len(patterns[idx]), i + 1, idx
+
+
+class CVTagExtractor:
+    """Soru havuzu + eşleştirme tablosundan derlenen sözlükle CV metninden etiket çıkarır"""
+
+    def __init__(self, question_dir: str = "question_pool"):
+        # desen -> (etiketler, programlama_dili_mi, sol_serbest, sağ_serbest)
+        entries: Dict[str, Tuple[List[str], bool, bool, bool]] = {}
+
+        for pool_tag in self._load_pool_tags(question_dir):
+            folded = fold_text(pool_tag)
+            for form in {folded, folded.replace('-', ' ')}:
+                entries.setdefault(form, ([pool_tag], False, False, False))
+
+        for aliases, _excludes, tags, is_lang in TECH_TAG_RULES:
+            for alias in aliases:
+                entries[fold_text(bare_alias(alias))] = (tags, is_lang, alias.startswith('*'), alias.endswith('*'))
+
+        for aliases, tags in AREA_TAG_RULES:
+            for alias in aliases:
+                # 'full' gibi kısa alan adları metinde tek başına anlamsız; yalnızca tam biçimler
+                if alias.endswith('*'):
+                    for form in ("fullstack", "full stack", "full-stack"):
+                        entries.setdefault(form, (tags, False, False, False))
+                    continue
+                entries.setdefault(fold_text(alias), (tags, False, False, False))
+
+        self._entries = entries
+        self._automaton = AhoCorasick(list(entries))
+
+    @staticmethod
+    def _load_pool_tags(question_dir: str) -> List[str]:
+        tags = set()
+        if not os.path.isdir(question_dir):
+            return []
+        for fn in sorted(os.listdir(question_dir)):
+            if not fn.endswith(".json"):
+                continue
+            with open(os.path.join(question_dir, fn), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, list):
+                continue
+            for q in data:
+                if q.get("kategori") in TAG_CATEGORIES:
+                    tags.update(q.get("etiketler", []))
+        return sorted(tags - GENERIC_POOL_TAGS)
+
+    def find_terms(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Metindeki sözlük terimlerini (terim, konum) olarak döndürür.
+        Aynı konumdan başlayan çakışmalarda en uzun terim seçilir (java < javascript).
+        """
+        folded = fold_text(text)
+        n = len(folded)
+        best: Dict[int, Tuple[int, str]] = {}
+        for start, end, idx in self._automaton.iter_matches(folded):
+            pattern = self._automaton.patterns[idx]
+            _tags, _is_lang, left_free, right_free = self._entries[pattern]
+            if not left_free and start > 0 and folded[start - 1].isalnum():
+                continue
+            if not right_free and end < n and folded[end].isalnum():
+                continue
+            if start not in best or end > best[start][0]:
+                best[start] = (end, pattern)
+
+        terms = []
+        covered_until = -1
+        for start in sorted(best):
+            end, pattern = best[start]
+            if start < covered_until:
+                continue
+            terms.append((pattern, start))
+            covered_until = end
+        return terms
+
+    def extract(self, text: str) -> List[str]:
+        """CV metninden soru havuzuyla eşleşecek etiketleri çıkar"""
+        if not text:
+            return []
+        tags = set()
+        has_programming_lang = False
+        for pattern, _pos in self.find_terms(text):
+            pattern_tags, is_lang, _l, _r = self._entries[pattern]
+            tags.update(pattern_tags)
+            has_programming_lang = has_programming_lang or is_lang
+        if has_programming_lang:
+            tags.add(PROGRAMMING_LANG_TAG)
+        return sorted(tags)
+
+
+_default_extractor: Optional[CVTagExtractor] = None
+
+
+def get_default_extractor(question_dir: str = "question_pool") -> CVTagExtractor:
+    """Süreç başına bir kez derlenen varsayılan çıkarıcı"""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = CVTagExtractor(question_dir)
+    return _default_extractor
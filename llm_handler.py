@@ -7,6 +7,7 @@ fallback ve senaryo üretimi mantığını içerir.
 import os
 import json
 import random 
+import threading
 import google.generativeai as genai
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
@@ -18,6 +19,37 @@ if not API_KEY:
     API_KEY = "test_key"  # Test için geçici key
 genai.configure(api_key=API_KEY)
 
+ANALYSIS_MODEL = "gemini-2.5-pro"
+FAST_MODEL = "gemini-2.0-flash-exp"
+
+_models: Dict[str, "genai.GenerativeModel"] = {}
+_models_lock = threading.Lock()
+
+
+def get_model(name: str) -> "genai.GenerativeModel":
+    """Model nesnesini bir kez oluşturup paylaşır (her çağrıda yeniden kurulmaz)"""
+    with _models_lock:
+        model = _models.get(name)
+        if model is None:
+            model = genai.GenerativeModel(name)
+            _models[name] = model
+        return model
+
+
+def warm_up_models(names: List[str] = (ANALYSIS_MODEL, FAST_MODEL)) -> List[str]:
+    """Açılışta kullanılacak model nesnelerini hazırlar; hazırlananların adlarını döndürür"""
+    ready = []
+    for name in names:
+        try:
+            get_model(name)
+            ready.append(name)
+        except Exception as e:
+            print(f"[UYARI] Model hazırlanamadı ({name}): {e}")
+    return ready
+
+# Bir sonraki sorusu mevcut cevabın içeriğine/puanına bağlı olmayan fazlar (önceden seçilebilir)
+PRESELECT_PHASES = {"kişisel", "teknik1", "senaryo"}
+
 class InterviewHandler:
     def __init__(self, question_dir: str = "question_pool", cv_tags: List[str] = None):
         """
@@ -31,6 +63,14 @@ class InterviewHandler:
         self.phase_questions_asked = 0 
         self.last_scenario: Optional[Dict] = None
         self.cv_tags = cv_tags or []  # CV bazlı etiketler
+        # CV etiketleri arka planda hazırlanıyorsa temizlenir (bkz. expect_cv_tags)
+        self.cv_tags_ready = threading.Event()
+        self.cv_tags_ready.set()
+        self.cv_tags_timeout = 0.0
+        # Cevap beklenirken önceden seçilen sonraki soru (bkz. preselect_next_question)
+        self._preselected: Optional[Dict] = None
+        # Ön seçim sırasında seçim mesajları yazdırılmaz, burada biriktirilir (bkz. _log)
+        self._preselect_log: Optional[List[str]] = None
         # Seçim sırasında kullanacağımız hedef zorluk default değerleri
         self.default_difficulty_by_phase = {
             "teknik1": 1,
@@ -51,6 +91,28 @@ class InterviewHandler:
                     out.extend(data)
         return out
 
+    def expect_cv_tags(self, timeout: float = 5.0):
+        """
+        CV etiketlerinin arka planda hazırlandığını bildirir. CV bazlı teknik soru
+        seçilirken etiketler için en fazla timeout saniye beklenir.
+        """
+        self.cv_tags_timeout = timeout
+        self.cv_tags_ready.clear()
+
+    def update_cv_tags(self, cv_tags: List[str]):
+        """CV etiketlerini sonradan güncelle (ör. arka plandaki LLM analizi bittiğinde)"""
+        self.cv_tags = list(cv_tags or [])
+        self.cv_tags_ready.set()
+        print(f"   [CV ETİKETLERİ] {len(self.cv_tags)} etiket güncellendi", flush=True)
+
+    def _wait_for_cv_tags(self):
+        """Arka plandaki CV analizini sınırlı süre bekle; yetişmezse mevcut etiketlerle devam et"""
+        if self.cv_tags_ready.is_set():
+            return
+        print(f"   [CV] Etiketler bekleniyor (en fazla {self.cv_tags_timeout:.0f} sn)...", flush=True)
+        if not self.cv_tags_ready.wait(self.cv_tags_timeout):
+            print("   [CV] CV analizi yetişmedi, soru CV'siz seçilecek", flush=True)
+
     def get_question_by_id(self, qid: str) -> Optional[Dict]:
         return next((q for q in self.questions if q.get("id") == qid), None)
 
@@ -223,7 +285,7 @@ class InterviewHandler:
             }
 
         try:
-            model = genai.GenerativeModel("gemini-2.5-pro")
+            model = get_model(ANALYSIS_MODEL)
         except Exception as e:
             print(f"Model hatası: {e}")
             # API hatası durumunda test modu
@@ -281,6 +343,10 @@ Respond with JSON: {{"score": 8, "feedback": "Good technical knowledge"}}"""
         7. Senaryo sorusu (kişiselleştirilmiş)
         8. Senaryo takip sorusu (7. soruya bağlı)
         """
+        preselected = self._take_preselected()
+        if preselected is not None:
+            return preselected
+
         asked_ids = {h["id"] for h in self.history}
         
         if self.current_phase == "kişisel":
@@ -303,6 +369,7 @@ Respond with JSON: {{"score": 8, "feedback": "Good technical knowledge"}}"""
         
         elif self.current_phase == "teknik1":
             # Teknik soru (bağımsız) - CV bazlı eşleştirme
+            self._wait_for_cv_tags()
             candidates = [q for q in self.questions 
                         if q.get("kategori") == "teknik" 
                         and q.get("follow_up_to") is None
@@ -314,7 +381,7 @@ Respond with JSON: {{"score": 8, "feedback": "Good technical knowledge"}}"""
                 cv_matched = self._filter_by_cv_tags(candidates)
                 if cv_matched:
                     candidates = cv_matched
-                    print(f"   [CV EŞLEŞTİRME] {len(candidates)} soru CV'ye uygun")
+                    self._log(f"   [CV EŞLEŞTİRME] {len(candidates)} soru CV'ye uygun")
             
             target = self.default_difficulty_by_phase.get("teknik1")
             pick = self._choose_by_difficulty(candidates, target)
@@ -357,13 +424,13 @@ Respond with JSON: {{"score": 8, "feedback": "Good technical knowledge"}}"""
                               if q.get("kategori") == "teknik"
                               and q["id"] not in asked_ids]
                 if candidates:
-                    print(f"   [ETİKET EŞLEŞTİRME] {len(candidates)} bağlamlı soru bulundu")
-                    print(f"   Önceki cevap etiketleri: {last_technical.get('tags', [])}")
+                    self._log(f"   [ETİKET EŞLEŞTİRME] {len(candidates)} bağlamlı soru bulundu")
+                    self._log(f"   Önceki cevap etiketleri: {last_technical.get('tags', [])}")
                     candidates = self._filter_by_prereqs(candidates)
                     target = self._target_difficulty_from_last("teknik2")
                     pick = self._choose_by_difficulty(candidates, target)
                     if pick:
-                        print(f"   [BAĞLAMLI SORU] Seçilen: {pick.get('id')} - Etiketler: {pick.get('etiketler', [])}")
+                        self._log(f"   [BAĞLAMLI SORU] Seçilen: {pick.get('id')} - Etiketler: {pick.get('etiketler', [])}")
                         return pick
 
                 # 3) Fallback_id tanımlıysa, o soruyu sor
@@ -399,6 +466,7 @@ Respond with JSON: {{"score": 8, "feedback": "Good technical knowledge"}}"""
         
         elif self.current_phase == "teknik3":
             # Teknik soru (bağımsız) - CV bazlı eşleştirme
+            self._wait_for_cv_tags()
             candidates = [q for q in self.questions 
                         if q.get("kategori") == "teknik" 
                         and q.get("follow_up_to") is None
@@ -410,7 +478,7 @@ Respond with JSON: {{"score": 8, "feedback": "Good technical knowledge"}}"""
                 cv_matched = self._filter_by_cv_tags(candidates)
                 if cv_matched:
                     candidates = cv_matched
-                    print(f"   [CV EŞLEŞTİRME] {len(candidates)} soru CV'ye uygun")
+                    self._log(f"   [CV EŞLEŞTİRME] {len(candidates)} soru CV'ye uygun")
             
             target = self._target_difficulty_from_last("teknik3")
             pick = self._choose_by_difficulty(candidates, target)
@@ -444,13 +512,13 @@ Respond with JSON: {{"score": 8, "feedback": "Good technical knowledge"}}"""
                               if q.get("kategori") == "teknik"
                               and q["id"] not in asked_ids]
                 if candidates:
-                    print(f"   [ETİKET EŞLEŞTİRME] {len(candidates)} bağlamlı soru bulundu")
-                    print(f"   Önceki cevap etiketleri: {last_technical.get('tags', [])}")
+                    self._log(f"   [ETİKET EŞLEŞTİRME] {len(candidates)} bağlamlı soru bulundu")
+                    self._log(f"   Önceki cevap etiketleri: {last_technical.get('tags', [])}")
                     candidates = self._filter_by_prereqs(candidates)
                     target = self._target_difficulty_from_last("teknik4")
                     pick = self._choose_by_difficulty(candidates, target)
                     if pick:
-                        print(f"   [BAĞLAMLI SORU] Seçilen: {pick.get('id')} - Etiketler: {pick.get('etiketler', [])}")
+                        self._log(f"   [BAĞLAMLI SORU] Seçilen: {pick.get('id')} - Etiketler: {pick.get('etiketler', [])}")
                         return pick
 
                 # 3) fallback_id varsa kullan
@@ -492,13 +560,14 @@ Respond with JSON: {{"score": 8, "feedback": "Good technical knowledge"}}"""
             if scenario_candidates:
                 # Havuzdan rastgele seç
                 scenario_q = random.choice(scenario_candidates)
-                # Seçilen senaryoyu kaydet (8. soru için)
-                self.last_scenario_question = scenario_q
-                print(f"   [SENARYO] Havuzdan seçildi: {scenario_q['id']}", flush=True)
+                # Seçilen senaryoyu kaydet (8. soru için); ön seçimde soru kullanılınca kaydedilir
+                if self._preselect_log is None:
+                    self.last_scenario_question = scenario_q
+                self._log(f"   [SENARYO] Havuzdan seçildi: {scenario_q['id']}")
                 return scenario_q
             else:
                 # Fallback: LLM ile üret
-                print(f"   [SENARYO] Havuzda soru kalmadı, LLM ile üretiliyor...", flush=True)
+                self._log(f"   [SENARYO] Havuzda soru kalmadı, LLM ile üretiliyor...")
                 scenario = self.generate_personal_scenario()
                 self.last_scenario = scenario or {}
                 return {
@@ -518,7 +587,7 @@ Respond with JSON: {{"score": 8, "feedback": "Good technical knowledge"}}"""
         elif self.current_phase == "takip":
             # 8. Soru: LLM ile kişiselleştirilmiş takip sorusu üret
             # 7. soruya + tüm önceki cevaplara bakarak
-            print(f"   [TAKİP] LLM ile kişiselleştirilmiş takip sorusu üretiliyor...", flush=True)
+            self._log(f"   [TAKİP] LLM ile kişiselleştirilmiş takip sorusu üretiliyor...")
             
             # 7. sorunun metnini al
             last_scenario_text = ""
@@ -549,6 +618,75 @@ Respond with JSON: {{"score": 8, "feedback": "Good technical knowledge"}}"""
 
         return random.choice(self.questions)
 
+    def _log(self, message: str):
+        """Soru seçimi mesajı; ön seçimdeyse soru gerçekten kullanılana kadar bekletilir"""
+        if self._preselect_log is not None:
+            self._preselect_log.append(message)
+        else:
+            print(message, flush=True)
+
+    def preselect_next_question(self, current_question: Dict) -> Optional[Dict]:
+        """
+        Aday cevap verirken bir sonraki soruyu seçer (yalnızca PRESELECT_PHASES fazlarında).
+        Seçim saklanır; sıradaki get_next_question_by_phase hâlâ geçerliyse onu döndürür.
+        Uyarlamalı fazlarda (bağlı teknik, takip) veya CV etiketleri hazır değilse None döner.
+        """
+        saved_history, saved_phase = self.history, self.current_phase
+        self._preselected = None
+        self._preselect_log = []
+        # Mevcut soru cevaplanmış gibi geçmişe eklenir (seçim yalnızca id/etiketlere bakar)
+        self.history = saved_history + [{
+            "id": current_question["id"],
+            "kategori": current_question.get("kategori"),
+            "soru": current_question.get("soru"),
+            "answer": "",
+            "tags": current_question.get("etiketler", []),
+        }]
+        try:
+            self.advance_phase()
+            phase = self.current_phase
+            if phase not in PRESELECT_PHASES:
+                return None
+            if phase == "teknik1" and not self.cv_tags_ready.is_set():
+                return None
+            if phase == "senaryo":
+                asked_ids = {h["id"] for h in self.history}
+                # Havuz boşsa senaryo LLM ile üretilir; önceden üretilmez
+                if not any(q.get("kategori") == "senaryo" and q["id"] not in asked_ids for q in self.questions):
+                    return None
+            pick = self.get_next_question_by_phase()
+        finally:
+            self.history, self.current_phase = saved_history, saved_phase
+            log, self._preselect_log = self._preselect_log, None
+
+        self._preselected = {
+            "question": pick,
+            "phase": phase,
+            "history_len": len(saved_history) + 1,
+            "cv_tags": tuple(self.cv_tags),
+            "log": log,
+        }
+        return pick
+
+    def _take_preselected(self) -> Optional[Dict]:
+        """Önceden seçilen soruyu (durum değişmediyse) bir kez döndürür"""
+        pre, self._preselected = self._preselected, None
+        if pre is None:
+            return None
+        if (pre["phase"] != self.current_phase
+                or pre["history_len"] != len(self.history)
+                or pre["question"]["id"] in {h["id"] for h in self.history}):
+            return None
+        # CV etiketleri seçimden sonra geldiyse CV bazlı seçim yeniden yapılır
+        if pre["phase"] == "teknik1" and tuple(self.cv_tags) != pre["cv_tags"]:
+            return None
+        # Seçim kullanılıyor: bekletilen mesajlar yazdırılır ve senaryo (takip sorusu için) kaydedilir
+        for message in pre["log"]:
+            print(message, flush=True)
+        if pre["phase"] == "senaryo":
+            self.last_scenario_question = pre["question"]
+        return pre["question"]
+
     def advance_phase(self):
         """Mülakat fazını ilerletir"""
         # Soru sayısına göre faz belirle
@@ -636,7 +774,7 @@ Sadece JSON döndür:
 {{"scenario": "Projenizde kritik bir bug bulundu ve müşteri toplantısı 2 saat sonra. Ekip lideri tatilde. Ne yaparsınız?", "follow_up": "Ekip bu çözümü kabul etmezse nasıl ilerlersiniz?"}}
 """
         
-        model = genai.GenerativeModel("gemini-2.0-flash-exp")  # Daha hızlı model
+        model = get_model(FAST_MODEL)  # Daha hızlı model
         
         # Güvenlik ayarlarını gevşet
         safety_settings = [
@@ -739,7 +877,7 @@ Sadece takip sorusunu döndür (JSON değil, düz metin):
 """
         
         try:
-            model = genai.GenerativeModel("gemini-2.0-flash-exp")
+            model = get_model(FAST_MODEL)
             
             safety_settings = [
                 {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
@@ -1,16 +1,91 @@
 # main.py
-from llm_handler import InterviewHandler
+from llm_handler import InterviewHandler, warm_up_models
 from text_to_speech import text_to_speech_playback
-from speech_to_text import record_and_convert
+from speech_to_text import record_and_convert, MAX_RECORDING_SECONDS, LONG_ANSWER_MAX_SECONDS
 from analysis_handler import AnalysisHandler
 from reports import generate_final_report
 from cv_manager import CVManager
+from speech_clients import get_client_manager
+from audio_engine import AudioEngine, EngineSource
+from streaming_analysis import IncrementalAudioAnalyzer
+from analysis_pool import AnalysisExecutor
+from startup import StartupCoordinator
+from tts_prefetch import TTSPrefetcher
 import random
 import os
 import shutil
+from typing import Optional
 import warnings
 warnings.filterwarnings("ignore")
 
+# CV etiketleri 3. soruya (teknik1) kadar hazır değilse en fazla bu kadar beklenir
+CV_TAGS_WAIT_SEC = 5.0
+# Ses skorunun kaynağı: LLM'e tur içinde artımlı skor gider, rapor ayrıntılı (süreç havuzu) skoru kullanır
+AUDIO_SOURCE_STREAM = "artımlı analiz"
+AUDIO_SOURCE_DETAILED = "ayrıntılı analiz"
+AUDIO_SOURCE_TEXT = "yalnızca metin"
+
+
+def _load_question_pool(cv_path: str = None) -> InterviewHandler:
+    """Soru havuzunu yükler; CV verildiyse etiketlerin sonradan geleceğini bildirir"""
+    ih = InterviewHandler(question_dir="question_pool")
+    if cv_path:
+        # Etiketler 3. soruya (teknik1) kadar gelmezse en fazla CV_TAGS_WAIT_SEC beklenir
+        ih.expect_cv_tags(timeout=CV_TAGS_WAIT_SEC)
+    return ih
+
+
+def _load_cv(cv_path: str) -> Optional[CVManager]:
+    """
+    CV yükleme + yerel etiket çıkarma (açılış işi). Soru havuzunu beklemez;
+    yalnızca CV dosyasına ihtiyaç duyar. Hata durumunda None döner.
+    """
+    try:
+        print("\n=== CV ANALİZİ (arka planda) ===", flush=True)
+        cv_manager = CVManager()
+        if not cv_manager.load_cv(cv_path):
+            return None
+        # Yerel sözlükle etiketler hemen hazır; Gemini analizi opsiyonel zenginleştirmedir
+        cv_manager.extract_local_tags()
+        return cv_manager
+    except Exception as e:
+        print(f"⚠️ CV analizi hatası: {e}")
+        print("   Mülakat CV olmadan devam edecek\n")
+        return None
+
+
+def _apply_cv_tags(ih: InterviewHandler, cv_manager: Optional[CVManager]):
+    """
+    Açılış işi: soru havuzu ve CV hazır olunca yerel etiketleri verir ve Gemini
+    zenginleştirmesini (CVManager.start_llm_enrichment) başlatır.
+    """
+    def _on_enriched(future):
+        try:
+            if future.result():
+                ih.update_cv_tags(cv_manager.get_matching_tags())
+        except Exception as e:
+            print(f"⚠️ CV LLM analizi hatası: {e}")
+
+    try:
+        if cv_manager is None:
+            return
+        cv_tags = list(cv_manager.local_tags)
+        ih.update_cv_tags(cv_tags)
+        print(f"✅ CV etiketleri çıkarıldı: {', '.join(cv_tags[:15])}", flush=True)
+        cv_manager.start_llm_enrichment().add_done_callback(_on_enriched)
+    finally:
+        # Hata/eksik durumda teknik soru seçimi beklemede kalmasın
+        ih.cv_tags_ready.set()
+
+
+def _warm_up_speech_clients():
+    """STT/TTS istemcilerini oluşturup kanallarını ısıtır (açılış işi olarak çalışır)"""
+    speech_clients = get_client_manager()
+    speech_clients.warm_up()
+    speech_clients.wait_ready()
+    return speech_clients
+
+
 def run_interview(cv_path: str = None):
     """
     Mülakat sistemini başlatır
@@ -18,35 +93,45 @@ def run_interview(cv_path: str = None):
     Args:
         cv_path: CV dosyasının yolu (opsiyonel). PDF, DOCX veya TXT formatında olabilir.
     """
-    # CV varsa analiz et
-    cv_tags = []
+    speech_clients = get_client_manager()
+    # Bağımsız hazırlık işleri aynı anda başlar; yalnızca gereken yerde beklenir
+    startup = StartupCoordinator()
+    startup.start("soru_havuzu", _load_question_pool, cv_path)
     if cv_path:
-        print("\n=== CV ANALİZİ ===")
-        try:
-            cv_manager = CVManager()
-            if cv_manager.load_cv(cv_path):
-                cv_analysis = cv_manager.analyze_cv_with_llm()
-                if cv_analysis:
-                    cv_tags = cv_manager.get_matching_tags()
-                    print(f"\n✅ CV analizi tamamlandı!")
-                    print(f"   Toplam {len(cv_tags)} etiket çıkarıldı")
-                    print(f"   Etiketler: {', '.join(cv_tags[:15])}")
-                    print(f"   Teknik sorular CV'nize göre özelleştirilecek\n")
-        except Exception as e:
-            print(f"⚠️ CV analizi hatası: {e}")
-            print("   Mülakat CV olmadan devam edecek\n")
-    
-    # Interview Handler'ı CV etiketleriyle başlat
-    ih = InterviewHandler(question_dir="question_pool", cv_tags=cv_tags)
-    # Doğru akış: kişisel sorulardan başla
-    ih.current_phase = "kişisel"
-    
+        # CV okuma/etiketleme açılışta başlar; yalnızca etiketleri vermek soru havuzunu bekler
+        startup.start("cv_analizi", _load_cv, cv_path)
+        startup.start("cv_etiketleri", _apply_cv_tags, depends_on=("soru_havuzu", "cv_analizi"))
+    startup.start("gemini_modelleri", warm_up_models)
+    startup.start("speech_tts", _warm_up_speech_clients)
+    startup.start("ses_motoru", lambda: AudioEngine().start())
+    # Ana süreçte yalnızca tur içi (artımlı) analiz yolu ısıtılır; librosa burada yüklenmez
+    audio_analyzer = AnalysisHandler()
+    startup.start("ses_analizi", audio_analyzer.warm_up, full=False)
+    # Ayrıntılı (dosya bazlı) ses analizi ayrı süreçlerde; mülakat akışını bekletmez.
+    # Tur içi skor kayıt sırasındaki artımlı analizden gelir, rapordan önce ayrıntılı sonuçlar beklenir.
+    # Havuz nesnesi hemen oluşur; işçiler ilk soru çalarken açılıp ısıtılır (aşağıda warm_up).
+    # Ton analizi hızlı YIN; pyin ANALYSIS_PITCH_MODE=pyin ile seçilir (rapor gecikmesi artar).
+    startup.start("analiz_havuzu", AnalysisExecutor)
+
     # data klasörünü oluştur
     if not os.path.exists("data"):
         os.makedirs("data")
-    
-    # Ses analizi handler'ını başlat
-    audio_analyzer = AnalysisHandler()
+
+    # Bariyer: ilk soru için yalnızca soru havuzu gerekir
+    ih = startup.get("soru_havuzu")
+    if ih is None:
+        raise RuntimeError("Soru havuzu yüklenemedi")
+    # Doğru akış: kişisel sorulardan başla
+    ih.current_phase = "kişisel"
+
+    # Oturum boyunca açık kalan ses motoru (soru çalarken araya girmeye izin verir)
+    audio_engine = startup.get("ses_motoru")
+    if audio_engine is None:
+        print("[UYARI] Ses motoru başlatılamadı, tur başına cihaz açılacak")
+    analysis_pool = None
+    pending_analyses = []  # (history indeksi, future, text_metrics)
+    # Sıradaki soru önceden belliyse sesi aday cevap verirken hazırlanır
+    prefetcher = TTSPrefetcher()
     
     print("=== Akıllı Mülakat Sistemi ===")
     print("Mülakat akışı:")
@@ -66,11 +151,28 @@ def run_interview(cv_path: str = None):
         current_q = ih.get_next_question_by_phase()
         print(f"\n=== Soru {turn} ({ih.current_phase.upper()}) ===")
         print(f"Soru: {current_q['soru']}")
+        if turn == 1:
+            startup.mark("ilk_soru")
+            print(startup.timeline())
+            # Analiz işçileri ilk soru çalarken açılır ve librosa/numba ısınmasını yapar
+            analysis_pool = startup.get("analiz_havuzu")
+            if analysis_pool is not None:
+                analysis_pool.warm_up()
+        # Seçim değiştiyse boşa giden ön sentezler iptal edilir
+        prefetcher.retain_only(current_q['soru'])
         # Soruyu seslendir ve data/ klasörüne kaydet
         try:
-            text_to_speech_playback(current_q['soru'], question_number=turn, save_to_data=True)
+            text_to_speech_playback(current_q['soru'], question_number=turn, save_to_data=True,
+                                    engine=audio_engine, audio_content=prefetcher.take(current_q['soru']))
         except Exception as e:
             print(f"TTS oynatma hatası: {e}")
+        # Sonraki soru bu cevaptan bağımsızsa şimdiden seçilip seslendirilir
+        try:
+            next_q = ih.preselect_next_question(current_q)
+            if next_q is not None:
+                prefetcher.prefetch(next_q['soru'])
+        except Exception as e:
+            print(f"[UYARI] Sonraki soru önceden hazırlanamadı: {e}")
         # Debug: zorluk düzeyi göster
         try:
             print(f"Zorluk: {current_q.get('difficulty_level', 'N/A')}")
@@ -80,8 +182,15 @@ def run_interview(cv_path: str = None):
         # Kullanıcıdan sesli cevap al (Google STT) ve data/ klasörüne kaydet
         print("Cevabınızı mikrofona söyleyin...")
         stt_result = None
+        # Ses analizi kayıt sırasında chunk chunk yapılır
+        stream_analysis = IncrementalAudioAnalyzer(sample_rate=16000)
         try:
-            stt_result = record_and_convert(question_number=turn)
+            source = EngineSource(audio_engine) if audio_engine is not None else None
+            # Senaryo ve takip cevapları uzun olabilir; kayıt sınırı yükseltilir
+            is_scenario = current_q.get('kategori') == 'senaryo' or 'senaryo' in current_q.get('etiketler', [])
+            max_seconds = LONG_ANSWER_MAX_SECONDS if is_scenario else MAX_RECORDING_SECONDS
+            stt_result = record_and_convert(question_number=turn, source=source, max_seconds=max_seconds,
+                                            on_audio=stream_analysis.update)
         except Exception as e:
             print(f"STT hatası: {e}")
             stt_result = None
@@ -89,24 +198,46 @@ def run_interview(cv_path: str = None):
         # Ses analizi değişkenlerini başlat
         audio_analysis = None
         overall_audio_score = None
+        detailed_future = None
+        text_metrics = None
         
         if stt_result and stt_result.get('transcript'):
             user_answer = stt_result['transcript']
             print(f"Algılanan cevap: {user_answer}")
             
-            # Ses dosyası analizi (eğer dosya varsa)
+            # Ses analizi: kaydedicinin bellekteki tamponu doğrudan kullanılır (yoksa dosya)
             audio_file_path = stt_result.get('audio_file')
-            if audio_file_path and os.path.exists(audio_file_path):
-                print("Ses dosyası analizi yapılıyor...")
+            audio_pcm = stt_result.get('audio_pcm')
+            if audio_pcm is not None or (audio_file_path and os.path.exists(audio_file_path)):
+                print("Ses analizi yapılıyor...")
                 try:
-                    # Ses dosyasını analiz et
-                    audio_metrics = audio_analyzer.analyze_audio_file(audio_file_path)
+                    if audio_pcm is not None and analysis_pool is None:
+                        # Bariyer: süreç havuzu ilk cevapta gerekir
+                        analysis_pool = startup.get("analiz_havuzu")
+                    if audio_pcm is not None and analysis_pool is not None:
+                        # Ayrıntılı analiz süreç havuzunda (paylaşımlı bellek ile) başlar
+                        detailed_future = analysis_pool.submit(
+                            audio_pcm, stt_result.get('sample_rate', 16000), words=stt_result.get('words')
+                        )
+                    if stream_analysis.duration > 0:
+                        audio_metrics = audio_analyzer.analyze_stream(
+                            stream_analysis, words=stt_result.get('words')
+                        )
+                    elif detailed_future is not None:
+                        audio_metrics = detailed_future.result()
+                    else:
+                        audio_metrics = audio_analyzer.analyze_audio_file(
+                            audio_file_path, words=stt_result.get('words')
+                        )
                     
                     # Metin analizi yap
                     text_metrics = audio_analyzer.analyze_text_for_fillers(user_answer)
                     
                     # Genel skor hesapla (ses + metin)
                     overall_audio_score = audio_analyzer.calculate_overall_score(audio_metrics, text_metrics)
+                    overall_audio_score['kaynak'] = (
+                        AUDIO_SOURCE_STREAM if stream_analysis.duration > 0 else AUDIO_SOURCE_DETAILED
+                    )
                     
                     print(f"Ses analizi tamamlandı - Genel skor: {overall_audio_score['overall_score']}/100")
                 except Exception as e:
@@ -121,7 +252,8 @@ def run_interview(cv_path: str = None):
                                 'konuşma_hızı': 80,
                                 'ses_tonu': 80
                             },
-                            'confidence_level': 'metin-bazlı'
+                            'confidence_level': 'metin-bazlı',
+                            'kaynak': AUDIO_SOURCE_TEXT
                         }
                     except Exception as e2:
                         print(f"Metin analizi hatası: {e2}")
@@ -138,7 +270,8 @@ def run_interview(cv_path: str = None):
                             'konuşma_hızı': 80,
                             'ses_tonu': 80
                         },
-                        'confidence_level': 'metin-bazlı'
+                        'confidence_level': 'metin-bazlı',
+                        'kaynak': AUDIO_SOURCE_TEXT
                     }
                     print(f"Metin analizi tamamlandı - Genel skor: {overall_audio_score['overall_score']}/100")
                 except Exception as e:
@@ -155,7 +288,7 @@ def run_interview(cv_path: str = None):
         # Ses analizi varsa LLM'e gönder
         if overall_audio_score:
             audio_context = f"""
-Ses Analizi Sonuçları:
+Ses Analizi Sonuçları ({overall_audio_score.get('kaynak', AUDIO_SOURCE_STREAM)}):
 - Genel ses skoru: {overall_audio_score['overall_score']}/100
 - Akıcılık: {overall_audio_score['scores']['akıcılık']}/100
 - Konuşma hızı: {overall_audio_score['scores']['konuşma_hızı']}/100
@@ -174,6 +307,8 @@ Ses Analizi Sonuçları:
         # Kaydet (bu otomatik olarak fazı ilerletir)
         # Ses skorunu da ekle
         ih.record_turn(current_q, user_answer, analysis, audio_score=overall_audio_score)
+        if detailed_future is not None:
+            pending_analyses.append((len(ih.history) - 1, detailed_future, text_metrics))
 
         # Mülakat tamamlandı mı kontrol et
         if ih.current_phase == "tamamlandı":
@@ -181,6 +316,25 @@ Ses Analizi Sonuçları:
 
     print("\n=== Mülakat Tamamlandı ===")
     print("Teşekkürler! Değerlendirme raporu hazırlanıyor...")
+
+    # Ayrıntılı ses analizlerini bekle; rapor bu sonuçlarla hazırlanır
+    for index, future, turn_text_metrics in pending_analyses:
+        try:
+            detailed_metrics = future.result()
+            if 'error' not in detailed_metrics:
+                # LLM'in gördüğü artımlı skor ayrı anahtarda saklanır; rapor ayrıntılı skoru kaynağıyla gösterir
+                entry = ih.history[index]
+                if entry.get("audio_score"):
+                    entry["audio_score_stream"] = entry["audio_score"]
+                entry["audio_score"] = audio_analyzer.calculate_overall_score(detailed_metrics, turn_text_metrics)
+                entry["audio_score"]["kaynak"] = AUDIO_SOURCE_DETAILED
+        except Exception as e:
+            print(f"Ayrıntılı ses analizi hatası (soru {index + 1}): {e}")
+    analysis_pool = analysis_pool or startup.get("analiz_havuzu")
+    if analysis_pool is not None:
+        analysis_pool.shutdown()
+    startup.shutdown()
+    prefetcher.shutdown()
     
     # Detaylı rapor oluştur
     try:
@@ -197,6 +351,11 @@ Ses Analizi Sonuçları:
     for i, h in enumerate(ih.history, 1):
         print(f"{i}. {h.get('kategori', 'Bilinmeyen')} - Puan: {h.get('analysis', {}).get('score', 'N/A')}")
     
+    print("\n" + speech_clients.latency_report())
+
+    if audio_engine is not None:
+        audio_engine.close()
+    
     # Tüm ses dosyalarını temizle (soru-1.wav, soru-2.wav, soru-sesi-1.wav, vb.)
     print("\n--- Ses Dosyaları Temizleniyor ---")
     try:
@@ -0,0 +1,147 @@
+"""
+measure_startup.py
+Soğuk başlangıç (cold-start) süresini ölçer.
+
+Her modül ayrı, temiz bir Python sürecinde import edilir (önceki importların
+önbelleği ölçümü etkilemez). İsteğe bağlı olarak ses analizinin ilk çağrı süresi
+(ısınmasız soğuk süreçte ve analiz işçisi gibi ısınmış ayrı bir süreçte) ve
+python -X importtime çıktısındaki en ağır importlar da raporlanır.
+
+Kullanım:
+    python measure_startup.py                 # modül import süreleri
+    python measure_startup.py --warmup        # + ilk analiz çağrısı: soğuk / ısınma sonrası
+    python measure_startup.py --top 15        # + en ağır 15 import (main için)
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Optional, Tuple
+
+MODULES = [
+    "main",
+    "analysis_handler",
+    "speech_to_text",
+    "text_to_speech",
+    "llm_handler",
+    "cv_manager",
+    "librosa",
+]
+
+_IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+# Mülakattaki ilk cevaba benzer 3 sn'lik sentetik ses (ton + sessizlik)
+_SIGNAL_SNIPPET = (
+    "import numpy as np; x = np.arange(48000) / 16000; "
+    "y = (6000 * np.sin(2 * np.pi * 150 * x) * ((x % 1.0) < 0.7)).astype(np.int16); "
+)
+
+# Soğuk: hiçbir ısınma yapılmadan ilk analyze_buffer çağrısı
+_FIRST_CALL_SNIPPET = (
+    "import time; t = time.perf_counter(); "
+    "from analysis_handler import AnalysisHandler; h = AnalysisHandler(pitch_mode='{pitch_mode}'); "
+    "i = time.perf_counter() - t; " + _SIGNAL_SNIPPET +
+    "t = time.perf_counter(); h.analyze_buffer(y, 16000); first = time.perf_counter() - t; "
+    "print(i, first)"
+)
+
+# Isınma sonrası: analiz havuzu işçisinin yaptığı gibi warm_up, ardından ilk analyze_buffer çağrısı
+_WARMUP_SNIPPET = (
+    "from analysis_handler import AnalysisHandler; h = AnalysisHandler(pitch_mode='{pitch_mode}'); "
+    + _SIGNAL_SNIPPET +
+    "w = h.warm_up(); import time; t = time.perf_counter(); h.analyze_buffer(y, 16000); "
+    "after = time.perf_counter() - t; print(w, after)"
+)
+
+
+def _run(code: str, extra_args: Optional[List[str]] = None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable] + (extra_args or []) + ["-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True,
+    )
+
+
+def measure_import(module: str) -> Optional[float]:
+    """Modülün temiz bir süreçte import süresi (sn); import başarısızsa None"""
+    proc = _run(_IMPORT_SNIPPET.format(module=module))
+    if proc.returncode != 0:
+        return None
+    try:
+        return float(proc.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        return None
+
+
+def _run_floats(code: str) -> Optional[Tuple[float, ...]]:
+    proc = _run(code)
+    if proc.returncode != 0:
+        print(f"[HATA] Ölçülemedi: {proc.stderr.strip().splitlines()[-1] if proc.stderr else ''}")
+        return None
+    values = proc.stdout.strip().splitlines()[-1].split()
+    return tuple(float(v) for v in values)
+
+
+def measure_warmup(pitch_mode: str = "pyin") -> Optional[Tuple[float, float, float, float]]:
+    """
+    (analysis_handler import, soğuk ilk çağrı, ısınma, ısınma sonrası ilk çağrı) süreleri.
+    Soğuk ilk çağrı hiç ısınma yapılmamış temiz bir süreçte ölçülür; ısınma ayrı bir süreçtedir.
+    """
+    cold = _run_floats(_FIRST_CALL_SNIPPET.format(pitch_mode=pitch_mode))
+    warm = _run_floats(_WARMUP_SNIPPET.format(pitch_mode=pitch_mode))
+    if cold is None or warm is None:
+        return None
+    return cold + warm
+
+
+def heaviest_imports(module: str, top: int) -> List[Tuple[int, str]]:
+    """python -X importtime çıktısından kümülatif süresi en yüksek importlar (mikrosaniye, ad)"""
+    proc = _run(f"import {module}", ["-X", "importtime"])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            _, self_us, cumulative_us, name = [p.strip() for p in line.split("|", 3)]
+            rows.append((int(cumulative_us), name.strip()))
+        except ValueError:
+            continue
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soğuk başlangıç ölçümü")
+    parser.add_argument("--modules", nargs="*", default=MODULES, help="Ölçülecek modüller")
+    parser.add_argument("--warmup", action="store_true", help="İlk ses analizi çağrısını (soğuk / ısınmış) ölç")
+    parser.add_argument("--pitch-mode", default="fast", choices=("fast", "pyin"),
+                        help="Ölçülecek pitch yöntemi (analiz havuzu varsayılanı fast)")
+    parser.add_argument("--top", type=int, default=0, help="main için en ağır N importu göster")
+    args = parser.parse_args()
+
+    print("=== Import Süreleri (temiz süreç) ===")
+    for module in args.modules:
+        seconds = measure_import(module)
+        print(f"{module:20s} {'import edilemedi' if seconds is None else f'{seconds * 1000:8.0f} ms'}")
+
+    if args.warmup:
+        result = measure_warmup(args.pitch_mode)
+        if result:
+            import_sec, cold, warm_up, after = result
+            print(f"\n=== İlk Ses Analizi Çağrısı ({args.pitch_mode}, 3 sn ses) ===")
+            print(f"analysis_handler import:          {import_sec * 1000:.0f} ms")
+            print(f"İlk çağrı, ısınmasız (soğuk):     {cold * 1000:.0f} ms")
+            print(f"İşçi ısınması (librosa + JIT):    {warm_up * 1000:.0f} ms")
+            print(f"İlk çağrı, ısınmadan sonra:       {after * 1000:.0f} ms")
+
+    if args.top:
+        print(f"\n=== En Ağır {args.top} Import (main) ===")
+        for cumulative_us, name in heaviest_imports("main", args.top):
+            print(f"{cumulative_us / 1000:8.0f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+pitch.py
+Ses tonu (F0) analizi için hızlı, vektörel YIN tahmincisi.
+
+librosa.pyin tüm cevabı C2-C7 aralığında olasılıksal olarak tarar ve tur başına
+analiz süresinin büyük kısmını alır. Ton değerlendirmesi yalnızca F0'ın standart
+sapmasını kullandığı için burada:
+- Frekans aralığı konuşmaya (65-400 Hz) daraltılır
+- Yalnızca enerjiye göre sesli olan çerçeveler analiz edilir
+- YIN fark fonksiyonu tüm çerçeveler için tek seferde FFT ile hesaplanır
+
+pyin ile uyum ve hız ölçümü:
+    python pitch.py fixtures/
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+from typing import Dict, Optional
+
+import numpy as np
+
+SPEECH_FMIN = 65.0      # ~C2, kalın erkek sesi
+SPEECH_FMAX = 400.0     # Konuşma F0'ı nadiren bunun üstüne çıkar
+FRAME_LENGTH = 2048     # librosa.pyin varsayılanlarıyla aynı çerçeve/hop
+HOP_LENGTH = 512
+YIN_THRESHOLD = 0.15
+VOICED_DB_BELOW_PEAK = 25.0  # En yüksek enerjili çerçevelerin bu kadar altı sessiz sayılır
+OCTAVE_RATIO = 1.9           # Medyandan bu oranda sapan değerler oktav hatası sayılır
+
+# Ton değerlendirme eşikleri (F0 standart sapması, Hz)
+MONOTONE_STD = 20
+VARIABLE_STD = 50
+
+
+def rate_pitch(pitch_std: float) -> str:
+    """F0 standart sapmasından ton değerlendirmesi"""
+    if pitch_std < MONOTONE_STD:
+        return "monoton"
+    elif pitch_std > VARIABLE_STD:
+        return "çok değişken"
+    return "dengeli"
+
+
+def _frame(y: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """Kopyasız (n, frame_length) çerçeve görünümü"""
+    if len(y) < frame_length:
+        y = np.pad(y, (0, frame_length - len(y)))
+    n = 1 + (len(y) - frame_length) // hop_length
+    return np.lib.stride_tricks.as_strided(
+        y, shape=(n, frame_length), strides=(y.strides[0] * hop_length, y.strides[0])
+    )
+
+
+def voiced_frames(frames: np.ndarray, db_below_peak: float = VOICED_DB_BELOW_PEAK) -> np.ndarray:
+    """Enerjiye göre sesli (konuşma olan) çerçevelerin maskesi"""
+    energy = np.mean(frames * frames, axis=1) + 1e-12
+    energy_db = 10.0 * np.log10(energy)
+    peak = np.percentile(energy_db, 95)
+    return energy_db > peak - db_below_peak
+
+
+def yin_pitch(y: np.ndarray, sr: int, fmin: float = SPEECH_FMIN, fmax: float = SPEECH_FMAX,
+              frame_length: int = FRAME_LENGTH, hop_length: int = HOP_LENGTH,
+              threshold: float = YIN_THRESHOLD, frames: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Vektörel YIN ile çerçeve başına F0 (Hz). Sessiz/sessiz-harf çerçeveler NaN.
+    pyin ile aynı çerçeveleme kullanılır, böylece sonuçlar karşılaştırılabilir.
+    frames verilirse (bkz. audio_features) sinyal yeniden çerçevelenmez.
+    """
+    if frames is None:
+        y = np.ascontiguousarray(y, dtype=np.float32)
+        frames = _frame(y, frame_length, hop_length)
+    f0 = np.full(len(frames), np.nan, dtype=np.float32)
+    if not len(frames):
+        return f0
+
+    mask = voiced_frames(frames)
+    if mask.any():
+        f0[np.flatnonzero(mask)] = yin_frames(frames[mask], sr, fmin, fmax, threshold)
+    return f0
+
+
+def yin_frames(frames: np.ndarray, sr: int, fmin: float = SPEECH_FMIN, fmax: float = SPEECH_FMAX,
+               threshold: float = YIN_THRESHOLD) -> np.ndarray:
+    """(n, frame_length) çerçevelerin her biri için YIN F0 (Hz); periyot bulunamazsa NaN"""
+    if not len(frames):
+        return np.zeros(0, dtype=np.float32)
+    x = frames.astype(np.float64)
+    frame_length = x.shape[1]
+    tau_min = max(2, int(sr / fmax))
+    tau_max = min(int(sr / fmin) + 1, frame_length // 2)
+    w = frame_length - tau_max  # Karşılaştırma penceresi
+
+    # Çapraz terim r(tau) = sum_j x[j] * x[j + tau], tüm çerçeveler için FFT ile
+    n_fft = 1 << int(np.ceil(np.log2(frame_length + w)))
+    spec_full = np.fft.rfft(x, n_fft, axis=1)
+    spec_win = np.fft.rfft(x[:, :w], n_fft, axis=1)
+    r = np.fft.irfft(spec_full * np.conj(spec_win), n_fft, axis=1)[:, :tau_max + 1]
+
+    # Enerji terimleri kümülatif toplamla
+    cs = np.concatenate([np.zeros((len(x), 1)), np.cumsum(x * x, axis=1)], axis=1)
+    taus = np.arange(tau_max + 1)
+    e0 = cs[:, w:w + 1]
+    e_tau = cs[:, taus + w] - cs[:, taus]
+    d = np.maximum(e0 + e_tau - 2.0 * r, 0.0)
+
+    # Kümülatif ortalamayla normalize edilmiş fark fonksiyonu (CMNDF)
+    cmndf = np.ones_like(d)
+    cum = np.cumsum(d[:, 1:], axis=1)
+    cmndf[:, 1:] = d[:, 1:] * taus[1:] / (cum + 1e-12)
+
+    # Eşiğin altındaki ilk yerel minimum
+    seg = cmndf[:, tau_min:tau_max]
+    left = cmndf[:, tau_min - 1:tau_max - 1]
+    right = cmndf[:, tau_min + 1:tau_max + 1]
+    candidates = (seg < threshold) & (seg <= left) & (seg <= right)
+    has_pitch = candidates.any(axis=1)
+    idx = np.argmax(candidates, axis=1) + tau_min
+
+    # Parabolik interpolasyon ile alt-örnek gecikme
+    rows = np.arange(len(x))
+    a = cmndf[rows, idx - 1]
+    b = cmndf[rows, idx]
+    c = cmndf[rows, np.minimum(idx + 1, tau_max)]
+    denom = a - 2 * b + c
+    shift = np.divide(0.5 * (a - c), denom, out=np.zeros_like(denom), where=np.abs(denom) > 1e-12)
+    tau = idx + np.clip(shift, -1.0, 1.0)
+
+    return np.where(has_pitch, sr / tau, np.nan).astype(np.float32)
+
+
+def f0_std(f0: np.ndarray) -> Optional[float]:
+    """
+    Çerçeve F0 dizisinden standart sapma: NaN'lar atılır, medyandan OCTAVE_RATIO
+    oranında sapan oktav hataları ayıklanır. Her iki tahminci de bunu kullanır,
+    böylece hızlı mod ile pyin aynı istatistiği verir. Ses yoksa None.
+    """
+    f0 = np.asarray(f0, dtype=np.float64)
+    f0 = f0[~np.isnan(f0)]
+    if len(f0) == 0:
+        return None
+    median = np.median(f0)
+    f0 = f0[(f0 < median * OCTAVE_RATIO) & (f0 > median / OCTAVE_RATIO)]
+    return float(np.std(f0))
+
+
+def pitch_std_fast(y: np.ndarray, sr: int, frames: Optional[np.ndarray] = None) -> Optional[float]:
+    """Hızlı modda F0 standart sapması (bkz. f0_std). Ses yoksa None."""
+    return f0_std(yin_pitch(y, sr, frames=frames))
+
+
+def pitch_std_pyin(y: np.ndarray, sr: int) -> Optional[float]:
+    """Referans: librosa.pyin (C2-C7) ile F0 standart sapması (bkz. f0_std)"""
+    import librosa
+    f0, _, _ = librosa.pyin(y, fmin=librosa.note_to_hz('C2'), fmax=librosa.note_to_hz('C7'), sr=sr)
+    return f0_std(f0)
+
+
+def evaluate_fixtures(fixture_dir: str) -> Dict:
+    """
+    Klasördeki WAV'lar üzerinde hızlı mod ile pyin'i karşılaştırır:
+    çalışma süresi, F0 std farkı ve ton değerlendirmesi uyumu.
+    """
+    results = []
+    for fn in sorted(os.listdir(fixture_dir)):
+        if not fn.endswith(".wav"):
+            continue
+        with wave.open(os.path.join(fixture_dir, fn), "rb") as wf:
+            if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+                print(f"[UYARI] {fn}: yalnızca 16-bit mono desteklenir, atlandı")
+                continue
+            sr = wf.getframerate()
+            y = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+
+        row = {"file": fn, "duration": round(len(y) / sr, 2)}
+        for name, fn_std in (("fast", pitch_std_fast), ("pyin", pitch_std_pyin)):
+            started = time.perf_counter()
+            std = fn_std(y, sr)
+            row[name] = {
+                "seconds": round(time.perf_counter() - started, 3),
+                "pitch_std": round(std, 1) if std is not None else None,
+                "rating": rate_pitch(std) if std is not None else "unknown",
+            }
+        row["agree"] = row["fast"]["rating"] == row["pyin"]["rating"]
+        results.append(row)
+
+    summary = {"files": len(results)}
+    if results:
+        fast_total = sum(r["fast"]["seconds"] for r in results)
+        pyin_total = sum(r["pyin"]["seconds"] for r in results)
+        summary.update({
+            "agreement_rate": round(sum(r["agree"] for r in results) / len(results), 3),
+            "fast_seconds": round(fast_total, 3),
+            "pyin_seconds": round(pyin_total, 3),
+            "speedup": round(pyin_total / fast_total, 1) if fast_total > 0 else None,
+        })
+    return {"summary": summary, "results": results}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Kullanım: python pitch.py <fixture_klasörü>")
+        sys.exit(1)
+    report = evaluate_fixtures(sys.argv[1])
+    for row in report["results"]:
+        f, p = row["fast"], row["pyin"]
+        print(f"{row['file']} ({row['duration']} sn): hızlı {f['pitch_std']} Hz {f['rating']} ({f['seconds']} sn) | "
+              f"pyin {p['pitch_std']} Hz {p['rating']} ({p['seconds']} sn){'' if row['agree'] else ' <- FARKLI'}")
+    print("\n=== ÖZET ===")
+    print(json.dumps(report["summary"], ensure_ascii=False, indent=2))
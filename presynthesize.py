@@ -0,0 +1,91 @@
+"""
+presynthesize.py
+Soru havuzundaki tüm soruları önceden seslendirip TTS önbelleğine yazan komut.
+
+- Sorular question_pool/*.json dosyalarından okunur (tekrarlanan metinler bir kez)
+- Önbellekte olan sorular atlanır; yarıda kalırsa kaldığı yerden devam eder
+- Sentez thread havuzunda eşzamanlılık sınırı ve hız sınırlayıcı altında yapılır
+
+Kullanım:
+    python presynthesize.py
+    python presynthesize.py question_pool --concurrency 8 --rpm 300
+"""
+
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+from rate_limiter import RateLimiter
+from text_to_speech import synthesize, tts_key
+from tts_cache import get_tts_cache
+
+
+def load_question_texts(question_dir: str) -> List[str]:
+    """Havuzdaki benzersiz soru metinleri (dosya sırasıyla)"""
+    texts = []
+    seen = set()
+    for fn in sorted(os.listdir(question_dir)):
+        if not fn.endswith(".json"):
+            continue
+        with open(os.path.join(question_dir, fn), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            continue
+        for q in data:
+            text = q.get("soru") if isinstance(q, dict) else None
+            if text and text.strip() and text not in seen:
+                seen.add(text)
+                texts.append(text)
+    return texts
+
+
+def _synthesize_job(text: str, limiter: RateLimiter) -> int:
+    limiter.acquire()
+    return len(synthesize(text))
+
+
+def presynthesize(question_dir: str = "question_pool", concurrency: int = 4, rpm: float = 120) -> Dict:
+    """Önbellekte olmayan soruları sentezler; özet istatistikleri döndürür"""
+    started = time.perf_counter()
+    cache = get_tts_cache()
+    texts = load_question_texts(question_dir)
+    todo = [t for t in texts if not cache.contains(tts_key(t))]
+    print(f"[TTS] {len(texts)} soru bulundu, {len(texts) - len(todo)} tanesi zaten önbellekte")
+
+    stats = {"questions": len(texts), "cached": len(texts) - len(todo), "synthesized": 0, "failed": 0, "bytes": 0}
+    limiter = RateLimiter(rpm)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="tts-presynth") as pool:
+        futures = {pool.submit(_synthesize_job, text, limiter): text for text in todo}
+        for fut in as_completed(futures):
+            try:
+                stats["bytes"] += fut.result()
+                stats["synthesized"] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"[HATA] {futures[fut][:60]}...: {e}")
+            finished = stats["synthesized"] + stats["failed"]
+            if finished % 25 == 0:
+                print(f"[TTS] {finished}/{len(todo)} soru sentezlendi", flush=True)
+
+    stats["seconds"] = round(time.perf_counter() - started, 1)
+    stats["cache_mb"] = round(cache.size_bytes() / (1024 * 1024), 1)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soru havuzunu önceden seslendir")
+    parser.add_argument("question_dir", nargs="?", default="question_pool", help="Soru havuzu klasörü")
+    parser.add_argument("--concurrency", type=int, default=4, help="Aynı anda en fazla TTS isteği")
+    parser.add_argument("--rpm", type=float, default=120, help="Dakikada en fazla TTS isteği")
+    args = parser.parse_args()
+
+    stats = presynthesize(args.question_dir, concurrency=args.concurrency, rpm=args.rpm)
+    print("\n=== ÖZET ===")
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+rate_limiter.py
+Harici API çağrıları (Gemini, Google TTS) için thread-safe token-bucket hız sınırlayıcı
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token-bucket hız sınırlayıcı.
+
+    Args:
+        rate_per_minute: Dakikada izin verilen istek sayısı
+        burst: Aynı anda harcanabilecek en fazla token (varsayılan 1 - istekler eşit aralıklı)
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute pozitif olmalı")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Token alınana kadar bekler"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
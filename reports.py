@@ -92,6 +92,7 @@ class ReportGenerator:
             return {
                 "llm_average": 0, 
                 "audio_average": 0, 
+                "audio_source": "-",
                 "combined_average": 0,
                 "total": 0
             }
@@ -104,10 +105,13 @@ class ReportGenerator:
         
         # Ses skorları (0-100 arası, 10'a normalize edilecek)
         audio_scores = []
+        audio_sources = set()
         for h in history:
             if 'audio_score' in h and h['audio_score']:
                 # 0-100 arası skoru 0-10 arası skora çevir
                 audio_scores.append(h['audio_score'].get('overall_score', 0) / 10)
+                # Skorun hangi analizden geldiği (artımlı / ayrıntılı / yalnızca metin)
+                audio_sources.add(h['audio_score'].get('kaynak', 'bilinmiyor'))
         
         # Kombinasyon skoru: LLM %60 + Ses %40
         combined_scores = []
@@ -137,7 +141,8 @@ class ReportGenerator:
             "combined_min": min(combined_scores) if combined_scores else 0,
             "total": sum(llm_scores) if llm_scores else 0,
             "count": len(llm_scores),
-            "audio_count": len(audio_scores)
+            "audio_count": len(audio_scores),
+            "audio_source": ", ".join(sorted(audio_sources)) if audio_sources else "-"
         }
         
         # Geriye dönük uyumluluk için
@@ -250,7 +255,7 @@ Toplam Soru: {report_data['total_questions']}
 GENEL PERFORMANS:
   📊 Genel Skor: {scores['combined_average']}/10
   📝 İçerik Skoru (LLM): {scores['llm_average']}/10
-  🎤 Ses Skoru: {scores['audio_average']}/10
+  🎤 Ses Skoru: {scores['audio_average']}/10 (kaynak: {scores['audio_source']})
   
   En Yüksek: {scores['combined_max']}/10
   En Düşük: {scores['combined_min']}/10
@@ -384,7 +389,7 @@ FAZ BAZINDA PERFORMANS:
             ['Metrik', 'Değer'],
             ['Genel Skor (Kombinasyon)', f"{scores['combined_average']}/10"],
             ['İçerik Skoru (LLM)', f"{scores['llm_average']}/10"],
-            ['Ses Skoru', f"{scores['audio_average']}/10"],
+            [f"Ses Skoru ({scores['audio_source']})", f"{scores['audio_average']}/10"],
             ['En Yüksek Puan', f"{scores['combined_max']}/10"],
             ['En Düşük Puan', f"{scores['combined_min']}/10"],
             ['Toplam Puan', str(scores['total'])],
@@ -491,7 +496,7 @@ FAZ BAZINDA PERFORMANS:
         perf_table.rows[0].cells[1].text = f"{scores['combined_average']}/10"
         perf_table.rows[1].cells[0].text = 'İçerik Skoru (LLM)'
         perf_table.rows[1].cells[1].text = f"{scores['llm_average']}/10"
-        perf_table.rows[2].cells[0].text = 'Ses Skoru'
+        perf_table.rows[2].cells[0].text = f"Ses Skoru ({scores['audio_source']})"
         perf_table.rows[2].cells[1].text = f"{scores['audio_average']}/10"
         perf_table.rows[3].cells[0].text = 'En Yüksek Puan'
         perf_table.rows[3].cells[1].text = f"{scores['combined_max']}/10"
@@ -0,0 +1,145 @@
+"""
+speech_clients.py
+Google Cloud Speech-to-Text ve Text-to-Speech istemcilerini süreç başına bir kez
+oluşturan, açılışta arka planda ısıtan ve turlar boyunca paylaştıran yönetici.
+
+Her soruda yeni istemci oluşturmak gRPC kanal kurulumu + kimlik doğrulama
+maliyetini adayın beklediği ana yüklüyordu.
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from google.api_core import exceptions as gexc
+from google.cloud import speech
+from google.cloud import texttospeech
+
+load_dotenv()
+if os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
+    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+
+# Kanal bozulduğunda istemciyi yeniden oluşturmayı gerektiren hatalar
+RECONNECT_ERRORS = (
+    gexc.ServiceUnavailable,
+    gexc.DeadlineExceeded,
+    gexc.Unauthenticated,
+    gexc.Aborted,
+)
+
+WARMUP_TIMEOUT_SEC = 10.0
+
+
+class SpeechClientManager:
+    """STT ve TTS istemcilerini paylaşan, ısıtan ve gecikme ölçen yönetici"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._speech_client: Optional[speech.SpeechClient] = None
+        self._tts_client: Optional[texttospeech.TextToSpeechClient] = None
+        # Her istemci için yapılan çağrı sayısı (ilk çağrı / kararlı durum ayrımı için)
+        self._call_counts: Dict[str, int] = {"stt": 0, "tts": 0}
+        self.latencies: Dict[str, Dict[str, List[float]]] = {
+            "stt": {"first": [], "steady": []},
+            "tts": {"first": [], "steady": []},
+        }
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def get_speech_client(self) -> speech.SpeechClient:
+        with self._lock:
+            if self._speech_client is None:
+                self._speech_client = speech.SpeechClient()
+                self._call_counts["stt"] = 0
+            return self._speech_client
+
+    def get_tts_client(self) -> texttospeech.TextToSpeechClient:
+        with self._lock:
+            if self._tts_client is None:
+                self._tts_client = texttospeech.TextToSpeechClient()
+                self._call_counts["tts"] = 0
+            return self._tts_client
+
+    def reset(self, kind: str):
+        """Bozulan kanalı bırak; bir sonraki get_* çağrısı yeni istemci oluşturur"""
+        with self._lock:
+            if kind == "stt":
+                self._speech_client = None
+            elif kind == "tts":
+                self._tts_client = None
+        print(f"[CLIENT] {kind.upper()} kanalı yeniden bağlanacak", flush=True)
+
+    def warm_up(self) -> threading.Thread:
+        """İstemcileri oluşturup kanalları arka planda açar (ilk sorudan önce çağrılmalı)"""
+        if self._warmup_thread is not None:
+            return self._warmup_thread
+        self._warmup_thread = threading.Thread(target=self._warm_up, name="speech-warmup", daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def wait_ready(self, timeout: float = WARMUP_TIMEOUT_SEC):
+        if self._warmup_thread is not None:
+            self._warmup_thread.join(timeout)
+
+    def _warm_up(self):
+        started = time.perf_counter()
+        try:
+            # TTS: ücretsiz list_voices çağrısı kanalı ve kimlik doğrulamayı hazırlar
+            tts_client = self.get_tts_client()
+            tts_client.list_voices(language_code="tr-TR", timeout=WARMUP_TIMEOUT_SEC)
+        except Exception as e:
+            print(f"[UYARI] TTS ısınma hatası: {e}")
+        try:
+            # STT: ücretli tanıma isteği atmadan yalnızca gRPC kanalının bağlanmasını bekle
+            import grpc
+            speech_client = self.get_speech_client()
+            channel = getattr(speech_client.transport, "grpc_channel", None)
+            if channel is not None:
+                grpc.channel_ready_future(channel).result(timeout=WARMUP_TIMEOUT_SEC)
+        except Exception as e:
+            print(f"[UYARI] STT ısınma hatası: {e}")
+        print(f"[CLIENT] Speech/TTS istemcileri hazır ({time.perf_counter() - started:.2f} sn)", flush=True)
+
+    def record_latency(self, kind: str, seconds: float):
+        """İstemcinin ilk çağrısı 'first', sonrakiler 'steady' olarak kaydedilir"""
+        with self._lock:
+            self._call_counts[kind] += 1
+            bucket = "first" if self._call_counts[kind] == 1 else "steady"
+            self.latencies[kind][bucket].append(seconds)
+
+    @contextmanager
+    def timed(self, kind: str):
+        """Bir API çağrısının süresini ölçer; kanal hatasında istemciyi sıfırlar"""
+        started = time.perf_counter()
+        try:
+            yield
+        except RECONNECT_ERRORS:
+            self.reset(kind)
+            raise
+        finally:
+            self.record_latency(kind, time.perf_counter() - started)
+
+    def latency_report(self) -> str:
+        lines = ["--- Speech/TTS Gecikme Özeti ---"]
+        for kind, buckets in self.latencies.items():
+            first = buckets["first"]
+            steady = buckets["steady"]
+            first_txt = f"{first[0] * 1000:.0f} ms" if first else "-"
+            steady_txt = f"{sum(steady) / len(steady) * 1000:.0f} ms (n={len(steady)})" if steady else "-"
+            lines.append(f"{kind.upper()}: ilk çağrı {first_txt}, kararlı durum ort. {steady_txt}")
+        return "\n".join(lines)
+
+
+_manager: Optional[SpeechClientManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_client_manager() -> SpeechClientManager:
+    """Süreç genelinde paylaşılan istemci yöneticisi"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = SpeechClientManager()
+        return _manager
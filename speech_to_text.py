@@ -4,7 +4,7 @@ Google Cloud Speech-to-Text API kullanarak ses kaydını metne dönüştürür.
 
 Özellikler:
 - Çok dilli algılama (Türkçe + İngilizce)
-- Otomatik sessizlik algılama
+- Uyarlamalı sessizlik/cevap sonu algılama (vad.py)
 - Gelişmiş model (latest_long) kullanımı
 - Teknik terimlerin doğru algılanması
 """
@@ -12,12 +12,15 @@ Google Cloud Speech-to-Text API kullanarak ses kaydını metne dönüştürür.
 import os
 import io
 import pyaudio
-import wave
 import time
 from datetime import datetime
 from dotenv import load_dotenv
 from google.cloud import speech
-import numpy as np
+from speech_clients import get_client_manager, RECONNECT_ERRORS
+from audio_buffer import PCMRingBuffer, WavStreamWriter, SAMPLE_WIDTH
+from vad import EndpointDetector, ENDPOINT_SILENCE_SECONDS
+from audio_sources import MicrophoneSource
+from streaming_recognizer import SegmentedStreamingRecognizer
 
 # .env dosyasındaki değişkenleri yükle
 load_dotenv()
@@ -30,61 +33,66 @@ CHANNELS = 1
 RATE = 16000  # Google Cloud Speech-to-Text için önerilen sample rate
 
 # Sessizlik algılama parametreleri
-SILENCE_THRESHOLD = 500  # Sessizlik eşiği (amplitude değeri)
-SILENCE_DURATION = int(3 * RATE / CHUNK)  # 3 saniye sessizlik (chunk sayısı)
-MIN_RECORDING_DURATION = 2  # Minimum kayıt süresi (saniye)
-INITIAL_GRACE_PERIOD = int(3 * RATE / CHUNK)  # Başlangıçta 3 saniye sessizlik toleransı (düşünme süresi)
+INITIAL_GRACE_SECONDS = 3  # Başlangıçta 3 saniye sessizlik toleransı (düşünme süresi, gürültü ölçümü)
+MAX_RECORDING_SECONDS = 60  # Maksimum kayıt süresi (saniye)
+LONG_ANSWER_MAX_SECONDS = 600  # Senaryo gibi uzun cevaplar için üst sınır (oturumlar döndürülür)
 
 # Data klasörünü oluştur
 DATA_DIR = "data"
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 
-def calculate_rms(audio_data):
-    """Ses verisinin RMS (Root Mean Square) değerini hesaplar - ses seviyesini ölçmek için"""
-    audio_array = np.frombuffer(audio_data, dtype=np.int16)
-    rms = np.sqrt(np.mean(audio_array ** 2))
-    return rms
-
-def is_silent(audio_data, threshold=SILENCE_THRESHOLD):
-    """Ses verisinin sessiz olup olmadığını kontrol eder"""
-    rms = calculate_rms(audio_data)
-    return rms < threshold
-
 def save_audio_file(frames, filename):
-    """Ses kaydını WAV dosyası olarak kaydeder"""
+    """Ses kaydını (chunk listesi veya tek bir PCM tamponu) WAV dosyası olarak kaydeder"""
     filepath = os.path.join(DATA_DIR, filename)
 
-    with wave.open(filepath, 'wb') as wf:
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(pyaudio.PyAudio().get_sample_size(FORMAT))
-        wf.setframerate(RATE)
-        wf.writeframes(b''.join(frames))
+    if isinstance(frames, (bytes, bytearray, memoryview)):
+        frames = [frames]
+    with WavStreamWriter(filepath, RATE, CHANNELS, SAMPLE_WIDTH) as writer:
+        for frame in frames:
+            writer.write(frame)
 
     print(f"Ses kaydı kaydedildi: {filepath}")
     return filepath
 
-def record_and_convert(question_number=None):
+def record_and_convert(question_number=None, source=None, recognizer=None, max_seconds=MAX_RECORDING_SECONDS,
+                       on_audio=None):
     """
     Mikrofondan ses kaydı yapar ve Google Cloud STT Streaming API ile
     gerçek zamanlı olarak metne dönüştürür.
     
     Args:
         question_number: Soru numarası (1, 2, 3, ...). Belirtilirse data/soru-{n}.wav olarak kaydedilir.
+        source: Ses kaynağı (bkz. audio_sources). Varsayılan canlı mikrofon; testler için WavFileSource.
+        recognizer: streaming_recognize sağlayan tanıyıcı. Varsayılan paylaşılan Google STT istemcisi;
+            ağsız çalıştırma için audio_sources.ScriptedRecognizer.
+        max_seconds: Maksimum kayıt süresi. Streaming oturum sınırını aşan cevaplarda
+            oturum otomatik yenilenir (bkz. streaming_recognizer).
+        on_audio: Her kaydedilen chunk ile çağrılır (ör. streaming_analysis.IncrementalAudioAnalyzer.update);
+            ses analizi kayıtla eş zamanlı ilerler.
     
     Returns:
         Dict: {
             'transcript': str,
             'confidence': float,
             'detected_language': str,
+            'words': List[dict],  # {'word', 'start', 'end'} (saniye)
             'audio_file': str,
+            'audio_pcm': memoryview,
+            'sample_rate': int,
             'timestamp': str
         }
     """
-    print("\n Kayıt başladı! Konuşabilirsiniz... (3 saniye sessizlik algılandığında kayıt otomatik durur)")
+    print("\n Kayıt başladı! Konuşabilirsiniz... (cevabınız bittiğinde kayıt otomatik durur)")
     
-    # Google Cloud STT streaming client
-    client = speech.SpeechClient()
+    # Paylaşılan (önceden ısıtılmış) Google Cloud STT streaming client
+    clients = get_client_manager()
+    client = SegmentedStreamingRecognizer(
+        recognizer if recognizer is not None else clients.get_speech_client(),
+        sample_rate=RATE, sample_width=SAMPLE_WIDTH, channels=CHANNELS
+    )
+    if source is None:
+        source = MicrophoneSource(RATE, CHUNK, CHANNELS)
     
     config = speech.StreamingRecognitionConfig(
         config=speech.RecognitionConfig(
@@ -93,6 +101,7 @@ def record_and_convert(question_number=None):
             language_code="tr-TR",
             alternative_language_codes=["en-US"],
             enable_automatic_punctuation=True,
+            enable_word_time_offsets=True,  # Konuşma hızı/duraksama analizi için kelime zamanları
             model="latest_long",
             use_enhanced=True,
         ),
@@ -100,84 +109,62 @@ def record_and_convert(question_number=None):
     )
     
     # Paylaşılan değişkenler
-    frames_for_file = []
-    audio_filepath = None
+    # Normal cevap süresi kadar önceden ayrılmış tampon; uzun cevaplarda gerektikçe büyür.
+    # Analiz bu belleği kopyasız okur
+    recording = PCMRingBuffer.for_duration(max_seconds, RATE, CHUNK,
+                                           initial_seconds=min(max_seconds, MAX_RECORDING_SECONDS))
+    endpoint = EndpointDetector(sample_rate=RATE, grace_seconds=INITIAL_GRACE_SECONDS,
+                                max_seconds=max_seconds)
+    audio_end_time = None
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
+    # Ses dosyası kayıt sırasında chunk chunk yazılır (sonda toplu yazma yok)
+    if question_number is not None:
+        audio_filepath = os.path.join(DATA_DIR, f"soru-{question_number}.wav")
+    else:
+        audio_filepath = os.path.join(DATA_DIR, f"temp_recording_{timestamp}.wav")
+    
     # Ses akışı için generator
     def audio_generator():
-        """Mikrofon akışından ses verisi üretir ve API'ye gönderir"""
-        nonlocal frames_for_file, audio_filepath
+        """Ses kaynağından (mikrofon veya tekrar oynatma) veri üretir ve API'ye gönderir"""
+        nonlocal audio_end_time
         
-        p = pyaudio.PyAudio()
-        stream = p.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=RATE,
-            input=True,
-            frames_per_buffer=CHUNK
-        )
-        
-        silent_chunks = 0
-        recording_started = True  # Kayıt hemen başlar
-        grace_period_chunks = 0  # Başlangıç toleransı için sayaç
-        print("🔴 Kayıt aktif - düşünmek için 3 saniye sessiz kalabilirsiniz...", flush=True)
+        source.open()
+        if getattr(source, "rate", RATE) != RATE:
+            source.close()
+            raise ValueError(f"Ses kaynağı {RATE} Hz olmalı (kaynak: {source.rate} Hz)")
+        wav_writer = WavStreamWriter(audio_filepath, RATE, CHANNELS, SAMPLE_WIDTH)
+        print(f"🔴 Kayıt aktif - başlamadan önce {INITIAL_GRACE_SECONDS} saniye düşünebilirsiniz; "
+              f"konuşurken {ENDPOINT_SILENCE_SECONDS:g} saniye sessizlik cevabı bitirir...", flush=True)
         
         try:
             while True:
-                data = stream.read(CHUNK, exception_on_overflow=False)
-                frames_for_file.append(data)
-                grace_period_chunks += 1
-                
-                # Ses seviyesini kontrol et
-                audio_data = np.frombuffer(data, dtype=np.int16)
-                volume = np.abs(audio_data).mean()
-                
-                # Başlangıç tolerans süresi (ilk 3 saniye) - sessizlik sayılmaz
-                if grace_period_chunks <= INITIAL_GRACE_PERIOD:
-                    # İlk 3 saniyede sessizlik sayılmaz (düşünme süresi)
-                    if volume > SILENCE_THRESHOLD:
-                        silent_chunks = 0  # Ses varsa sessizlik sayacını sıfırla
-                    continue
-                
-                # Normal kayıt modu (3 saniye sonra) - artık sessizlik sayılır
-                if volume > SILENCE_THRESHOLD:
-                    silent_chunks = 0  # Ses varsa sessizlik sayacını sıfırla
-                else:
-                    silent_chunks += 1  # Sessizlik sayacını artır
-                
-                # Sessizlik süresi aşıldıysa dur (3 saniye sessizlik)
-                if recording_started and silent_chunks > SILENCE_DURATION:
-                    print("✅ Kayıt tamamlandı. ({:.1f} saniye)".format(len(frames_for_file) * CHUNK / RATE), flush=True)
+                data = source.read()
+                if not data:
+                    # Tekrar oynatılan dosya bitti
+                    print("✅ Kayıt tamamlandı. ({:.1f} saniye)".format(recording.recorded_duration), flush=True)
                     break
+                recording.append(data)
+                wav_writer.write(data)
+                if on_audio is not None:
+                    on_audio(data)
                 
-                # Maksimum süre kontrolü
-                if len(frames_for_file) > (RATE / CHUNK * 60):
-                    print("⏱️ Maksimum süre aşıldı.")
+                # Uyarlamalı VAD: gürültü tabanı düşünme süresinde ölçülür, cevap sonu
+                # konuşmadan sonraki ENDPOINT_SILENCE_SECONDS sessizlikten anlaşılır
+                if endpoint.process(data):
+                    if endpoint.reason == "max":
+                        print("⏱️ Maksimum süre aşıldı.")
+                    else:
+                        print("✅ Kayıt tamamlandı. ({:.1f} saniye)".format(recording.recorded_duration), flush=True)
                     break
                 
                 # API'ye gerçek zamanlı gönder
                 yield speech.StreamingRecognizeRequest(audio_content=data)
         
         finally:
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
-            
-            # Ses dosyasını kaydet
-            if question_number is not None:
-                audio_filepath = os.path.join(DATA_DIR, f"soru-{question_number}.wav")
-            else:
-                audio_filepath = os.path.join(DATA_DIR, f"temp_recording_{timestamp}.wav")
-            
-            p_temp = pyaudio.PyAudio()
-            with wave.open(audio_filepath, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(p_temp.get_sample_size(pyaudio.paInt16))
-                wf.setframerate(RATE)
-                wf.writeframes(b''.join(frames_for_file))
-            p_temp.terminate()
-            
+            audio_end_time = time.perf_counter()
+            source.close()
+            wav_writer.close()
             print(f"💾 Ses kaydedildi: {audio_filepath}")
     
     # Streaming recognition başlat
@@ -189,6 +176,7 @@ def record_and_convert(question_number=None):
         
         # Sonuçları topla - TÜM final transkriptleri biriktir
         all_transcripts = []  # Tüm final transkriptleri sakla
+        all_words = []  # Final sonuçların kelime zamanları (kaydın başından itibaren saniye)
         confidence = 0.0
         detected_language = "tr-TR"
         
@@ -202,6 +190,12 @@ def record_and_convert(question_number=None):
             if result.is_final:
                 final_text = result.alternatives[0].transcript
                 all_transcripts.append(final_text)  # Her final sonucu ekle
+                for w in result.alternatives[0].words:
+                    all_words.append({
+                        'word': w.word,
+                        'start': w.start_time.total_seconds(),
+                        'end': w.end_time.total_seconds(),
+                    })
                 confidence = result.alternatives[0].confidence
                 
                 # Dil tespiti
@@ -214,6 +208,10 @@ def record_and_convert(question_number=None):
                 interim_transcript = result.alternatives[0].transcript
                 print(f"⏳ {interim_transcript}", end='\r', flush=True)
         
+        # Son ses paketinden son sonuca kadar geçen süre (ilk çağrı / kararlı durum)
+        if audio_end_time is not None and recognizer is None:
+            clients.record_latency("stt", time.perf_counter() - audio_end_time)
+        
         # Tüm transkriptleri birleştir
         transcript = " ".join(all_transcripts).strip()
         
@@ -232,10 +230,18 @@ def record_and_convert(question_number=None):
             'transcript': transcript,
             'confidence': confidence,
             'detected_language': detected_language,
+            'words': all_words,
             'audio_file': audio_filepath,
+            'audio_pcm': recording.view(),  # Kopyasız 16-bit PCM (analiz için)
+            'sample_rate': RATE,
             'timestamp': timestamp
         }
     
+    except RECONNECT_ERRORS as e:
+        # Kanal bozuldu; sonraki tur yeni istemciyle bağlanır
+        clients.reset("stt")
+        print(f"\n❌ STT bağlantı hatası: {e}")
+        return None
     except Exception as e:
         print(f"\n❌ Hata oluştu: {e}")
         return None
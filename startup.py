@@ -0,0 +1,85 @@
+"""
+startup.py
+Açılıştaki bağımsız hazırlık işlerini paralel başlatan koordinatör.
+
+Soru havuzu, CV analizi, Gemini model nesneleri, Speech/TTS kanalları, ses analizi
+ısınması, analiz süreç havuzu ve ses motoru birbirini beklemeden aynı anda hazırlanır.
+Gerçek bir bağımlılık varsa (ör. CV etiketlerinin soru havuzuna verilmesi) depends_on kullanılır.
+Yalnızca sonucu gerçekten gereken noktada get() ile beklenir (hazır olma bariyeri).
+Açılış sonunda her işin başlangıç/bitiş zamanını gösteren bir zaman çizelgesi yazdırılır.
+"""
+
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class StartupCoordinator:
+    """Hazırlık işlerini thread havuzunda çalıştırır; bağımlılık ve zaman çizelgesi tutar"""
+
+    def __init__(self, max_workers: int = 8):
+        self.started_at = time.perf_counter()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="startup")
+        self._tasks: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def start(self, name: str, fn: Callable, *args, depends_on: Sequence[str] = (), **kwargs) -> Future:
+        """
+        Bir hazırlık işini başlatır. depends_on verilirse önce o işlerin bitmesi beklenir
+        ve sonuçları fn'e sırayla ilk argümanlar olarak verilir.
+        """
+        deps = [self._tasks[d] for d in depends_on]
+
+        def _run():
+            dep_results = [d.result() for d in deps]
+            begin = self._now()
+            status = "ok"
+            try:
+                return fn(*dep_results, *args, **kwargs)
+            except Exception:
+                status = "hata"
+                raise
+            finally:
+                with self._lock:
+                    self._events.append({"name": name, "start": begin, "end": self._now(), "status": status})
+
+        future = self._executor.submit(_run)
+        self._tasks[name] = future
+        return future
+
+    def get(self, name: str, timeout: Optional[float] = None, default: Any = None) -> Any:
+        """İşin sonucunu bekler (bariyer). Hata/zaman aşımında uyarı yazıp default döner."""
+        try:
+            return self._tasks[name].result(timeout)
+        except Exception as e:
+            print(f"[UYARI] Açılış işi '{name}' tamamlanamadı: {e}")
+            return default
+
+    def mark(self, name: str):
+        """Zaman çizelgesine anlık bir işaret ekler (ör. ilk soru)"""
+        now = self._now()
+        with self._lock:
+            self._events.append({"name": name, "start": now, "end": now, "status": "işaret"})
+
+    def timeline(self) -> str:
+        with self._lock:
+            events = sorted(self._events, key=lambda e: (e["start"], e["end"]))
+        pending = [n for n, f in self._tasks.items() if not f.done()]
+        lines = ["--- Açılış Zaman Çizelgesi ---"]
+        for e in events:
+            if e["status"] == "işaret":
+                lines.append(f"{e['start'] * 1000:7.0f} ms  ▶ {e['name']}")
+            else:
+                lines.append(f"{e['start'] * 1000:7.0f} - {e['end'] * 1000:7.0f} ms  "
+                             f"{e['name']} ({(e['end'] - e['start']) * 1000:.0f} ms){'' if e['status'] == 'ok' else ' [HATA]'}")
+        for name in pending:
+            lines.append(f"{'':>7}   ...        {name} (devam ediyor)")
+        return "\n".join(lines)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,157 @@
+"""
+streaming_analysis.py
+Kayıt sırasında her chunk ile beslenen artımlı ses analizi.
+
+Analiz kayıt bittikten sonra tüm dosya üzerinde yapılmak yerine kayıtla eş
+zamanlı ilerler; kayıt bittiğinde yalnızca özet istatistikler kalır:
+- RMS enerji ortalaması/varyansı (Welford)
+- Sessizlik (duraksama) bölütleme: pydub detect_silence ile aynı eşik (-40 dBFS, 500 ms)
+- Enerji artışına dayalı onset sayısı (kelime zamanı yoksa konuşma hızı için)
+- Sesli çerçevelerde YIN F0 ortalaması/varyansı (Welford)
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from pitch import yin_frames, FRAME_LENGTH, HOP_LENGTH, OCTAVE_RATIO
+
+SILENCE_THRESH_DBFS = -40.0   # pydub detect_silence(silence_thresh=-40) ile aynı
+MIN_SILENCE_SEC = 0.5         # pydub detect_silence(min_silence_len=500) ile aynı
+SILENCE_FRAME_MS = 10
+ONSET_RISE_DB = 6.0           # Önceki çerçeveye göre bu kadar enerji artışı onset sayılır
+ONSET_REFRACTORY_FRAMES = 3   # İki onset arasındaki en az çerçeve (~100 ms)
+MIN_PITCH_SAMPLES = 10        # Oktav ayıklaması için gereken en az F0 örneği
+
+
+class RunningStats:
+    """Welford/Chan yöntemiyle toplu güncellenen ortalama ve varyans"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def push_many(self, values: np.ndarray):
+        if not len(values):
+            return
+        n_b = len(values)
+        mean_b = float(np.mean(values))
+        m2_b = float(np.sum((values - mean_b) ** 2))
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self._m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.n if self.n else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+
+class IncrementalAudioAnalyzer:
+    """record_and_convert(on_audio=...) ile her 16-bit PCM chunk'ı alan analizci"""
+
+    def __init__(self, sample_rate: int = 16000,
+                 silence_thresh_db: float = SILENCE_THRESH_DBFS,
+                 min_silence_sec: float = MIN_SILENCE_SEC):
+        self.sample_rate = sample_rate
+        self.silence_thresh_db = silence_thresh_db
+        self.min_silence_sec = min_silence_sec
+        self.silence_frame = int(sample_rate * SILENCE_FRAME_MS / 1000)
+
+        self.samples = 0
+        self.rms = RunningStats()
+        self.pitch = RunningStats()
+        self.onset_count = 0
+        self.pause_durations: List[float] = []
+
+        self._frame_carry = np.zeros(0, dtype=np.float32)    # Çerçeveleme (2048/512) için
+        self._silence_carry = np.zeros(0, dtype=np.float32)  # 10 ms sessizlik çerçeveleri için
+        self._silent_run = 0.0
+        self._prev_db: Optional[float] = None
+        self._since_onset = ONSET_REFRACTORY_FRAMES
+
+    @property
+    def duration(self) -> float:
+        return self.samples / self.sample_rate
+
+    def update(self, data) -> None:
+        """Bir PCM chunk'ı işle (kayıt thread'inde çağrılır)"""
+        x = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+        self.samples += len(x)
+        self._update_silence(x)
+        self._update_frames(x)
+
+    def _update_silence(self, x: np.ndarray):
+        x = np.concatenate([self._silence_carry, x])
+        n = len(x) // self.silence_frame
+        self._silence_carry = x[n * self.silence_frame:]
+        if not n:
+            return
+        frames = x[:n * self.silence_frame].reshape(n, self.silence_frame)
+        db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+        frame_sec = self.silence_frame / self.sample_rate
+        for silent in db < self.silence_thresh_db:
+            if silent:
+                self._silent_run += frame_sec
+            else:
+                self._close_silence()
+
+    def _close_silence(self):
+        if self._silent_run >= self.min_silence_sec:
+            self.pause_durations.append(self._silent_run)
+        self._silent_run = 0.0
+
+    def _update_frames(self, x: np.ndarray):
+        x = np.concatenate([self._frame_carry, x])
+        if len(x) < FRAME_LENGTH:
+            self._frame_carry = x
+            return
+        n = 1 + (len(x) - FRAME_LENGTH) // HOP_LENGTH
+        frames = np.lib.stride_tricks.as_strided(
+            x, shape=(n, FRAME_LENGTH), strides=(x.strides[0] * HOP_LENGTH, x.strides[0])
+        )
+        self._frame_carry = x[n * HOP_LENGTH:].copy()
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        self.rms.push_many(rms)
+        db = 20.0 * np.log10(rms + 1e-9)
+
+        # Onset: sessizlik eşiğinin üstünde ani enerji artışı
+        for value in db:
+            self._since_onset += 1
+            if (self._prev_db is not None and value > self.silence_thresh_db
+                    and value - self._prev_db > ONSET_RISE_DB
+                    and self._since_onset >= ONSET_REFRACTORY_FRAMES):
+                self.onset_count += 1
+                self._since_onset = 0
+            self._prev_db = value
+
+        # Ton: yalnızca sesli çerçevelerde YIN
+        voiced = db > self.silence_thresh_db
+        if voiced.any():
+            f0 = yin_frames(frames[voiced], self.sample_rate)
+            f0 = f0[~np.isnan(f0)]
+            if self.pitch.n >= MIN_PITCH_SAMPLES and len(f0):
+                mean = self.pitch.mean
+                f0 = f0[(f0 < mean * OCTAVE_RATIO) & (f0 > mean / OCTAVE_RATIO)]
+            self.pitch.push_many(f0.astype(np.float64))
+
+    def summary(self) -> Dict:
+        """Kayıt sonu özet istatistikler (sondaki sessizlik de kapatılır)"""
+        self._close_silence()
+        return {
+            'duration': self.duration,
+            'pause_durations': list(self.pause_durations),
+            'onset_count': self.onset_count,
+            'rms_mean': self.rms.mean,
+            'rms_std': self.rms.std,
+            'pitch_count': self.pitch.n,
+            'pitch_mean': self.pitch.mean if self.pitch.n else None,
+            'pitch_std': self.pitch.std if self.pitch.n else None,
+        }
@@ -0,0 +1,235 @@
+"""
+streaming_recognizer.py
+Uzun cevaplar için oturum döndüren (session-rotating) streaming tanıyıcı.
+
+Google STT tek bir streaming oturumunu ~5 dakika ile sınırlar. Bu sınıf
+aynı streaming_recognize arayüzünü sunar; oturum sınırına yaklaşıldığında
+yeni bir oturum açar ve önceki oturumun son birkaç saniyesini yeni oturuma
+tekrar gönderir (sınırdaki kelime kesilmesin diye). Final sonuçlar oturum
+başlangıç ofsetleriyle mutlak zamana çevrilip tekrarlar ayıklanarak birleştirilir.
+
+Bellek yalnızca örtüşme tamponu (varsayılan 2 sn) kadardır; gönderilen ses
+biriktirilmez.
+"""
+
+import queue
+import threading
+from collections import deque
+from datetime import timedelta
+from typing import Iterable, Iterator, List
+
+SESSION_SECONDS = 280.0   # Google streaming sınırı ~305 sn; güvenli pay bırakılır
+OVERLAP_SECONDS = 2.0     # Yeni oturuma tekrar gönderilen ses
+DEDUP_TOLERANCE = 0.05    # Kelime başlangıcı karşılaştırmasında tolerans (sn)
+FEEDER_STOP_TIMEOUT = 2.0  # Hata durumunda besleyici thread'in durmasını bekleme süresi (sn)
+
+_DONE = object()
+
+
+def _seconds(duration) -> float:
+    """proto-plus Duration (timedelta) veya None -> saniye"""
+    if duration is None:
+        return 0.0
+    if isinstance(duration, timedelta):
+        return duration.total_seconds()
+    return float(getattr(duration, "seconds", 0)) + getattr(duration, "nanos", 0) / 1e9
+
+
+class _Session:
+    """Tek bir streaming_recognize çağrısı; ses kuyruktan beslenir, cevaplar ortak kuyruğa yazılır"""
+
+    def __init__(self, index: int, offset: float, client, config, out: "queue.Queue"):
+        self.index = index
+        self.offset = offset          # Oturumun ilk örneğinin mutlak zamanı (sn)
+        self.audio_seconds = 0.0      # Bu oturuma gönderilen ses
+        self.requests: "queue.Queue" = queue.Queue()
+        self._client = client
+        self._config = config
+        self._out = out
+        self.thread = threading.Thread(target=self._run, name=f"stt-session-{index}", daemon=True)
+
+    def _request_iter(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            yield request
+
+    def _run(self):
+        try:
+            for response in self._client.streaming_recognize(self._config, self._request_iter()):
+                self._out.put((self.index, response))
+        except Exception as e:
+            self._out.put((self.index, e))
+        finally:
+            self._out.put((self.index, _DONE))
+
+
+class SegmentedStreamingRecognizer:
+    """
+    streaming_recognize(config, requests) arayüzünü koruyarak oturumları döndüren sarmalayıcı.
+
+    Args:
+        client: Asıl tanıyıcı (SpeechClient veya audio_sources.ScriptedRecognizer)
+        session_seconds: Bir oturuma gönderilecek en fazla ses süresi
+        overlap_seconds: Yeni oturuma tekrar gönderilecek son ses süresi
+    """
+
+    def __init__(self, client, sample_rate: int = 16000, sample_width: int = 2, channels: int = 1,
+                 session_seconds: float = SESSION_SECONDS, overlap_seconds: float = OVERLAP_SECONDS):
+        self.client = client
+        self.bytes_per_second = sample_rate * sample_width * channels
+        self.session_seconds = session_seconds
+        self.overlap_seconds = overlap_seconds
+        self.sessions = 0
+        self.stitched_end = 0.0   # Kabul edilen son final sonucun mutlak bitişi (sn)
+
+    def streaming_recognize(self, config, requests: Iterable) -> Iterator:
+        out: "queue.Queue" = queue.Queue()
+        sessions: List[_Session] = []
+        lock = threading.Lock()
+        feeder_error: List[BaseException] = []
+        stop = threading.Event()
+        self.sessions = 0
+        self.stitched_end = 0.0
+
+        def start_session(offset: float, preroll) -> _Session:
+            session = _Session(len(sessions), offset, self.client, config, out)
+            for request in preroll:
+                session.requests.put(request)
+                session.audio_seconds += len(request.audio_content) / self.bytes_per_second
+            with lock:
+                sessions.append(session)
+            session.thread.start()
+            return session
+
+        def feed():
+            overlap = deque()          # (mutlak başlangıç, istek) - yalnızca son overlap_seconds
+            overlap_seconds = 0.0
+            sent = 0.0                 # Gönderilen toplam ses (mutlak zaman)
+            current = start_session(0.0, [])
+            try:
+                for request in requests:
+                    if stop.is_set():
+                        break
+                    duration = len(request.audio_content) / self.bytes_per_second
+                    if current.audio_seconds + duration > self.session_seconds:
+                        # Oturumu kapat (kalan sonuçları gelir), örtüşen sesle yenisini aç
+                        current.requests.put(None)
+                        offset = overlap[0][0] if overlap else sent
+                        current = start_session(offset, [r for _, r in overlap])
+                        print(f"🔁 STT oturumu yenilendi ({sent:.0f}. saniye)", flush=True)
+                    current.requests.put(request)
+                    current.audio_seconds += duration
+                    overlap.append((sent, request))
+                    overlap_seconds += duration
+                    sent += duration
+                    while overlap and overlap_seconds - len(overlap[0][1].audio_content) / self.bytes_per_second >= self.overlap_seconds:
+                        _, old = overlap.popleft()
+                        overlap_seconds -= len(old.audio_content) / self.bytes_per_second
+            except BaseException as e:
+                feeder_error.append(e)
+            finally:
+                if stop.is_set() and hasattr(requests, "close"):
+                    # Kaynak (mikrofon/ses motoru) ve WAV yazıcı bu turda kapatılır
+                    requests.close()
+                current.requests.put(None)
+                out.put((None, _DONE))
+
+        feeder = threading.Thread(target=feed, name="stt-feeder", daemon=True)
+        feeder.start()
+
+        completed = False
+        try:
+            feeder_done = False
+            finished = set()
+            pending = {}   # Önceki oturum bitmeden gelen final cevaplar (sıra korunur)
+            next_index = 0  # Final sonuçları işlenecek en eski oturum
+
+            while True:
+                with lock:
+                    all_done = feeder_done and len(finished) == len(sessions)
+                if all_done:
+                    break
+                index, item = out.get()
+                if index is None:
+                    feeder_done = True
+                    continue
+                if item is _DONE:
+                    finished.add(index)
+                elif isinstance(item, BaseException):
+                    raise item
+                elif index == next_index or not self._has_final(item):
+                    # Ara sonuçlar hemen, finaller oturum sırasıyla iletilir
+                    response = self._stitch(sessions[index], item)
+                    if response is not None:
+                        yield response
+                    continue
+                else:
+                    pending.setdefault(index, []).append(item)
+                    continue
+                # Biten oturumdan sonraki oturumun bekleyen finallerini ilet
+                while next_index in finished:
+                    next_index += 1
+                    for response in pending.pop(next_index, []):
+                        response = self._stitch(sessions[next_index], response)
+                        if response is not None:
+                            yield response
+
+            completed = True
+        finally:
+            if not completed:
+                # Oturum hatası veya tüketici çıktı: besleyici ses çekmeyi bırakmalı,
+                # yoksa kaynak ve paylaşılan ses motoru sonraki turda kapatılır
+                stop.set()
+                feeder.join(FEEDER_STOP_TIMEOUT)
+
+        feeder.join()
+        self.sessions = len(sessions)
+        if feeder_error:
+            raise feeder_error[0]
+
+    @staticmethod
+    def _has_final(response) -> bool:
+        return any(result.is_final for result in response.results)
+
+    def _stitch(self, session: _Session, response):
+        """Final sonuçları mutlak zamana çevirir; örtüşmeden gelen tekrarları ayıklar"""
+        if session.index == 0 and session.offset == 0.0:
+            for result in response.results:
+                if result.is_final:
+                    self.stitched_end = max(self.stitched_end, _seconds(result.result_end_time))
+            return response
+
+        offset = timedelta(seconds=session.offset)
+        kept = []
+        for result in response.results:
+            if not result.is_final:
+                kept.append(result)
+                continue
+            end = session.offset + _seconds(result.result_end_time)
+            if end <= self.stitched_end + DEDUP_TOLERANCE:
+                continue  # Tamamı önceki oturumda tanındı
+            alternative = result.alternatives[0] if result.alternatives else None
+            if alternative is not None and alternative.words:
+                # Kelime zamanları varsa yalnızca önceki oturumdan sonra başlayan kelimeler kalır
+                words = [type(w).deserialize(type(w).serialize(w)) for w in alternative.words
+                         if session.offset + _seconds(w.start_time) >= self.stitched_end - DEDUP_TOLERANCE]
+                if not words:
+                    continue
+                for w in words:
+                    w.start_time = offset + timedelta(seconds=_seconds(w.start_time))
+                    w.end_time = offset + timedelta(seconds=_seconds(w.end_time))
+                if len(words) != len(alternative.words):
+                    alternative.transcript = " ".join(w.word for w in words)
+                del alternative.words[:]
+                alternative.words.extend(words)
+            result.result_end_time = offset + timedelta(seconds=_seconds(result.result_end_time))
+            self.stitched_end = end
+            kept.append(result)
+
+        if not kept and not response.speech_event_type:
+            return None
+        del response.results[:]
+        response.results.extend(kept)
+        return response
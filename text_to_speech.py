@@ -1,110 +1,273 @@
 
 
 import os
-import io
-import wave
+import struct
+import threading
 import pyaudio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 from google.cloud import texttospeech
+from speech_clients import get_client_manager, RECONNECT_ERRORS
+from tts_cache import get_tts_cache, tts_cache_key
+from tts_pipeline import split_sentences, should_pipeline, fade_edges, join_wav
 
 # .env dosyasındaki değişkenleri yükleyin
 load_dotenv()
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 
 
-def text_to_speech_playback(text, question_number=None, save_to_data=False):
+TTS_LANGUAGE_CODE = "tr-TR"
+TTS_GENDER = "NEUTRAL"      # Veya FEMALE/MALE
+TTS_ENCODING = "LINEAR16"
+
+
+def tts_key(text: str) -> str:
+    """Metnin mevcut ses ayarlarıyla önbellek anahtarı"""
+    return tts_cache_key(text, {"language_code": TTS_LANGUAGE_CODE, "ssml_gender": TTS_GENDER}, TTS_ENCODING)
+
+
+def synthesize(text: str, use_cache: bool = True) -> bytes:
+    """
+    Metni WAV (LINEAR16) baytlarına çevirir. Aynı metin + ses + kodlama daha önce
+    sentezlendiyse disk önbelleğinden döner, API çağrılmaz.
+    """
+    cache = get_tts_cache() if use_cache else None
+    key = tts_key(text)
+    if cache is not None:
+        audio_content = cache.get(key)
+        if audio_content is not None:
+            print("[CACHE] Soru sesi önbellekten alındı")
+            return audio_content
+
+    # Paylaşılan (önceden ısıtılmış) Google Cloud TTS istemcisi
+    clients = get_client_manager()
+
+    # Metin girdisini tanımla
+    synthesis_input = texttospeech.SynthesisInput(text=text)
+
+    # Sesin özelliklerini (dil, cinsiyet vb.) ayarla
+    voice = texttospeech.VoiceSelectionParams(
+        language_code=TTS_LANGUAGE_CODE,
+        ssml_gender=texttospeech.SsmlVoiceGender[TTS_GENDER]
+    )
+
+    # Ses çıkışı formatını tanımla
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding[TTS_ENCODING]
+    )
+
+    # API isteğini gönder (kanal koptuysa yeni istemciyle bir kez daha dene)
+    try:
+        with clients.timed("tts"):
+            response = clients.get_tts_client().synthesize_speech(
+                input=synthesis_input, voice=voice, audio_config=audio_config
+            )
+    except RECONNECT_ERRORS:
+        with clients.timed("tts"):
+            response = clients.get_tts_client().synthesize_speech(
+                input=synthesis_input, voice=voice, audio_config=audio_config
+            )
+
+    if cache is not None:
+        cache.put(key, response.audio_content)
+    return response.audio_content
+
+
+def parse_wav(audio_content) -> Tuple[memoryview, int, int, int]:
+    """
+    WAV başlığını kopyalamadan ayrıştırır.
+    Dönüş: (PCM verisinin memoryview'ı, örnekleme hızı, kanal sayısı, örnek genişliği)
+    """
+    buf = memoryview(audio_content).cast("B")
+    if len(buf) < 12 or bytes(buf[0:4]) != b"RIFF" or bytes(buf[8:12]) != b"WAVE":
+        raise ValueError("Geçersiz WAV verisi")
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(buf):
+        chunk_id = bytes(buf[offset:offset + 4])
+        (chunk_size,) = struct.unpack_from("<I", buf, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            audio_format, channels, rate = struct.unpack_from("<HHI", buf, body)
+            (bits,) = struct.unpack_from("<H", buf, body + 14)
+            if audio_format != 1:
+                raise ValueError(f"Desteklenmeyen WAV formatı: {audio_format}")
+            fmt = (rate, channels, bits // 8)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV 'fmt ' bölümü bulunamadı")
+            # Akış olarak üretilen WAV'larda boyut alanı eksik/taşkın olabilir
+            end = min(body + chunk_size, len(buf))
+            return (buf[body:end], *fmt)
+        offset = body + chunk_size + (chunk_size & 1)
+    raise ValueError("WAV 'data' bölümü bulunamadı")
+
+
+def _archive_async(path: str, audio_content: bytes) -> threading.Thread:
+    """Soru sesini oynatmayı bekletmeden arka planda diske yazar"""
+    def _write():
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(audio_content)
+            print(f"Soru sesi kaydedildi: {path}")
+        except OSError as e:
+            print(f"[UYARI] Soru sesi kaydedilemedi ({path}): {e}")
+
+    thread = threading.Thread(target=_write, name="tts-archive", daemon=True)
+    thread.start()
+    return thread
+
+
+class _ChunkPlayer:
+    """PCM parçalarını art arda çalar: ses motoru varsa onunla, yoksa tek bir PyAudio akışıyla"""
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self._pa = None
+        self._stream = None
+
+    def play(self, pcm, rate: int, channels: int, sample_width: int) -> bool:
+        """Parçayı çalar; aday araya girdiyse True döner"""
+        return self.play_chunks([pcm], rate, channels, sample_width)
+
+    def play_chunks(self, chunks, rate: int, channels: int, sample_width: int) -> bool:
+        """Aynı formattaki parçaları boşluksuz art arda çalar; aday araya girdiyse True döner"""
+        if self.engine is not None:
+            # Açık akışlardan tek oturumda çal; cihaz açma/kapama ve parçalar arası bekleme yok
+            return self.engine.play_chunks(chunks, rate=rate, channels=channels, sample_width=sample_width)
+        if self._stream is None:
+            # Sesi oynatmak için PyAudio'yu kullan
+            self._pa = pyaudio.PyAudio()
+            self._stream = self._pa.open(format=self._pa.get_format_from_width(sample_width),
+                                         channels=channels,
+                                         rate=rate,
+                                         output=True)
+        step = 1024 * channels * sample_width
+        for pcm in chunks:
+            for offset in range(0, len(pcm), step):
+                self._stream.write(pcm[offset:offset + step])
+        return False
+
+    def close(self):
+        try:
+            if self._stream is not None:
+                # stop_stream çıkış tamponu boşalana kadar bekler (sabit uyku gerekmez)
+                self._stream.stop_stream()
+                self._stream.close()
+        except Exception as e:
+            print(f"Oynatma hatası: {e}")
+        finally:
+            # PyAudio'yu kapat
+            try:
+                if self._pa is not None:
+                    self._pa.terminate()
+            except:
+                pass
+
+
+def _pipelined_playback(text: str, player: _ChunkPlayer, archive_path: Optional[str] = None):
+    """
+    Metni cümle cümle sentezleyip çalar: N. cümle çalarken N+1. cümle sentezlenir.
+    Tamamı çalınan metin tek WAV olarak önbelleğe (ve istenirse arşive) yazılır.
+    """
+    sentences = split_sentences(text)
+    print(f"Yanıt {len(sentences)} parça halinde oynatılıyor...")
+    # En fazla iki sentez aynı anda: çalınan parça + sıradaki
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts-pipeline")
+    # Parçalar tek tek önbelleğe yazılmaz; tamamı çalındığında metnin bütünü yazılır
+    futures = [pool.submit(synthesize, sentence, use_cache=False) for sentence in sentences]
+    pieces = []
+    complete = False
+    barged_in = False
+    synth_error = None
+    try:
+        # İlk cümle hazır olunca format belli olur; sonrakiler çalma sırasında beklenir
+        pcm, rate, channels, sample_width = parse_wav(futures[0].result())
+        fmt = (rate, channels, sample_width)
+
+        def _chunks(first):
+            nonlocal complete, synth_error
+            for index, future in enumerate(futures):
+                try:
+                    pcm = first if index == 0 else parse_wav(future.result())[0]
+                except Exception as e:
+                    # Sentez hatası oynatma hatası sayılmaz; oturum kapandıktan sonra yükseltilir
+                    synth_error = e
+                    return
+                piece = fade_edges(pcm, rate, channels, sample_width)
+                pieces.append(piece)
+                yield piece
+            complete = True
+
+        try:
+            barged_in = player.play_chunks(_chunks(pcm), rate, channels, sample_width)
+        except Exception as e:
+            print(f"Oynatma hatası: {e}")
+            barged_in = True
+        if synth_error is not None:
+            raise synth_error
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if not complete or barged_in:
+        return
+    audio_content = join_wav(pieces, *fmt)
+
+    def _store():
+        get_tts_cache().put(tts_key(text), audio_content)
+
+    threading.Thread(target=_store, name="tts-cache", daemon=True).start()
+    if archive_path:
+        _archive_async(archive_path, audio_content)
+
+
+def text_to_speech_playback(text, question_number=None, save_to_data=False, engine=None, pipeline=None,
+                            audio_content=None):
     """
     Verilen metni Google Cloud TTS API'si ile sese dönüştürür ve oynatır.
+    Daha önce sentezlenen metinler (ör. soru havuzu) önbellekten çalınır.
+    Ses bellekten çalınır; diske yazma yalnızca arşiv içindir ve arka planda yapılır.
 
     Args:
         text (str): Sese dönüştürülecek metin.
         question_number (int): Soru numarası (1, 2, 3, ...). Belirtilirse data/soru-sesi-{n}.wav olarak kaydedilir.
-        save_to_data (bool): True ise data/ klasörüne kaydeder, False ise geçici dosya oluşturur.
+        save_to_data (bool): True ise data/ klasörüne (arka planda) kaydeder, False ise hiç dosya yazılmaz.
+        engine (AudioEngine): Oturum boyunca açık ses motoru. Verilirse açık çıkış akışından
+            çalınır, mikrofon dinlenir ve aday araya girerse oynatma durur.
+        pipeline (bool): Cümle cümle sentez/oynatma. None ise önbellekte olmayan uzun metinlerde açılır.
+        audio_content (bytes): Önceden sentezlenmiş WAV (ör. TTSPrefetcher). Verilirse TTS çağrılmaz.
     """
+    audio_file = None
+    if save_to_data and question_number is not None:
+        audio_file = os.path.join("data", f"soru-sesi-{question_number}.wav")
+    player = _ChunkPlayer(engine)
     try:
-        # Google Cloud TTS istemcisini oluştur
-        client = texttospeech.TextToSpeechClient()
-
-        # Metin girdisini tanımla
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-
-        # Sesin özelliklerini (dil, cinsiyet vb.) ayarla
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="tr-TR",
-            ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL  # Veya FEMALE/MALE
-        )
-
-        # Ses çıkışı formatını tanımla
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.LINEAR16
-        )
-
-        # API isteğini gönder
-        response = client.synthesize_speech(
-            input=synthesis_input, voice=voice, audio_config=audio_config
-        )
-
-        # Ses dosyasını kaydet
-        if save_to_data and question_number is not None:
-            # data/ klasörüne kaydet
-            data_dir = "data"
-            if not os.path.exists(data_dir):
-                os.makedirs(data_dir)
-            audio_file = os.path.join(data_dir, f"soru-sesi-{question_number}.wav")
-            with open(audio_file, 'wb') as f:
-                f.write(response.audio_content)
-            print(f"Soru sesi kaydedildi: {audio_file}")
-        else:
-            # Geçici dosya oluştur
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(response.audio_content)
-                audio_file = temp_file.name
-
-        # Sesi oynatmak için PyAudio'yu kullan
+        if audio_content is None:
+            if pipeline is None:
+                pipeline = should_pipeline(text) and not get_tts_cache().contains(tts_key(text))
+            if pipeline:
+                _pipelined_playback(text, player, archive_path=audio_file)
+                return audio_file
+            audio_content = synthesize(text)
+
+        # Arşiv kaydı oynatmayı bekletmez
+        if audio_file:
+            _archive_async(audio_file, audio_content)
+
+        pcm, rate, channels, sample_width = parse_wav(audio_content)
+
         print("Yanıt oynatılıyor...")
-        p = pyaudio.PyAudio()
-        stream = None
-        
         try:
-            with wave.open(audio_file, 'rb') as wf:
-                stream = p.open(format=p.get_format_from_width(wf.getsampwidth()),
-                                channels=wf.getnchannels(),
-                                rate=wf.getframerate(),
-                                output=True)
-
-                data = wf.readframes(1024)
-                while data:
-                    stream.write(data)
-                    data = wf.readframes(1024)
-                
-                # Stream'i hemen kapat
-                stream.stop_stream()
-                stream.close()
+            player.play(pcm, rate, channels, sample_width)
         except Exception as e:
             print(f"Oynatma hatası: {e}")
-        finally:
-            # PyAudio'yu kapat
-            try:
-                p.terminate()
-            except:
-                pass
-        
-        # Oynatma bittikten sonra kısa bekleme
-        import time
-        time.sleep(0.5)  # Kısa bekleme
-        
-        # Sadece geçici dosyaları sil (data/ klasöründeki dosyalar kalır)
-        if not save_to_data:
-            try:
-                if os.path.exists(audio_file):
-                    os.remove(audio_file)
-                    print("Geçici ses dosyası silindi")
-            except Exception as e:
-                print(f"Dosya silme hatası: {e}")
 
     except Exception as e:
         print(f"TTS API hatası: {e}")
         return None
+    finally:
+        player.close()
     
-    return audio_file if save_to_data else None
\ No newline at end of file
+    return audio_file
@@ -0,0 +1,111 @@
+"""
+tts_cache.py
+TTS çıktıları için içerik adresli (metin + ses + kodlama hash'i) disk önbelleği.
+
+Soru havuzundaki metinler sabit olduğu için aynı soru her mülakatta yeniden
+sentezlenmez. Önbellek boyutu TTS_CACHE_MAX_MB ile sınırlıdır; sınır aşılınca
+en uzun süredir kullanılmayan kayıtlar (dosya mtime'ı) silinir (LRU).
+"""
+
+import os
+import json
+import hashlib
+import threading
+from typing import Optional
+
+TTS_CACHE_DIR = os.path.join("cache", "tts")
+TTS_CACHE_MAX_BYTES = int(float(os.getenv("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+
+def tts_cache_key(text: str, voice: dict, encoding: str) -> str:
+    """Metin, ses ayarları ve kodlamadan türetilen SHA-256 anahtar"""
+    payload = json.dumps({"text": text, "voice": voice, "encoding": encoding},
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """<anahtar>.wav dosyalarından oluşan, boyut sınırlı LRU önbellek"""
+
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Kayıtlı ses baytları veya None; okunan kayıt en yeni kullanılan olarak işaretlenir"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data or None
+
+    def put(self, key: str, audio_content: bytes):
+        # Yarım yazılmış dosya kalmasın diye önce geçici dosyaya yaz
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(audio_content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[UYARI] TTS önbelleğine yazılamadı ({path}): {e}")
+            return
+        self.evict()
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        entries = []
+        for fn in os.listdir(self.cache_dir):
+            if not fn.endswith(".wav"):
+                continue
+            path = os.path.join(self.cache_dir, fn)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def evict(self) -> int:
+        """Boyut sınırı aşıldıysa en eski kullanılan kayıtları siler; silinen kayıt sayısı"""
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for path, size, _ in sorted(entries, key=lambda e: e[2]):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            return removed
+
+
+_default_cache: Optional[TTSCache] = None
+_default_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSCache:
+    """Süreç genelinde paylaşılan TTS önbelleği"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = TTSCache()
+        return _default_cache
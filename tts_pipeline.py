@@ -0,0 +1,106 @@
+"""
+tts_pipeline.py
+Uzun metinlerin cümle cümle seslendirilmesi için yardımcılar.
+
+- Türkçe kısaltma ve sıra sayılarını ("Dr.", "vb.", "3. soru") bölmeyen cümle ayırıcı
+- Parça sınırlarında tık sesi olmaması için kısa yumuşak giriş/çıkış (fade)
+- Parçaları tek WAV'da birleştirme (arşiv ve önbellek için)
+
+Oynatma tarafı text_to_speech.text_to_speech_playback(pipeline=...) içindedir:
+N. cümle çalarken N+1. cümle sentezlenir; ilk sese kadar geçen süre yalnızca
+ilk cümlenin sentez süresidir.
+"""
+
+import io
+import re
+import wave
+from typing import List
+
+import numpy as np
+
+PIPELINE_MIN_CHARS = 80    # Bundan kısa metinler tek istekte sentezlenir
+MIN_SENTENCE_CHARS = 25    # Daha kısa cümleler sonrakiyle birleştirilir (gereksiz istek olmasın)
+FADE_MS = 5                # Parça başı/sonu yumuşatma süresi
+
+# Nokta ile biten ama cümle sonu olmayan yaygın Türkçe kısaltmalar (küçük harfle)
+ABBREVIATIONS = {
+    "dr", "prof", "doç", "yrd", "av", "müh", "sn", "bkz", "örn", "vb", "vs", "vd",
+    "no", "tel", "mah", "cad", "sok", "apt", "st", "yy", "ör", "bşk", "gn", "genel",
+}
+
+_SENTENCE_END = re.compile(r'[.!?…]+["\'”’)]*\s+')
+
+
+def _is_boundary(text: str, match: re.Match) -> bool:
+    """Noktalama işaretinden sonra gerçekten yeni bir cümle başlıyor mu"""
+    punct = match.group().strip()
+    next_char = text[match.end():match.end() + 1]
+    if not next_char:
+        return False
+    if punct[0] in "!?…":
+        return True
+    # Nokta: önceki kelime kısaltma, tek harf (baş harf, "T.C.") veya sayı (sıra sayısı) ise bölme
+    prev_word = re.split(r'\s+', text[:match.start()])[-1].lower()
+    if prev_word in ABBREVIATIONS or len(prev_word) == 1 or prev_word.isdigit():
+        return False
+    return next_char.isupper() or next_char.isdigit() or next_char in "\"'“‘("
+
+
+def split_sentences(text: str, min_chars: int = MIN_SENTENCE_CHARS) -> List[str]:
+    """Metni cümlelere ayırır; çok kısa cümleler bir sonrakiyle birleştirilir"""
+    text = " ".join(text.split())
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        if _is_boundary(text, match):
+            sentences.append(text[start:match.end()].strip())
+            start = match.end()
+    if start < len(text):
+        sentences.append(text[start:].strip())
+
+    merged: List[str] = []
+    carry = ""
+    for sentence in sentences:
+        carry = f"{carry} {sentence}".strip()
+        if len(carry) >= min_chars:
+            merged.append(carry)
+            carry = ""
+    if carry:
+        if merged and len(carry) < min_chars:
+            merged[-1] = f"{merged[-1]} {carry}"
+        else:
+            merged.append(carry)
+    return merged
+
+
+def should_pipeline(text: str) -> bool:
+    """Metin cümle cümle seslendirilmeye değecek kadar uzun mu"""
+    return len(text) >= PIPELINE_MIN_CHARS and len(split_sentences(text)) > 1
+
+
+def fade_edges(pcm, rate: int, channels: int = 1, sample_width: int = 2, fade_ms: float = FADE_MS) -> bytes:
+    """
+    16-bit PCM parçanın başına/sonuna kısa kosinüs yumuşatma uygular.
+    Parçalar art arda çalındığında sınırdaki ani genlik sıçraması (tık) oluşmaz.
+    """
+    if sample_width != 2:
+        return bytes(pcm)
+    samples = np.frombuffer(pcm, dtype=np.int16).reshape(-1, channels).astype(np.float32)
+    n = min(int(rate * fade_ms / 1000), len(samples) // 2)
+    if n > 0:
+        ramp = (0.5 - 0.5 * np.cos(np.pi * np.arange(n) / n)).astype(np.float32)[:, None]
+        samples[:n] *= ramp
+        samples[-n:] *= ramp[::-1]
+    return np.round(samples).astype(np.int16).tobytes()
+
+
+def join_wav(pieces: List[bytes], rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """PCM parçalarını tek bir WAV dosyası baytına birleştirir"""
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(rate)
+        for piece in pieces:
+            wf.writeframes(piece)
+    return out.getvalue()
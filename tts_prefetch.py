@@ -0,0 +1,78 @@
+"""
+tts_prefetch.py
+Sıradaki sorunun sesini aday cevap verirken arka planda hazırlayan önbellek.
+
+Sonraki soru önceden seçilebildiğinde (bkz. InterviewHandler.preselect_next_question)
+metni hemen sentezlenir ve bellekte küçük, sınırlı bir önbellekte tutulur. Soru
+çalınacağı zaman ses hazırsa TTS gecikmesi olmaz. Seçim değişirse bekleyen iş
+iptal edilir; sürmekte olan isteğin sonucu ise yok sayılır.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+PREFETCH_MAX_ITEMS = 3
+
+
+class TTSPrefetcher:
+    """Metin -> Future[WAV baytları] eşlemesi tutan, boyutu sınırlı ön sentezleyici"""
+
+    def __init__(self, synthesize_fn: Optional[Callable[[str], bytes]] = None,
+                 max_items: int = PREFETCH_MAX_ITEMS):
+        if synthesize_fn is None:
+            from text_to_speech import synthesize as synthesize_fn
+        self._synthesize = synthesize_fn
+        self.max_items = max_items
+        self._items: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-prefetch")
+        self.stats = {"prefetched": 0, "hits": 0, "cancelled": 0}
+
+    def prefetch(self, text: str) -> Future:
+        """Metni arka planda sentezlemeye başlar (zaten varsa mevcut işi döndürür)"""
+        with self._lock:
+            future = self._items.get(text)
+            if future is not None:
+                self._items.move_to_end(text)
+                return future
+            future = self._pool.submit(self._synthesize, text)
+            self._items[text] = future
+            self.stats["prefetched"] += 1
+            while len(self._items) > self.max_items:
+                _, oldest = self._items.popitem(last=False)
+                self._discard(oldest)
+            return future
+
+    def _discard(self, future: Future):
+        # Kuyruktaki iş hiç başlamaz; sürmekte olanın sonucu kimse almadığı için yok sayılır
+        if not future.done():
+            future.cancel()
+            self.stats["cancelled"] += 1
+
+    def take(self, text: str, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Hazırlanmış sesi alır (sürüyorsa bitmesini bekler); yoksa veya hata olduysa None"""
+        with self._lock:
+            future = self._items.pop(text, None)
+        if future is None:
+            return None
+        try:
+            audio_content = future.result(timeout)
+        except CancelledError:
+            return None
+        except Exception as e:
+            print(f"[UYARI] Ön sentez kullanılamadı: {e}")
+            return None
+        self.stats["hits"] += 1
+        return audio_content
+
+    def retain_only(self, text: Optional[str] = None):
+        """Seçim değiştiğinde verilen metin dışındaki tüm ön sentezleri iptal eder"""
+        with self._lock:
+            for key in [k for k in self._items if k != text]:
+                self._discard(self._items.pop(key))
+
+    def shutdown(self):
+        self.retain_only(None)
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,253 @@
+"""
+vad.py
+Cevap sonunu (endpoint) uyarlamalı olarak algılayan ses aktivite tespiti (VAD).
+
+- Başlangıçtaki düşünme süresinde ortam gürültüsü ölçülür (noise floor kalibrasyonu)
+- Her chunk 20 ms'lik çerçevelere bölünür; enerji + sıfır geçiş oranı (ZCR) vektörel hesaplanır
+- Konuşmadan sonra ENDPOINT_SILENCE_SECONDS (varsayılan 2 sn) sessizlik cevabı bitirir.
+  STT is_final olayları kullanılmaz: interim_results akışında her cümle sonunda gelir,
+  cevabın bittiğini göstermez
+- Hiç konuşma yoksa eski davranıştaki gibi 3 sn sessizlikten sonra durur
+
+Fixture ölçümü (kayıtlı cevaplar üzerinde eşik taraması):
+    python vad.py fixtures/
+    python vad.py fixtures/ --sweep 1.2 1.6 2.0 2.5 3.0
+Her <ad>.wav için <ad>.json: {"speech_end": 4.2} (saniye)
+"""
+
+import os
+import sys
+import json
+import wave
+from typing import Dict, List, Optional
+
+import numpy as np
+
+FRAME_MS = 20
+GRACE_SECONDS = 3.0            # Düşünme süresi: bu sürede kayıt durmaz, gürültü ölçülür
+ENDPOINT_SILENCE_SECONDS = 2.0  # Konuşmadan sonra cevabı bitiren sessizlik (cümle arası düşünme payı)
+NO_SPEECH_TIMEOUT_SECONDS = 3.0  # Hiç konuşulmazsa düşünme süresinden sonraki bekleme
+MIN_SPEECH_SECONDS = 0.25      # Cevap başladı sayılması için gereken toplam konuşma
+MAX_SECONDS = 60.0
+
+NOISE_PERCENTILE = 20   # Gürültü tabanı: kalibrasyon çerçevelerinin alt yüzdeliği
+SPEECH_MARGIN_DB = 9.0  # Gürültü tabanının bu kadar üstü konuşma adayıdır
+MIN_SPEECH_DB = 40.0    # Çok sessiz odalarda eşik bunun altına inmez (20*log10(rms))
+ZCR_MAX = 0.35          # Yüksek ZCR + düşük enerji = hışırtı/gürültü
+STRONG_MARGIN_DB = 6.0  # Eşiğin bu kadar üstündeki çerçeveler ZCR'den bağımsız konuşmadır
+
+
+def frame_features(x: np.ndarray, frame_len: int):
+    """int16 örnekleri (n, frame_len) çerçevelere bölüp enerji (dB) ve ZCR döndürür"""
+    n = len(x) // frame_len
+    frames = x[:n * frame_len].reshape(n, frame_len).astype(np.float32)
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    return energy_db, zcr
+
+
+class EndpointDetector:
+    """Chunk chunk beslenen, cevabın bittiği anı bulan uyarlamalı VAD"""
+
+    def __init__(self, sample_rate: int = 16000,
+                 grace_seconds: float = GRACE_SECONDS,
+                 endpoint_silence: float = ENDPOINT_SILENCE_SECONDS,
+                 no_speech_timeout: float = NO_SPEECH_TIMEOUT_SECONDS,
+                 max_seconds: float = MAX_SECONDS):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * FRAME_MS / 1000)
+        self.frame_sec = self.frame_len / sample_rate
+        self.grace_seconds = grace_seconds
+        self.endpoint_silence = endpoint_silence
+        self.no_speech_timeout = no_speech_timeout
+        self.max_seconds = max_seconds
+        self.reset()
+
+    def reset(self):
+        self._carry = np.zeros(0, dtype=np.int16)
+        self._calibration: List[np.ndarray] = []
+        self.threshold_db = MIN_SPEECH_DB
+        self.noise_floor_db: Optional[float] = None
+        self.elapsed = 0.0                # İşlenen ses süresi (saniye)
+        self.speech_seconds = 0.0
+        self.last_speech_time: Optional[float] = None  # Son konuşma çerçevesinin bitişi
+        self.endpoint_time: Optional[float] = None
+        self.reason: Optional[str] = None
+
+    @property
+    def speech_started(self) -> bool:
+        return self.speech_seconds >= MIN_SPEECH_SECONDS
+
+    def _update_threshold(self, energy_db: np.ndarray):
+        self._calibration.append(energy_db)
+        floor = float(np.percentile(np.concatenate(self._calibration), NOISE_PERCENTILE))
+        self.noise_floor_db = floor
+        self.threshold_db = max(floor + SPEECH_MARGIN_DB, MIN_SPEECH_DB)
+
+    def process(self, data) -> bool:
+        """Bir PCM chunk'ı işle. Cevap bittiyse True döndürür."""
+        if self.endpoint_time is not None:
+            return True
+
+        x = np.frombuffer(data, dtype=np.int16)
+        if self._carry.size:
+            x = np.concatenate([self._carry, x])
+        energy_db, zcr = frame_features(x, self.frame_len)
+        self._carry = x[len(energy_db) * self.frame_len:].copy()
+        if not len(energy_db):
+            return False
+
+        if self.elapsed < self.grace_seconds:
+            self._update_threshold(energy_db)
+
+        is_speech = (energy_db > self.threshold_db) & (
+            (zcr < ZCR_MAX) | (energy_db > self.threshold_db + STRONG_MARGIN_DB)
+        )
+
+        for speech in is_speech:
+            self.elapsed += self.frame_sec
+            if speech:
+                self.speech_seconds += self.frame_sec
+                self.last_speech_time = self.elapsed
+                continue
+            if self._check_endpoint():
+                return True
+
+        if self.elapsed >= self.max_seconds:
+            self._finish("max")
+            return True
+        return False
+
+    def _check_endpoint(self) -> bool:
+        if self.elapsed < self.grace_seconds:
+            return False
+        if not self.speech_started:
+            if self.elapsed - self.grace_seconds >= self.no_speech_timeout:
+                self._finish("no_speech")
+                return True
+            return False
+        silence = self.elapsed - self.last_speech_time
+        if silence >= self.endpoint_silence:
+            self._finish("silence")
+            return True
+        return False
+
+    def _finish(self, reason: str):
+        self.endpoint_time = self.elapsed
+        self.reason = reason
+
+
+class LegacyEndpointDetector:
+    """Karşılaştırma için eski kural: ortalama genlik > 500, 3 sn sessizlikte dur"""
+
+    def __init__(self, sample_rate: int = 16000, chunk: int = 1024, max_seconds: float = MAX_SECONDS):
+        self.chunk_sec = chunk / sample_rate
+        self.grace_chunks = int(3 * sample_rate / chunk)
+        self.silence_chunks_limit = int(3 * sample_rate / chunk)
+        self.max_chunks = sample_rate / chunk * max_seconds
+        self.chunks = 0
+        self.silent_chunks = 0
+        self.endpoint_time: Optional[float] = None
+        self.reason: Optional[str] = None
+
+    def process(self, data) -> bool:
+        self.chunks += 1
+        volume = np.abs(np.frombuffer(data, dtype=np.int16)).mean()
+        if volume > 500:
+            self.silent_chunks = 0
+        elif self.chunks > self.grace_chunks:
+            self.silent_chunks += 1
+        if self.chunks > self.grace_chunks and self.silent_chunks > self.silence_chunks_limit:
+            self.endpoint_time, self.reason = self.chunks * self.chunk_sec, "silence"
+            return True
+        if self.chunks > self.max_chunks:
+            self.endpoint_time, self.reason = self.chunks * self.chunk_sec, "max"
+            return True
+        return False
+
+
+def run_on_pcm(detector, pcm: np.ndarray, sample_rate: int, chunk: int = 1024) -> Optional[float]:
+    """int16 PCM'i chunk chunk dedektöre verir; bitiş zamanını (sn) döndürür"""
+    for start in range(0, len(pcm), chunk):
+        if detector.process(pcm[start:start + chunk].tobytes()):
+            return detector.endpoint_time
+    return None
+
+
+def evaluate_fixtures(fixture_dir: str, chunk: int = 1024, **detector_kwargs) -> Dict:
+    """
+    Kayıtlı fixture'lar üzerinde bitiş gecikmesi ve yanlış kesme oranını ölçer.
+    Gecikme = algılanan bitiş - gerçek konuşma sonu; yanlış kesme = konuşma bitmeden durma.
+    """
+    results = []
+    for fn in sorted(os.listdir(fixture_dir)):
+        if not fn.endswith(".wav"):
+            continue
+        meta_path = os.path.join(fixture_dir, fn[:-4] + ".json")
+        if not os.path.exists(meta_path):
+            continue
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with wave.open(os.path.join(fixture_dir, fn), "rb") as wf:
+            if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+                print(f"[UYARI] {fn}: yalnızca 16-bit mono desteklenir, atlandı")
+                continue
+            sr = wf.getframerate()
+            pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+        speech_end = float(meta["speech_end"])
+        row = {"file": fn, "speech_end": speech_end}
+        for name, detector in (
+            ("adaptive", EndpointDetector(sample_rate=sr, **detector_kwargs)),
+            ("legacy", LegacyEndpointDetector(sample_rate=sr, chunk=chunk)),
+        ):
+            end = run_on_pcm(detector, pcm, sr, chunk)
+            if end is None:
+                end = len(pcm) / sr  # Dosya bitti, dedektör durmadı
+            row[name] = {
+                "endpoint": round(end, 3),
+                "latency": round(end - speech_end, 3),
+                "false_cut": end < speech_end,
+                "reason": detector.reason,
+            }
+        results.append(row)
+
+    summary = {"files": len(results)}
+    for name in ("adaptive", "legacy"):
+        valid = [r[name] for r in results if not r[name]["false_cut"]]
+        summary[name] = {
+            "mean_latency": round(float(np.mean([v["latency"] for v in valid])), 3) if valid else None,
+            "false_cut_rate": round(sum(r[name]["false_cut"] for r in results) / len(results), 3) if results else None,
+        }
+    return {"summary": summary, "results": results}
+
+
+def sweep_endpoint_silence(fixture_dir: str, values: List[float], chunk: int = 1024) -> List[Dict]:
+    """Farklı ENDPOINT_SILENCE_SECONDS değerleri için gecikme / yanlış kesme özetleri"""
+    rows = []
+    for value in values:
+        summary = evaluate_fixtures(fixture_dir, chunk, endpoint_silence=value)["summary"]
+        rows.append({"endpoint_silence": value, **summary["adaptive"]})
+    return rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Kullanım: python vad.py <fixture_klasörü> [--sweep 1.2 1.6 2.0 ...]")
+        sys.exit(1)
+    if "--sweep" in sys.argv:
+        values = [float(v) for v in sys.argv[sys.argv.index("--sweep") + 1:]]
+        print("=== Sessizlik Eşiği Taraması ===")
+        for row in sweep_endpoint_silence(sys.argv[1], values):
+            print(f"{row['endpoint_silence']:.1f} sn: ort. gecikme {row['mean_latency']} sn, "
+                  f"yanlış kesme oranı {row['false_cut_rate']}")
+        sys.exit(0)
+    report = evaluate_fixtures(sys.argv[1])
+    for row in report["results"]:
+        a, l = row["adaptive"], row["legacy"]
+        print(f"{row['file']}: konuşma sonu {row['speech_end']:.2f} sn | "
+              f"uyarlamalı +{a['latency']:.2f} sn ({a['reason']}{', YANLIŞ KESME' if a['false_cut'] else ''}) | "
+              f"eski +{l['latency']:.2f} sn ({l['reason']}{', YANLIŞ KESME' if l['false_cut'] else ''})")
+    print("\n=== ÖZET ===")
+    print(json.dumps(report["summary"], ensure_ascii=False, indent=2))